@@ -0,0 +1,91 @@
+import asyncio
+import time
+from typing import Dict
+
+from fastapi import FastAPI
+
+from app.web_server.core.process_pool import TESTER_CLASSES, MultiProcessTester, shutdown_worker_pool
+from app.web_server.models.agent import AgentRunRequest
+
+COMPLETED_RUN_TTL = 600.0  # seconds a finished run is kept for its coordinator to collect before it is evicted
+
+app = FastAPI()
+runs: Dict[str, Dict] = {}
+
+
+@app.on_event("shutdown")
+def _shutdown_workers():
+    shutdown_worker_pool()
+
+
+async def _execute_run(run_id: str, tester, start_at: float):
+    """Wait for the shared start timestamp, run the tester and record its final summary.
+
+    Worker processes of a multi-process run are spawned while waiting, so they are ready at the shared start.
+    """
+    run = runs[run_id]
+    if isinstance(tester, MultiProcessTester):
+        await tester.prepare()
+    delay = start_at - time.time() if start_at else 0
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+    run["status"] = "running"
+    try:
+        await tester.run()
+        run["status"] = "completed"
+    except asyncio.CancelledError:
+        run["status"] = "cancelled"
+    except Exception as e:
+        run.update(status="failed", error=str(e))
+    finally:
+        asyncio.get_running_loop().call_later(COMPLETED_RUN_TTL, _evict_run, run_id, run)
+
+
+def _evict_run(run_id: str, run: Dict):
+    """Forget a finished run its coordinator never deleted, unless the ID was reused since"""
+    if runs.get(run_id) is run:
+        del runs[run_id]
+
+
+@app.post("/runs")
+async def start_run(request: AgentRunRequest):
+    tester_class = TESTER_CLASSES.get(request.tester)
+    if tester_class is None:
+        return {"error": f"Unknown tester: {request.tester}"}
+
+    tester = MultiProcessTester(request.config, tester_class) if request.config.workers > 1 \
+        else tester_class(request.config)
+    tester.live.export = True
+    runs[request.run_id] = {"status": "scheduled", "tester": tester}
+    runs[request.run_id]["task"] = asyncio.create_task(_execute_run(request.run_id, tester, request.start_at))
+    return {"run_id": request.run_id, "status": "scheduled"}
+
+
+@app.get("/runs/{run_id}")
+async def get_run(run_id: str):
+    run = runs.get(run_id)
+    if not run:
+        return {"error": "Run not found", "status": "failed"}
+
+    tester = run["tester"]
+    summary = tester.summary()
+    if run["status"] == "completed":
+        # When the shard itself ran, so the coordinator can time the test without its own dispatch and polling
+        summary.update(started=tester.start_time.timestamp(), finished=tester.end_time.timestamp())
+    return {"run_id": run_id, "status": run["status"], "error": run.get("error"), "summary": summary,
+            "live_buckets": tester.live.drain()}
+
+
+@app.delete("/runs/{run_id}")
+async def delete_run(run_id: str):
+    """Forget a run, stopping it first when it is still scheduled or running"""
+    run = runs.pop(run_id, None)
+    if run and run.get("task"):
+        run["task"].cancel()
+    return {"deleted": run is not None}
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "runs": len(runs)}
@@ -0,0 +1,151 @@
+"""Resource sampling agent for the host running the system under test.
+
+Samples host CPU, memory and network at a high frequency into a fixed-size ring buffer, and serves the buffered
+samples in compact column batches that the test server pulls during a run. It only depends on the standard library
+and psutil, so it can be copied to the target host on its own:
+
+    pip install psutil
+    python target_agent_main.py --port 8102 --interval 0.1
+
+Set ``target_agent_url`` to ``http://<target-host>:8102`` in the TestConfig to correlate the target's resources with
+the request latency of a test.
+"""
+import argparse
+import json
+import threading
+import time
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import psutil
+
+SAMPLE_FIELDS = ("timestamp", "cpu_percent", "memory_percent", "memory_used", "network_sent", "network_recv")
+FIELD_DECIMALS = (3, 1, 1, 1, 0, 0)  # values are rounded before serialization to keep batches small
+DEFAULT_INTERVAL = 0.1  # seconds between samples
+DEFAULT_BUFFER_SIZE = 36000  # samples retained: one hour at the default interval
+MAX_BATCH = 10000  # samples returned by one pull; the caller asks again while `more` is set
+BYTES_PER_MB = 1024 * 1024
+
+
+class HostSampler:
+    """Ring buffer of host resource samples addressed by a monotonically increasing sequence number.
+
+    Network counters are converted to bytes per second between consecutive samples, so values do not depend on the
+    sampling interval.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.interval = interval
+        self.buffer_size = buffer_size
+        self.seq = 0
+        self._columns = [array("d", bytes(8 * buffer_size)) for _ in SAMPLE_FIELDS]
+        self._lock = threading.Lock()
+        psutil.cpu_percent()
+        self._last_network = psutil.net_io_counters()
+        self._last_time = time.time()
+
+    def sample(self):
+        timestamp = time.time()
+        cpu = psutil.cpu_percent()
+        memory = psutil.virtual_memory()
+        network = psutil.net_io_counters()
+        elapsed = max(timestamp - self._last_time, 1e-6)
+        values = (timestamp, cpu, memory.percent, memory.used / BYTES_PER_MB,
+                  (network.bytes_sent - self._last_network.bytes_sent) / elapsed,
+                  (network.bytes_recv - self._last_network.bytes_recv) / elapsed)
+        self._last_network, self._last_time = network, timestamp
+
+        with self._lock:
+            index = self.seq % self.buffer_size
+            for column, value in zip(self._columns, values):
+                column[index] = value
+            self.seq += 1
+
+    def run(self, stop: threading.Event):
+        """Sample every `interval` seconds on a fixed schedule until `stop` is set"""
+        next_sample = time.monotonic()
+        while not stop.is_set():
+            self.sample()
+            next_sample += self.interval
+            delay = next_sample - time.monotonic()
+            if delay < 0:
+                next_sample = time.monotonic()
+            stop.wait(max(delay, 0))
+
+    def batch(self, cursor: int = 0, limit: int = MAX_BATCH) -> Dict:
+        """Samples from `cursor` on as columns, with the next cursor and how many were evicted before being pulled"""
+        with self._lock:
+            start = max(cursor, self.seq - self.buffer_size, 0)
+            end = min(self.seq, start + limit)
+            indexes = [seq % self.buffer_size for seq in range(start, end)]
+            samples = {field: [round(column[index], decimals) for index in indexes]
+                       for field, column, decimals in zip(SAMPLE_FIELDS, self._columns, FIELD_DECIMALS)}
+            return {"samples": samples, "cursor": end, "dropped": max(start - cursor, 0), "more": end < self.seq,
+                    "interval": self.interval, "agent_time": time.time()}
+
+
+def _handler(sampler: HostSampler):
+    class Handler(BaseHTTPRequestHandler):
+        """``GET /samples?cursor=N&limit=M`` returns a batch, ``GET /health`` the agent time and sequence number"""
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            query = parse_qs(url.query)
+            try:
+                if url.path == "/samples":
+                    body = sampler.batch(int(query.get("cursor", ["0"])[0]),
+                                         min(int(query.get("limit", [str(MAX_BATCH)])[0]), MAX_BATCH))
+                elif url.path == "/health":
+                    body = {"status": "ok", "seq": sampler.seq, "interval": sampler.interval,
+                            "agent_time": time.time()}
+                else:
+                    self._send(404, {"error": "Not found"})
+                    return
+            except ValueError:
+                self._send(400, {"error": "cursor and limit must be integers"})
+                return
+            self._send(200, body)
+
+        def _send(self, status: int, body: Dict):
+            data = json.dumps(body, separators=(",", ":")).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(port: int = 8102, interval: float = DEFAULT_INTERVAL, buffer_size: int = DEFAULT_BUFFER_SIZE,
+          host: str = "0.0.0.0", ready: Optional[threading.Event] = None):
+    """Sample in a background thread and serve the batches until interrupted"""
+    sampler = HostSampler(interval, buffer_size)
+    stop = threading.Event()
+    threading.Thread(target=sampler.run, args=(stop,), name="host-sampler", daemon=True).start()
+    server = ThreadingHTTPServer((host, port), _handler(sampler))
+    if ready is not None:
+        ready.set()
+    try:
+        server.serve_forever()
+    finally:
+        stop.set()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sample this host's resources for the non-functional tester")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8102)
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="seconds between samples")
+    parser.add_argument("--buffer-size", type=int, default=DEFAULT_BUFFER_SIZE, help="samples retained")
+    args = parser.parse_args()
+    try:
+        serve(args.port, args.interval, args.buffer_size, args.host)
+    except KeyboardInterrupt:
+        pass
@@ -1,39 +1,179 @@
-from typing import Dict, List, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+
+POOL_SIZE = 8  # keep-alive connections kept open to the API
+FETCH_WORKERS = 4  # requests issued at once by `gather`
+COMPLETED_RESULTS_CACHE_SIZE = 20  # completed results, with their series, kept in memory
+ETAG_CACHE_SIZE = 50  # revalidatable responses kept in memory, one per path and query
+
+
+def _remember(cache: OrderedDict, key, value, max_entries: int):
+    """Store `value` as the most recently used entry of an LRU cache, evicting the least recently used ones"""
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > max_entries:
+        cache.popitem(last=False)
 
 
 class APIClient:
     """Client for interacting with a performance testing API"""
     def __init__(self, base_url: str = "http://localhost:8000"):
-        """Initialize the APIClient with the base URL of the API"""
+        """Initialize the APIClient with the base URL of the API and a keep-alive session shared by every call"""
         self.base_url = base_url
+        self._etag_cache: OrderedDict[tuple, tuple] = OrderedDict()
+        self._completed_results: OrderedDict[str, Dict] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="api-client")
+
+    def gather(self, *calls: Callable[[], Any]) -> List[Any]:
+        """Run several fetches concurrently over the pooled session and return their results in order"""
+        futures = [self._executor.submit(call) for call in calls]
+        return [future.result() for future in futures]
+
+    def _get_cached(self, path: str, params: Optional[Dict] = None) -> Optional[Dict]:
+        """GET a JSON resource, revalidating the previous response with If-None-Match when one is cached"""
+        key = (path, tuple(sorted((params or {}).items())))
+        with self._cache_lock:
+            cached = self._etag_cache.get(key)
+            if cached:
+                self._etag_cache.move_to_end(key)
+        headers = {"If-None-Match": cached[0]} if cached else None
+        response = self._session.get(f"{self.base_url}{path}", params=params, headers=headers, timeout=5)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        if response.status_code != 200:
+            return None
+
+        data = response.json()
+        if response.headers.get("ETag"):
+            with self._cache_lock:
+                _remember(self._etag_cache, key, (response.headers["ETag"], data), ETAG_CACHE_SIZE)
+        return data
+
+    def fetch_test_results(self, limit: int = 50, cursor: Optional[str] = None, **filters) -> List[Dict]:
+        """Fetch one page of test summaries, optionally filtered by test_type, status, start_from or start_to"""
+        page = self.fetch_test_results_page(limit, cursor, **filters)
+        return page["items"] if page else []
+
+    def fetch_test_results_page(self, limit: int = 50, cursor: Optional[str] = None, **filters) -> Optional[Dict]:
+        """Fetch one page of test summaries together with the cursor of the next page"""
+        params = {"limit": limit, **{k: v for k, v in filters.items() if v is not None}}
+        if cursor:
+            params["cursor"] = cursor
+        try:
+            return self._get_cached("/test-results", params)
+        except requests.exceptions.RequestException:
+            return None
+
+    def fetch_test_result(self, test_id: str, include_series: bool = True) -> Optional[Dict]:
+        """Fetch a single test result; completed results never change, so the most recently used ones are kept"""
+        if include_series:
+            with self._cache_lock:
+                if test_id in self._completed_results:
+                    self._completed_results.move_to_end(test_id)
+                    return self._completed_results[test_id]
+        try:
+            response = self._session.get(f"{self.base_url}/test-results/{test_id}",
+                                         params={"include_series": str(include_series).lower()}, timeout=5)
+            if response.status_code != 200:
+                return None
+            data = response.json()
+            if "error" in data:
+                return None
+            if include_series and data.get("status") == "completed":
+                with self._cache_lock:
+                    _remember(self._completed_results, test_id, data, COMPLETED_RESULTS_CACHE_SIZE)
+            return data
+        except requests.exceptions.RequestException:
+            return None
+
+    def delete_test_result(self, test_id: str) -> Dict:
+        """Delete a finished test's result and recorded samples, dropping the locally cached copy"""
+        with self._cache_lock:
+            self._completed_results.pop(test_id, None)
+        try:
+            response = self._session.delete(f"{self.base_url}/test-results/{test_id}", timeout=30)
+            if response.status_code == 200:
+                return response.json()
+            return {"error": f"Backend error: {response.text}"}
+        except requests.exceptions.RequestException as e:
+            return {"error": f"Connection failed: {str(e)}"}
 
-    def fetch_test_results(self) -> List[Dict]:
-        """Fetch all available test results from the API"""
+    def fetch_resource_stats(self, test_id: str, cursor: int = 0, max_points: Optional[int] = None) -> Optional[Dict]:
+        """Fetch the resource samples of a test recorded after `cursor`, downsampled by the server to `max_points`
+        rows when given"""
         try:
-            response = requests.get(f"{self.base_url}/test-results", timeout=5)
+            params = {"cursor": cursor}
+            if max_points:
+                params["max_points"] = max_points
+            response = self._session.get(f"{self.base_url}/resource-stats/{test_id}", params=params, timeout=5)
             if response.status_code == 200:
                 return response.json()
-            return []
+            return None
+        except requests.exceptions.RequestException:
+            return None
+
+    def fetch_target_correlation(self, test_id: str, max_points: Optional[int] = None) -> Optional[Dict]:
+        """Fetch the per-second latency buckets joined with the target host resources, and their correlation"""
+        try:
+            params = {"max_points": max_points} if max_points else None
+            response = self._session.get(f"{self.base_url}/target-stats/{test_id}/correlation", params=params,
+                                         timeout=5)
+            if response.status_code == 200:
+                return response.json()
+            return None
         except requests.exceptions.RequestException:
-            return []
+            return None
 
-    def fetch_resource_stats(self, test_id: str) -> Optional[Dict]:
-        """Fetch resource statistics for a specific test"""
+    def fetch_live_metrics(self, test_id: str, since: Optional[int] = None,
+                           max_points: Optional[int] = None) -> Optional[Dict]:
+        """Fetch the per-second live metric buckets of a test, optionally only those newer than `since`"""
         try:
-            response = requests.get(f"{self.base_url}/resource-stats/{test_id}", timeout=5)
+            params = {"since": since} if since is not None else {}
+            if max_points:
+                params["max_points"] = max_points
+            response = self._session.get(f"{self.base_url}/live-metrics/{test_id}", params=params, timeout=5)
             if response.status_code == 200:
                 return response.json()
             return None
         except requests.exceptions.RequestException:
             return None
 
+    def compare_tests(self, test_ids: List[str], baseline: Optional[str] = None) -> Dict:
+        """Compare tests against the first of `test_ids`, or against the test tagged `baseline` when given"""
+        try:
+            params = {"test_ids": test_ids, "baseline": baseline} if baseline else {"test_ids": test_ids}
+            response = self._session.get(f"{self.base_url}/compare", params=params, timeout=30)
+            if response.status_code == 200:
+                return response.json()
+            return {"error": f"Backend error: {response.text}"}
+        except requests.exceptions.RequestException as e:
+            return {"error": f"Connection failed: {str(e)}"}
+
+    def cancel_test(self, test_id: str) -> Dict:
+        """Cancel a queued or running test; the server keeps the metrics it recorded before stopping"""
+        try:
+            response = self._session.delete(f"{self.base_url}/tests/{test_id}", timeout=30)
+            if response.status_code == 200:
+                return response.json()
+            return {"error": f"Backend error: {response.text}"}
+        except requests.exceptions.RequestException as e:
+            return {"error": f"Connection failed: {str(e)}"}
+
     def run_test(self, test_type: str, config: Dict) -> Dict:
         """Execute a new performance test"""
         endpoint = f"{self.base_url}/{test_type.lower()}-test"
         try:
-            response = requests.post(endpoint, json=config, timeout=30)
+            response = self._session.post(endpoint, json=config, timeout=30)
             if response.status_code == 200:
                 return response.json()
             return {"error": f"Backend error: {response.text}"}
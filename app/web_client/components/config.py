@@ -1,18 +1,81 @@
+import json
+
 import streamlit as st
 
+HTTP_METHODS = ["GET", "POST", "PUT", "PATCH", "DELETE"]
+HTTP_ENGINES = ["httpx", "raw"]
+
 
 def get_test_config() -> dict:
     """Render the test configuration form based on test type"""
     st.header("⚙️ Test Configuration")
-    test_type = st.radio("Test Type", ["Stress", "Performance"])
+    test_type = st.radio("Test Type", ["Stress", "Performance", "Capacity"])
 
     if test_type == "Stress":
-        return {"test_type": test_type, "config": {"target_url": st.text_input("Target URL", "https://example.com"),
+        config = {"target_url": st.text_input("Target URL", "https://example.com"),
             "requests": st.number_input("Total Requests", min_value=1, step=1, value=100),
             "concurrency": st.number_input("Concurrent Users", min_value=1, step=1, value=10),
-            "headers": {"User-Agent": "PerformanceTester/1.0"}}}
+            "headers": {"User-Agent": "PerformanceTester/1.0"}}
+        think_time = st.number_input("Think Time (seconds)", min_value=0.0, step=0.1, value=0.0)
+        if think_time > 0:
+            config["think_time"] = think_time
+        config.update(get_request_options())
+        return {"test_type": test_type, "config": config}
+    elif test_type == "Capacity":
+        config = {"target_url": st.text_input("Target URL", "https://example.com"),
+            "headers": {"User-Agent": "PerformanceTester/1.0"}}
+        mode = st.selectbox("Search Mode", ["rps", "concurrency"])
+        config["capacity_search"] = {"mode": mode,
+            "start_level": st.number_input("Start Level", min_value=1.0, step=1.0, value=10.0),
+            "step_size": st.number_input("Step Size", min_value=1.0, step=1.0, value=10.0),
+            "max_level": st.number_input("Max Level", min_value=1.0, step=1.0, value=1000.0),
+            "step_duration": st.number_input("Step Duration (seconds)", min_value=1, step=1, value=10),
+            "max_p99": st.number_input("Max P99 (seconds)", min_value=0.001, step=0.1, value=1.0),
+            "max_error_rate": st.number_input("Max Error Rate", min_value=0.0, max_value=1.0, step=0.01,
+                value=0.01)}
+        if mode == "rps":
+            max_in_flight = st.number_input("Max In-Flight (0 = unlimited)", min_value=0, step=1, value=0)
+            if max_in_flight > 0:
+                config["max_in_flight"] = max_in_flight
+        config.update(get_request_options())
+        return {"test_type": test_type, "config": config}
     else:
-        return {"test_type": test_type, "config": {"target_url": st.text_input("Target URL", "https://example.com"),
+        config = {"target_url": st.text_input("Target URL", "https://example.com"),
             "duration": st.number_input("Duration (seconds)", min_value=1, step=1, value=30),
             "concurrency": st.number_input("Concurrent Users", min_value=1, step=1, value=10),
-            "headers": {"User-Agent": "PerformanceTester/1.0"}}}
+            "headers": {"User-Agent": "PerformanceTester/1.0"}}
+        target_rps = st.number_input("Target RPS (0 = closed loop)", min_value=0.0, step=1.0, value=0.0)
+        if target_rps > 0:
+            config["target_rps"] = target_rps
+            max_in_flight = st.number_input("Max In-Flight (0 = unlimited)", min_value=0, step=1, value=0)
+            if max_in_flight > 0:
+                config["max_in_flight"] = max_in_flight
+        config.update(get_request_options())
+        return {"test_type": test_type, "config": config}
+
+
+def get_request_options() -> dict:
+    """Render the request method, JSON payload and multi-step scenario inputs"""
+    options = {}
+    with st.expander("Request Options"):
+        options["method"] = st.selectbox("Method", HTTP_METHODS)
+        payload = st.text_area("JSON Payload (optional)", "")
+        scenario = st.text_area("Scenario JSON (optional, overrides the single request)", "")
+        options["record_samples"] = st.checkbox("Record raw samples (export via /test-results/{id}/samples)")
+        target_agent_url = st.text_input("Target Agent URL (optional, e.g. http://<target-host>:8102)", "")
+        if target_agent_url.strip():
+            options["target_agent_url"] = target_agent_url.strip()
+        options["engine"] = st.selectbox("HTTP Engine", HTTP_ENGINES,
+                                         help="raw: lean HTTP/1.1 client for higher load per core")
+        if options["engine"] == "raw":
+            options["pipelining"] = st.number_input("Pipelining (requests per connection)", min_value=1, step=1,
+                                                    value=1)
+
+    try:
+        if payload.strip():
+            options["payload"] = json.loads(payload)
+        if scenario.strip():
+            options["scenario"] = json.loads(scenario)
+    except json.JSONDecodeError as e:
+        st.error(f"Invalid JSON: {e}")
+    return options
@@ -1,20 +1,111 @@
-from typing import Dict
+from typing import Dict, List, Optional
 
 import pandas as pd
 import plotly.express as px
 import streamlit as st
 
-
-def init_monitoring_placeholders():
-    """Initialize placeholders for monitoring components"""
-    if 'monitoring_placeholders' not in st.session_state:
-        st.session_state.monitoring_placeholders = {'title': st.empty(), 'metrics': st.empty(),
-            'cpu_mem_chart': st.empty(), 'network_chart': st.empty()}
+CHART_POINTS = 500  # rows kept per chart; longer histories are replaced by a server-side downsampled copy
 
 
-def display_realtime_metrics(stats: Dict):
+def init_monitoring_placeholders():
+    """Create the placeholders of this run's monitoring components"""
+    st.session_state.monitoring_placeholders = {'title': st.empty(), 'generator': st.empty(),
+        'live_metrics': st.empty(), 'live_chart': st.empty(), 'metrics': st.empty(), 'cpu_mem_chart': st.empty(),
+        'network_chart': st.empty()}
+
+
+def _live_state(test_id: str) -> Dict:
+    state = st.session_state.get('live_metrics')
+    if not state or state['test_id'] != test_id:
+        state = st.session_state.live_metrics = {'test_id': test_id, 'buckets': [], 'cursor': None}
+    return state
+
+
+def _resource_state(test_id: str) -> Dict:
+    state = st.session_state.get('resource_stream')
+    if not state or state['test_id'] != test_id:
+        state = st.session_state.resource_stream = {'test_id': test_id, 'cursor': 0, 'df': pd.DataFrame()}
+    return state
+
+
+def fetch_monitoring_updates(test_id: str, api_client) -> Dict:
+    """Fetch the test status, the new live buckets and the new resource samples concurrently"""
+    live_cursor, resource_cursor = _live_state(test_id)['cursor'], _resource_state(test_id)['cursor']
+    test_data, live, resources = api_client.gather(
+        lambda: api_client.fetch_test_result(test_id, include_series=False),
+        lambda: api_client.fetch_live_metrics(test_id, live_cursor),
+        lambda: api_client.fetch_resource_stats(test_id, resource_cursor))
+    return {'test': test_data, 'live': live, 'resources': resources}
+
+
+def update_live_buckets(test_id: str, api_client, data: Optional[Dict]) -> List[Dict]:
+    """Append the live buckets finalized since the last poll to the session state"""
+    state = _live_state(test_id)
+    if not data or "buckets" not in data:
+        return state['buckets']
+
+    state['generator'] = data.get('generator')
+    state['buckets'].extend(b for b in data['buckets'] if not b.get('partial'))
+    if data.get('cursor') is not None:
+        state['cursor'] = data['cursor']
+    if len(state['buckets']) > 2 * CHART_POINTS:
+        history = api_client.fetch_live_metrics(test_id, max_points=CHART_POINTS)
+        if history and "buckets" in history:
+            state['buckets'] = [b for b in history['buckets'] if not b.get('partial')]
+            state['cursor'] = history['cursor']
+    return state['buckets'] + [b for b in data['buckets'] if b.get('partial')]
+
+
+def display_generator_status(generator: Optional[Dict]):
+    """Warn while the load generator itself is saturated, since latencies then include its scheduling delay"""
+    if generator and generator.get('generator_bound'):
+        with st.session_state.monitoring_placeholders['generator']:
+            st.warning(f"⚠️ Load generator saturated: {', '.join(generator['reasons'])}")
+
+
+def display_live_metrics(buckets: List[Dict]):
+    """Display request throughput, errors and latency of the most recent complete second"""
+    complete = [b for b in buckets if not b.get('partial')]
+    if not complete:
+        return
+
+    last_bucket = complete[-1]
+    with st.session_state.monitoring_placeholders['live_metrics']:
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Requests/s", last_bucket['requests'])
+        col2.metric("Errors/s", last_bucket['errors'])
+        col3.metric("P50", f"{last_bucket['p50'] * 1000:.1f} ms")
+        col4.metric("P99", f"{last_bucket['p99'] * 1000:.1f} ms")
+
+    df = pd.DataFrame(complete)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
+    df['p99_ms'] = df['p99'] * 1000
+    with st.session_state.monitoring_placeholders['live_chart']:
+        fig_live = px.line(df, x='timestamp', y=['requests', 'errors', 'p99_ms'], title='Throughput and Latency',
+            labels={'value': 'Value', 'variable': 'Metric'})
+        st.plotly_chart(fig_live, use_container_width=True)
+
+
+def update_resource_stats(test_id: str, api_client, delta: Optional[Dict]) -> pd.DataFrame:
+    """Append only the resource samples recorded since the last poll to the DataFrame kept in the session state"""
+    state = _resource_state(test_id)
+    if delta and delta['resource_stats']:
+        new_rows = pd.DataFrame(delta['resource_stats'])
+        new_rows['timestamp'] = pd.to_datetime(new_rows['timestamp'])
+        state['df'] = pd.concat([state['df'], new_rows], ignore_index=True)
+        state['cursor'] = delta['cursor']
+    if len(state['df']) > 2 * CHART_POINTS:
+        history = api_client.fetch_resource_stats(test_id, max_points=CHART_POINTS)
+        if history and history.get('resource_stats'):
+            state['df'] = pd.DataFrame(history['resource_stats'])
+            state['df']['timestamp'] = pd.to_datetime(state['df']['timestamp'])
+            state['cursor'] = history['cursor']
+    return state['df']
+
+
+def display_realtime_metrics(df: pd.DataFrame):
     """Display the real-time metrics"""
-    last_stat = stats[-1]
+    last_stat = df.iloc[-1]
     with st.session_state.monitoring_placeholders['metrics']:
         col1, col2, col3, col4 = st.columns(4)
         col1.metric("CPU Usage", f"{last_stat['cpu_percent']}%")
@@ -23,11 +114,8 @@ def display_realtime_metrics(stats: Dict):
         col4.metric("Network", f"↑{last_stat['network_sent'] / 1024:.1f} KB ↓{last_stat['network_recv'] / 1024:.1f} KB")
 
 
-def display_realtime_charts(stats: Dict):
+def display_realtime_charts(df: pd.DataFrame):
     """Display the real-time charts"""
-    df = pd.DataFrame(stats)
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-
     with st.session_state.monitoring_placeholders['cpu_mem_chart']:
         fig_resources = px.line(df, x='timestamp', y=['cpu_percent', 'memory_percent'],
             title='CPU and Memory Usage Over Time', labels={'value': 'Usage (%)', 'variable': 'Resource'},
@@ -36,28 +124,26 @@ def display_realtime_charts(stats: Dict):
 
     with st.session_state.monitoring_placeholders['network_chart']:
         fig_network = px.line(df, x='timestamp', y=['network_sent', 'network_recv'], title='Network Traffic Over Time',
-            labels={'value': 'Bytes', 'variable': 'Direction'}, color_discrete_sequence=['#00CC96', '#AB63FA'])
+            labels={'value': 'Bytes per interval', 'variable': 'Direction'},
+            color_discrete_sequence=['#00CC96', '#AB63FA'])
         st.plotly_chart(fig_network, use_container_width=True)
 
 
-def display_realtime_monitoring(test_id: str, api_client) -> bool:
-    """Display real-time monitoring dashboard"""
-    stats_data = api_client.fetch_resource_stats(test_id)
-    if not stats_data:
-        st.warning("Waiting for monitoring data...")
-        return False
+def display_realtime_monitoring(test_id: str, api_client, updates: Dict) -> bool:
+    """Display real-time monitoring dashboard from the updates returned by `fetch_monitoring_updates`"""
+    init_monitoring_placeholders()
+    display_live_metrics(update_live_buckets(test_id, api_client, updates['live']))
+    display_generator_status(st.session_state.live_metrics.get('generator'))
 
-    stats = stats_data.get("resource_stats", [])
-    if not stats:
-        st.warning("No monitoring data available yet...")
+    df = update_resource_stats(test_id, api_client, updates['resources'])
+    if df.empty:
+        st.warning("Waiting for monitoring data...")
         return False
 
-    init_monitoring_placeholders()
-
     with st.session_state.monitoring_placeholders['title']:
         st.subheader("📊 Realtime Resource Monitoring")
 
-    display_realtime_metrics(stats)
-    display_realtime_charts(stats)
+    display_realtime_metrics(df)
+    display_realtime_charts(df)
 
     return True
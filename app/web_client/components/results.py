@@ -1,34 +1,56 @@
+from datetime import datetime
+
 import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+PERFORMANCE_VIEW = "📊 Performance Metrics"
+RESOURCE_VIEW = "📈 Resource Usage"
+TARGET_VIEW = "🎯 Target Host"
+DETAIL_VIEWS = [PERFORMANCE_VIEW, RESOURCE_VIEW, TARGET_VIEW]
+CORRELATION_COLUMNS = {"Mean": "mean", "P50": "p50", "P99": "p99", "Error Rate": "error_rate"}
 
-def display_test_results(test_data: dict):
-    """Display detailed test results"""
-    tab1, tab2 = st.tabs(["📊 Performance Metrics", "📈 Resource Usage"])
 
-    with tab1:
-        col1, col2 = st.columns(2)
+def display_test_results(test_data: dict, view: str = PERFORMANCE_VIEW):
+    """Display one view of the detailed test results; the other view's charts are not built"""
+    display_generator_warning(test_data)
+    if view == RESOURCE_VIEW:
+        display_resource_usage(test_data)
+        return
+    if view == TARGET_VIEW:
+        display_target_correlation(test_data)
+        return
 
-        with col1:
-            display_response_times(test_data)
-            display_success_rate(test_data)
+    col1, col2 = st.columns(2)
 
-        with col2:
-            display_throughput(test_data)
+    with col1:
+        display_response_times(test_data)
+        display_success_rate(test_data)
+        display_error_breakdown(test_data)
+        display_capacity_curve(test_data)
 
-    with tab2:
-        display_resource_usage(test_data)
+    with col2:
+        display_throughput(test_data)
+        display_phase_timings(test_data)
+
+
+def display_generator_warning(test_data: dict):
+    """Warn that the load generator, not the target, was the bottleneck of the test"""
+    if test_data.get("generator_bound"):
+        reasons = (test_data.get("generator_metrics") or {}).get("reasons", [])
+        st.warning(f"⚠️ This test was generator-bound ({', '.join(reasons)}): measured latencies include the load "
+                   "generator's own scheduling delay. Use more workers or agents, or lower the load.")
 
 
 def display_response_times(test_data: dict):
     """Display response times metrics"""
     st.subheader("⏱ Response Times (ms)")
-    if all(k in test_data for k in
-           ["min_response_time", "average_response_time", "max_response_time", "percentile_90"]):
-        fig = px.bar(x=["Min", "Avg", "Max", "90th %"],
-            y=[test_data["min_response_time"] * 1000, test_data["average_response_time"] * 1000,
-               test_data["max_response_time"] * 1000, test_data["percentile_90"] * 1000],
+    metrics = {"Min": "min_response_time", "Avg": "average_response_time", "P50": "percentile_50",
+               "P75": "percentile_75", "P90": "percentile_90", "P95": "percentile_95", "P99": "percentile_99",
+               "P99.9": "percentile_99_9", "Max": "max_response_time"}
+    available = {label: key for label, key in metrics.items() if key in test_data}
+    if available:
+        fig = px.bar(x=list(available), y=[test_data[key] * 1000 for key in available.values()],
             labels={"x": "Metric", "y": "Milliseconds"}, color_discrete_sequence=["#636EFA"])
         st.plotly_chart(fig, use_container_width=True)
 
@@ -44,6 +66,24 @@ def display_success_rate(test_data: dict):
         st.plotly_chart(fig, use_container_width=True)
 
 
+def display_error_breakdown(test_data: dict):
+    """Display failures by error class, with their latency and first/last occurrence, and the status code counts"""
+    taxonomy = test_data.get("error_taxonomy")
+    if not taxonomy:
+        return
+    if taxonomy["classes"]:
+        st.subheader("🧯 Errors by Class")
+        rows = [{"Class": item["name"], "Count": item["count"], "Share": f"{item['share']:.1%}",
+                 "P50 (ms)": item["latency"]["p50"] * 1000, "P99 (ms)": item["latency"]["p99"] * 1000,
+                 "First Seen": item["first_seen"], "Last Seen": item["last_seen"], "Example": item["message"]}
+                for item in taxonomy["classes"]]
+        st.dataframe(pd.DataFrame(rows), use_container_width=True)
+    if taxonomy["status_codes"]:
+        fig = px.bar(x=list(taxonomy["status_codes"]), y=list(taxonomy["status_codes"].values()),
+            labels={"x": "HTTP Status", "y": "Responses"}, color_discrete_sequence=["#636EFA"])
+        st.plotly_chart(fig, use_container_width=True)
+
+
 def display_throughput(test_data: dict):
     """Display throughput metrics"""
     st.subheader("📈 Requests Per Second")
@@ -57,6 +97,38 @@ def display_throughput(test_data: dict):
             st.plotly_chart(fig, use_container_width=True)
 
 
+def display_capacity_curve(test_data: dict):
+    """Display the throughput/latency curve of a capacity search and its knee point"""
+    steps = test_data.get("capacity_steps")
+    if steps:
+        st.subheader("📐 Capacity Curve")
+        knee = test_data.get("capacity_knee")
+        if knee:
+            col1, col2 = st.columns(2)
+            col1.metric("Max Sustainable RPS", f"{knee['max_sustainable_rps']:.1f}")
+            col2.metric("P99 at Knee", f"{knee['percentile_99'] * 1000:.1f} ms")
+        else:
+            st.warning("No step stayed within the SLO")
+
+        steps_df = pd.DataFrame(steps)
+        steps_df["p99_ms"] = steps_df["percentile_99"] * 1000
+        fig = px.line(steps_df, x="achieved_rps", y="p99_ms", markers=True, hover_data=["level", "error_rate"],
+            labels={"achieved_rps": "Achieved RPS", "p99_ms": "P99 (ms)"}, color_discrete_sequence=["#636EFA"])
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def display_phase_timings(test_data: dict):
+    """Display where request time was spent: pool wait, connect/TLS, time to first byte and body download"""
+    phases = test_data.get("phase_timings")
+    if phases:
+        st.subheader("🔬 Request Phases (ms)")
+        rows = [{"Phase": phase, "Percentile": label, "Milliseconds": values[key] * 1000}
+                for phase, values in phases.items() for label, key in (("P50", "p50"), ("P99", "p99"))]
+        fig = px.bar(pd.DataFrame(rows), x="Phase", y="Milliseconds", color="Percentile", barmode="group",
+            color_discrete_sequence=["#636EFA", "#EF553B"])
+        st.plotly_chart(fig, use_container_width=True)
+
+
 def display_resource_usage(test_data: dict):
     """Display resource usage metrics"""
     if test_data.get("resource_stats"):
@@ -71,12 +143,19 @@ def display_resource_usage(test_data: dict):
         st.plotly_chart(fig_resources, use_container_width=True)
 
         fig_network = px.line(resource_df, x='timestamp', y=['network_sent', 'network_recv'], title='Network Traffic',
-            labels={'value': 'Bytes', 'variable': 'Direction'}, color_discrete_sequence=['#00CC96', '#AB63FA'])
+            labels={'value': 'Bytes per interval', 'variable': 'Direction'},
+            color_discrete_sequence=['#00CC96', '#AB63FA'])
         st.plotly_chart(fig_network, use_container_width=True)
 
+        if "process_cpu_percent" in resource_df:
+            fig_process = px.line(resource_df, x='timestamp', y=['process_cpu_percent', 'open_sockets'],
+                title='Load Generator Process', labels={'value': 'Value', 'variable': 'Metric'},
+                color_discrete_sequence=['#FFA15A', '#19D3F3'])
+            st.plotly_chart(fig_process, use_container_width=True)
+
         if test_data.get("resource_metrics"):
             st.subheader("📌 Resource Usage Summary")
-            col1, col2 = st.columns(2)
+            col1, col2, col3 = st.columns(3)
 
             with col1:
                 st.metric("Max CPU Usage", f"{test_data['resource_metrics']['max_cpu']:.1f}%")
@@ -85,3 +164,78 @@ def display_resource_usage(test_data: dict):
             with col2:
                 st.metric("Max Memory Used", f"{test_data['resource_metrics']['max_memory']:.1f} MB")
                 st.metric("Avg Memory Used", f"{test_data['resource_metrics']['avg_memory']:.1f} MB")
+
+            with col3:
+                st.metric("Max Generator CPU", f"{test_data['resource_metrics'].get('max_process_cpu', 0):.1f}%")
+                st.metric("Max Generator RSS", f"{test_data['resource_metrics'].get('max_process_rss', 0):.1f} MB")
+
+
+def display_target_correlation(test_data: dict):
+    """Display the target host resources next to the per-second latency, with their correlation coefficients"""
+    target = test_data.get("target")
+    if not target or "error" in target or not target.get("rows"):
+        st.info("No target host samples for this test. Run app/target_agent_main.py on the target host and set "
+                "target_agent_url in the test configuration.")
+        return
+
+    metrics = target["target_metrics"]
+    if metrics.get("last_error"):
+        st.warning(f"Target agent error: {metrics['last_error']}")
+
+    st.subheader("🎯 Target Host vs Latency")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Max Target CPU", f"{metrics.get('max_cpu', 0):.1f}%")
+    col1.metric("Avg Target CPU", f"{metrics.get('avg_cpu', 0):.1f}%")
+    col2.metric("Max Target Memory", f"{metrics.get('max_memory', 0):.1f} MB")
+    col2.metric("Avg Target Memory", f"{metrics.get('avg_memory', 0):.1f} MB")
+    uncertainty = metrics.get("clock_uncertainty") or 0
+    col3.metric("Clock Offset", f"{metrics['clock_offset'] * 1000:+.1f} ms", f"± {uncertainty * 1000:.1f} ms",
+                delta_color="off")
+    col3.metric("Samples (dropped)", f"{metrics['samples']} ({metrics['dropped']})")
+
+    rows_df = pd.DataFrame(target["rows"])
+    rows_df["timestamp"] = [datetime.fromtimestamp(second) for second in rows_df["timestamp"]]
+    rows_df["p50_ms"] = rows_df["p50"] * 1000
+    rows_df["p99_ms"] = rows_df["p99"] * 1000
+
+    fig_latency = px.line(rows_df, x="timestamp", y=["p50_ms", "p99_ms"], title="Latency per Second",
+        labels={"value": "Milliseconds", "variable": "Percentile"}, color_discrete_sequence=["#636EFA", "#EF553B"])
+    st.plotly_chart(fig_latency, use_container_width=True)
+
+    fig_resources = px.line(rows_df, x="timestamp", y=["cpu_percent", "memory_percent"], title="Target CPU and Memory",
+        labels={"value": "Usage (%)", "variable": "Resource"}, color_discrete_sequence=["#00CC96", "#FFA15A"])
+    st.plotly_chart(fig_resources, use_container_width=True)
+
+    fig_network = px.line(rows_df, x="timestamp", y=["network_sent", "network_recv"], title="Target Network Traffic",
+        labels={"value": "Bytes per second", "variable": "Direction"}, color_discrete_sequence=["#AB63FA", "#19D3F3"])
+    st.plotly_chart(fig_network, use_container_width=True)
+
+    st.subheader("🔗 Correlation with Latency")
+    coefficients = [{"Resource": resource, **{label: values[key] for label, key in CORRELATION_COLUMNS.items()}}
+                    for resource, values in target["coefficients"].items()]
+    st.dataframe(pd.DataFrame(coefficients), use_container_width=True)
+    fig_scatter = px.scatter(rows_df, x="cpu_percent", y="p99_ms", hover_data=["timestamp", "requests"],
+        labels={"cpu_percent": "Target CPU (%)", "p99_ms": "P99 (ms)"}, color_discrete_sequence=["#636EFA"])
+    st.plotly_chart(fig_scatter, use_container_width=True)
+
+
+def _percent(value) -> str:
+    return f"{value:+.1%}" if value is not None else "-"
+
+
+def display_comparison(comparison: dict):
+    """Display the deltas and verdicts of the compared tests against the reference one"""
+    if "error" in comparison:
+        st.error(comparison["error"])
+        return
+
+    st.subheader(f"⚖️ Comparison with {comparison['reference_id']}")
+    rows = [{"Test ID": item["test_id"],
+             "P50": _percent(item["latency"]["percentiles"]["percentile_50"]["relative"]),
+             "P99": _percent(item["latency"]["percentiles"]["percentile_99"]["relative"]),
+             "Latency": item["latency"]["verdict"], "RPS": _percent(item["throughput"]["relative"]),
+             "Throughput": item["throughput"]["verdict"], "Error Rate": _percent(item["errors"]["delta"]),
+             "Errors": item["errors"]["verdict"]} for item in comparison["comparisons"]]
+    st.dataframe(pd.DataFrame(rows), use_container_width=True)
+    if any(item["generator_bound"] for item in comparison["comparisons"]):
+        st.warning("⚠️ Some of these tests were generator-bound, so their latencies are not comparable.")
@@ -1,20 +1,55 @@
-import time
 from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
-import pandas as pd
 import streamlit as st
 
 from app.web_client.api.client import APIClient
 from app.web_client.components.config import get_test_config
-from app.web_client.components.monitoring import display_realtime_monitoring
-from app.web_client.components.results import display_test_results
 
 POLLING_INTERVAL = 1
+FINISHED_STATUSES = ("completed", "cancelled", "failed")
+RESULTS_PAGE_SIZE = 50
+CACHE_TTL = 2  # seconds API responses are reused across reruns before being fetched again
 st.set_page_config(layout="wide")
 
 
+@st.cache_resource
+def get_api_client() -> APIClient:
+    """Share one APIClient (and its pooled session and response cache) across reruns"""
+    return APIClient()
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def fetch_test_results(_api_client: APIClient, test_type: Optional[str], status: Optional[str]) -> List[Dict]:
+    return _api_client.fetch_test_results(RESULTS_PAGE_SIZE, test_type=test_type, status=status)
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def fetch_test_details(_api_client: APIClient, test_id: str, view: str) -> Optional[Dict]:
+    """Fetch a test summary and, concurrently, the downsampled series the selected view draws"""
+    from app.web_client.components.monitoring import CHART_POINTS
+    from app.web_client.components.results import RESOURCE_VIEW, TARGET_VIEW
+
+    calls = [lambda: _api_client.fetch_test_result(test_id, include_series=False)]
+    if view == RESOURCE_VIEW:
+        calls.append(lambda: _api_client.fetch_resource_stats(test_id, max_points=CHART_POINTS))
+    elif view == TARGET_VIEW:
+        calls.append(lambda: _api_client.fetch_target_correlation(test_id, max_points=CHART_POINTS))
+    test_data, *series = _api_client.gather(*calls)
+    if test_data and view == RESOURCE_VIEW:
+        test_data["resource_stats"] = series[0]["resource_stats"] if series[0] else None
+    elif test_data and view == TARGET_VIEW:
+        test_data["target"] = series[0]
+    return test_data
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def compare_tests(_api_client: APIClient, test_ids: Tuple[str, ...]) -> Dict:
+    return _api_client.compare_tests(list(test_ids))
+
+
 def main():
-    api_client = APIClient()
+    api_client = get_api_client()
 
     with st.sidebar:
         config_data = get_test_config()
@@ -28,26 +63,32 @@ def main():
                 else:
                     st.error(result.get("error", "Unknown error"))
 
+        if st.session_state.get("active_test_id") and st.button("🛑 Cancel Test"):
+            result = api_client.cancel_test(st.session_state.active_test_id)
+            if "error" in result:
+                st.error(result["error"])
+            else:
+                st.warning(f"Test {result['test_id']} {result['status']}")
+
     st.title("📊 Performance Test Dashboard")
 
     if st.session_state.get("active_test_id"):
-        handle_active_test(api_client)
+        monitor_active_test(api_client)
 
     display_historical_results(api_client)
 
 
-def handle_active_test(api_client):
-    """Handle display and state for active tests"""
-    test_data = next(
-        (t for t in api_client.fetch_test_results() if t.get("test_id") == st.session_state.active_test_id), None)
+@st.fragment(run_every=POLLING_INTERVAL)
+def monitor_active_test(api_client):
+    """Poll and redraw only the monitoring section every `POLLING_INTERVAL` seconds, not the whole page"""
+    from app.web_client.components.monitoring import display_realtime_monitoring, fetch_monitoring_updates
 
-    if test_data and test_data.get("status") == "completed":
+    test_id = st.session_state.active_test_id
+    updates = fetch_monitoring_updates(test_id, api_client)
+    if updates["test"] and updates["test"].get("status") in FINISHED_STATUSES:
         cleanup_completed_test()
         st.rerun()
-    else:
-        if display_realtime_monitoring(st.session_state.active_test_id, api_client):
-            time.sleep(POLLING_INTERVAL)
-            st.rerun()
+    display_realtime_monitoring(test_id, api_client, updates)
 
 
 def cleanup_completed_test():
@@ -55,39 +96,60 @@ def cleanup_completed_test():
     st.session_state.active_test_id = None
     if 'monitoring_placeholders' in st.session_state:
         del st.session_state.monitoring_placeholders
+    if 'live_metrics' in st.session_state:
+        del st.session_state.live_metrics
+    if 'resource_stream' in st.session_state:
+        del st.session_state.resource_stream
 
 
 def display_historical_results(api_client):
-    """Display historical test results"""
-    tests = api_client.fetch_test_results()
+    """Display historical test results; a test's details are only fetched and drawn once it is selected"""
+    col1, col2 = st.columns(2)
+    test_type = col1.selectbox("Filter by type", ["All", "StressTester", "PerformanceTester", "CapacityTester"])
+    status = col2.selectbox("Filter by status", ["All", "completed", "running", "queued", "cancelled", "failed"])
+    tests = fetch_test_results(api_client, None if test_type == "All" else test_type,
+                               None if status == "All" else status)
     if not tests:
         st.info("No test results available. Run a test to see data.")
         return
 
-    df = prepare_results_dataframe(tests)
-    st.dataframe(df, use_container_width=True)
+    rows = prepare_results_rows(tests)
+    st.dataframe(rows, use_container_width=True)
+
+    test_ids = [row["Test ID"] for row in rows]
+    selected_test_id = st.selectbox("Select test for details", test_ids, index=None,
+                                    placeholder="Choose a test to load its details")
+    if not selected_test_id:
+        return
+
+    from app.web_client.components.results import DETAIL_VIEWS, display_comparison, display_test_results
+
+    view = st.segmented_control("View", DETAIL_VIEWS, default=DETAIL_VIEWS[0]) or DETAIL_VIEWS[0]
+    test_data = fetch_test_details(api_client, selected_test_id, view)
+    if test_data:
+        display_test_results(test_data, view)
 
-    selected_test_id = st.selectbox("Select test for details", df["Test ID"], index=0)
-    test_data = next(t for t in tests if t.get("test_id") == selected_test_id)
-    display_test_results(test_data)
+    compare_ids = st.multiselect("Compare with", [test_id for test_id in test_ids if test_id != selected_test_id])
+    if compare_ids:
+        display_comparison(compare_tests(api_client, (selected_test_id, *compare_ids)))
 
 
-def prepare_results_dataframe(tests):
-    """Prepare dataframe with test results summary"""
-    df_data = []
+def prepare_results_rows(tests) -> List[Dict]:
+    """Prepare the rows of the test results summary table"""
+    rows = []
     for test in tests:
-        duration = (pd.to_datetime(test.get("end_time")) - pd.to_datetime(
-            test.get("start_time"))).total_seconds() if test.get("end_time") else 0
+        duration = (datetime.fromisoformat(test["end_time"]) - datetime.fromisoformat(
+            test["start_time"])).total_seconds() if test.get("end_time") else 0
         total_requests = test.get("total_requests", 0)
         success_rate = test.get("successful_requests", 0) / total_requests if total_requests > 0 else 0
 
-        df_data.append(
+        rows.append(
             {"Test ID": test.get("test_id"), "Type": test.get("test_type"), "Status": test.get("status", "unknown"),
                 "Start Time": test.get("start_time"), "Duration": f"{duration:.1f}s", "Requests": total_requests,
                 "Success Rate": f"{success_rate:.1%}",
 
                 "RPS": f"{test.get('requests_per_second', 0):.1f}"})
-    return pd.DataFrame(df_data)
+    return rows
 
 
 if __name__ == "__main__":
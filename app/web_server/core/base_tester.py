@@ -1,101 +1,246 @@
 import asyncio
+import json
 import logging
-import statistics
+import math
 import time
+import uuid
 from datetime import datetime
-from typing import List, Dict
-
-import httpx
-import psutil
-
+from typing import List, Dict, Optional
+
+from app.web_server.core.correlation import correlate
+from app.web_server.core.error_taxonomy import ErrorTaxonomy
+from app.web_server.core.generator_health import GeneratorHealth
+from app.web_server.core.histogram import LatencyHistogram
+from app.web_server.core.http_engine import HttpEngine, create_engine
+from app.web_server.core.http_phases import PhaseRecorder, PhaseTrace
+from app.web_server.core.live_metrics import LiveMetrics
+from app.web_server.core.load_profile import max_level
+from app.web_server.core.resource_sampler import ResourceSampler
+from app.web_server.core.sample_recorder import SampleRecorder
+from app.web_server.core.scenario import ScenarioRunner
+from app.web_server.core.target_monitor import TargetMonitor
 from app.web_server.models.config import TestConfig
 from app.web_server.models.results import TestResult
 
 logger = logging.getLogger(__name__)
 
+MAX_DISTINCT_ERRORS = 10  # error classes listed, most frequent first, in TestResult.errors
+
 
 class BaseTester:
     """Base class for performance testers that provides common testing functionality"""
 
     def __init__(self, config: TestConfig):
         self.config = config
-        self.test_id = f"test_{datetime.now().strftime('%Y%m%d%H%M%S')}"
-        self.results: List[Dict] = []
-        self.resource_stats: List[Dict] = []
+        self.test_id = f"test_{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:12]}"
+        self.histogram = LatencyHistogram(config.histogram_precision)
+        self.request_count = 0
+        self.failed_count = 0
+        self.taxonomy = ErrorTaxonomy()
+        self.live = LiveMetrics(config.live_buckets)
+        self.phases = PhaseRecorder(config.histogram_precision)
+        self.health = GeneratorHealth()
+        self.samples = SampleRecorder.for_test(self.test_id) if config.record_samples else None
+        self.scenario = ScenarioRunner(config.scenario) if config.scenario else None
+        self._request_headers = dict(config.headers or {})
+        self._request_body = json.dumps(config.payload).encode() if config.payload else None
+        if self._request_body:
+            self._request_headers.setdefault("Content-Type", "application/json")
+        self.sampler = ResourceSampler(config.resource_buffer_size)
+        self.target = TargetMonitor(config.target_agent_url, config.target_buffer_size) \
+            if config.target_agent_url else None
         self.monitoring = True
         self.start_time = None
         self.end_time = None
         self.test_result = TestResult(test_id=self.test_id, test_type=self.__class__.__name__,
                                       start_time=datetime.now(), total_requests=0, successful_requests=0,
                                       failed_requests=0, average_response_time=0, min_response_time=0,
-                                      max_response_time=0, percentile_90=0, requests_per_second=0, status="running",
+                                      max_response_time=0, requests_per_second=0, status="running",
                                       resource_stats=[], resource_metrics={})
 
-    async def _make_request(self, client: httpx.AsyncClient):
-        """Make an individual HTTP request to the target URL and record the results"""
+    def _connection_limit(self) -> Optional[int]:
+        """Size the connection pool from the config so it never silently caps the requested concurrency.
+
+        Returns None, an unbounded pool, for open-loop tests without `max_in_flight`.
+        """
+        if self.config.max_connections:
+            return self.config.max_connections
+        if self.config.target_rps:
+            return self.config.max_in_flight
+        if self.config.load_profile:
+            return math.ceil(max_level(self.config.load_profile))
+        return self.config.concurrency
+
+    def _create_client(self) -> HttpEngine:
+        """Create the configured HTTP engine with pool limits, keep-alive, HTTP/2 and timeouts taken from the config"""
+        return create_engine(self.config, self._connection_limit())
+
+    async def _run_iteration(self, client: HttpEngine, intended_start: Optional[float] = None):
+        """Run one unit of load: a full scenario iteration when configured, otherwise a single request"""
+        if self.scenario:
+            await self.scenario.run_iteration(self, client, intended_start)
+        else:
+            await self._make_request(client, intended_start)
+
+    async def _make_request(self, client: HttpEngine, intended_start: Optional[float] = None,
+                            method: Optional[str] = None, url: Optional[str] = None,
+                            headers: Optional[Dict] = None, content: Optional[bytes] = None):
+        """Make an individual HTTP request and record the results, returning the response (None on failure).
+
+        Without explicit request arguments the configured method, target URL, headers and pre-encoded payload are
+        used. When ``intended_start`` (a ``time.perf_counter()`` value) is given, the response time is measured
+        from the scheduled send time instead of the actual one, so queueing delay in the generator is not hidden.
+        """
+        if url is None:
+            method, url, headers, content = (self.config.method, self.config.target_url, self._request_headers,
+                                             self._request_body)
+        self.health.in_flight += 1
+        start = None
         try:
-            start = time.time()
-            response = await client.get(self.config.target_url)
-            elapsed = time.time() - start
-
-            self.results.append(
-                {"status_code": response.status_code, "response_time": elapsed, "success": response.is_success})
-            return True, elapsed
+            trace = PhaseTrace()
+            sent = time.perf_counter()
+            start = sent if intended_start is None else intended_start
+            response = await client.request(method, url, headers=headers, content=content, trace=trace)
+            finished = time.perf_counter()
+            elapsed = finished - start
+
+            self.request_count += 1
+            self.taxonomy.record_status(response.status_code)
+            error_class = None
+            if response.is_success:
+                self.histogram.record(elapsed)
+                self.phases.record(trace.phases(sent, finished))
+            else:
+                self.failed_count += 1
+                error_class = self.taxonomy.record_response(response.status_code, elapsed)
+            self.live.record(elapsed, response.is_success, error_class=error_class)
+            if self.samples:
+                self.samples.record(finished, elapsed, response.status_code, response.is_success)
+            return response
         except Exception as e:
             logger.error(f"Request failed: {str(e)}")
-            self.results.append({"status_code": None, "response_time": None, "success": False, "error": str(e)})
-            return False, 0
-
-    async def monitor_resources(self, interval: float = 1.0):
-        """Background task to monitor system resources during the test"""
+            failed = time.perf_counter()
+            self.request_count += 1
+            self.failed_count += 1
+            error_class = self.taxonomy.record_exception(e, failed - start if start is not None else None)
+            self.live.record(None, False, error_class=error_class)
+            if self.samples:
+                self.samples.record(failed, None, 0, False)
+            return None
+        finally:
+            self.health.in_flight -= 1
+
+    def summary(self) -> Dict:
+        """Return a compact, picklable snapshot of the request metrics recorded so far"""
+        return {"request_count": self.request_count, "failed_count": self.failed_count,
+                "taxonomy": self.taxonomy.to_dict(),
+                "histogram": self.histogram.to_dict(), "missed_sends": self.test_result.missed_sends,
+                "late_sends": self.test_result.late_sends,
+                "effective_concurrency": self.test_result.effective_concurrency, "phases": self.phases.to_dict(),
+                "health": self.health.to_dict()}
+
+    def merge_summaries(self, summaries: List[Dict]):
+        """Replace the locally recorded request metrics with the merge of summaries produced by other testers"""
+        self.histogram = LatencyHistogram(self.config.histogram_precision)
+        self.request_count = 0
+        self.failed_count = 0
+        self.taxonomy = ErrorTaxonomy()
+        self.phases = PhaseRecorder(self.config.histogram_precision)
+        self.health = GeneratorHealth()
+        self.test_result.missed_sends = 0
+        self.test_result.late_sends = 0
+        self.test_result.effective_concurrency = 0
+
+        for summary in summaries:
+            self.histogram.merge(LatencyHistogram.from_dict(summary["histogram"]))
+            self.request_count += summary["request_count"]
+            self.failed_count += summary["failed_count"]
+            self.taxonomy.merge_dict(summary.get("taxonomy"))
+            self.test_result.missed_sends += summary["missed_sends"]
+            self.test_result.late_sends += summary["late_sends"]
+            self.test_result.effective_concurrency += summary["effective_concurrency"]
+            self.phases.merge_dict(summary.get("phases"))
+            self.health.merge_dict(summary.get("health"))
+
+    def generator_metrics(self) -> Dict:
+        """Event-loop lag, in-flight, CPU and pool-wait signals of the load generator, with the generator-bound flag"""
+        return self.health.metrics(self.phases.histograms["pool_wait"])
+
+    def _sample_resources(self):
+        """Take one resource sample and refresh the running aggregates on the test result"""
+        self.sampler.sample()
+        self.test_result.resource_metrics = self.sampler.metrics
+
+    def _monitor_in_thread(self, interval: float):
         while self.monitoring:
-            stats = {'timestamp': datetime.now().isoformat(), 'cpu_percent': psutil.cpu_percent(),
-                     'memory_percent': psutil.virtual_memory().percent,
-                     'memory_used': psutil.virtual_memory().used / (1024 * 1024),  # in MB
-                     'network_sent': psutil.net_io_counters().bytes_sent,
-                     'network_recv': psutil.net_io_counters().bytes_recv, }
-            self.resource_stats.append(stats)
-
-            if self.resource_stats:
-                self.test_result.resource_metrics = {'max_cpu': max(s['cpu_percent'] for s in self.resource_stats),
-                                                     'avg_cpu': statistics.mean(
-                                                         s['cpu_percent'] for s in self.resource_stats),
-                                                     'max_memory': max(s['memory_used'] for s in self.resource_stats),
-                                                     'avg_memory': statistics.mean(
-                                                         s['memory_used'] for s in self.resource_stats), }
-                self.test_result.resource_stats = self.resource_stats
-
-            await asyncio.sleep(interval)
-
-    def _calculate_metrics(self):
-        """Calculate performance metrics from collected test results"""
-        response_times = [r["response_time"] for r in self.results if r["success"]]
-        successful = len(response_times)
-        failed = len(self.results) - successful
-
-        if successful > 0:
-            avg_time = statistics.mean(response_times)
-            min_time = min(response_times)
-            max_time = max(response_times)
-            percentile_90 = statistics.quantiles(response_times, n=100)[-1] if len(response_times) > 1 else \
-                response_times[0]
+            self._sample_resources()
+            time.sleep(interval)
+
+    async def monitor_resources(self, interval: Optional[float] = None):
+        """Background task to monitor system resources during the test.
+
+        With `monitor_in_thread` enabled the sampling loop runs in an executor thread, so psutil calls never take
+        time away from the event loop that is timing requests. When a target agent is configured, its samples are
+        pulled alongside and correlated with the per-second latency buckets once the test ends.
+        """
+        interval = interval or self.config.monitor_interval
+        target_task = asyncio.create_task(self.target.run(lambda: self.monitoring)) if self.target else None
+        if self.config.monitor_in_thread:
+            await asyncio.get_running_loop().run_in_executor(None, self._monitor_in_thread, interval)
         else:
-            avg_time = min_time = max_time = percentile_90 = 0
+            while self.monitoring:
+                self._sample_resources()
+                await asyncio.sleep(interval)
+
+        samples, next_seq = self.sampler.samples_since(0)
+        self.test_result.resource_stats = samples
+        self.test_result.resource_stats_seq = next_seq - len(samples)
+        if target_task:
+            await target_task
+            self._store_target_stats()
+
+    def _store_target_stats(self):
+        """Copy the target host samples, aggregates and their correlation with latency onto the test result"""
+        samples, next_seq = self.target.samples_since(0)
+        self.test_result.target_stats = samples
+        self.test_result.target_stats_seq = next_seq - len(samples)
+        self.test_result.target_metrics = self.target.metrics
+        timestamps, values, _ = self.target.columns()
+        self.test_result.target_correlation = correlate(self.test_result.timeline or self.live.buckets(), timestamps,
+                                                        values)["coefficients"]
+
+    def finalize(self, status: str):
+        """Close out a run that did not complete (cancelled or failed), keeping the metrics recorded so far"""
+        self.start_time = self.start_time or self.test_result.start_time
+        self.end_time = datetime.now()
+        self._calculate_metrics()
+        self.test_result.status = status
 
+    def _calculate_metrics(self):
+        """Calculate performance metrics from the recorded latency histogram"""
+        successful = self.histogram.count
         test_duration = (self.end_time - self.start_time).total_seconds()
-        rps = len(self.results) / test_duration if test_duration > 0 else 0
+        rps = self.request_count / test_duration if test_duration > 0 else 0
 
-        self.test_result.total_requests = len(self.results)
+        self.test_result.total_requests = self.request_count
         self.test_result.successful_requests = successful
-        self.test_result.failed_requests = failed
-        self.test_result.average_response_time = avg_time
-        self.test_result.min_response_time = min_time
-        self.test_result.max_response_time = max_time
-        self.test_result.percentile_90 = percentile_90
+        self.test_result.failed_requests = self.failed_count
+        self.test_result.average_response_time = self.histogram.mean
+        self.test_result.min_response_time = self.histogram.min or 0
+        self.test_result.max_response_time = self.histogram.max or 0
+        for name, value in self.histogram.percentiles().items():
+            setattr(self.test_result, name, value)
+        self.test_result.latency_histogram = self.histogram.to_dict()
+        self.test_result.timeline = self.live.flush()
+        self.test_result.phase_timings = self.phases.metrics()
+        self.test_result.generator_metrics = self.generator_metrics()
+        self.test_result.generator_bound = self.test_result.generator_metrics["generator_bound"]
         self.test_result.requests_per_second = rps
         self.test_result.end_time = self.end_time
         self.test_result.status = "completed"
+        if self.samples:
+            self.samples.close()
 
-        if failed > 0:
-            errors = [r.get("error", "Unknown error") for r in self.results if not r["success"]]
-            self.test_result.errors = list(set(errors))[:10]
+        self.test_result.error_taxonomy = self.taxonomy.metrics()
+        if self.taxonomy.classes:
+            self.test_result.errors = self.taxonomy.descriptions(MAX_DISTINCT_ERRORS)
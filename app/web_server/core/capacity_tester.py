@@ -0,0 +1,105 @@
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.web_server.core.base_tester import BaseTester
+from app.web_server.core.performance_tester import PerformanceTester
+from app.web_server.core.process_pool import MultiProcessTester, check_shard_caps
+from app.web_server.models.load_profile import CapacitySearch, LoadProfile
+
+logger = logging.getLogger(__name__)
+
+MIN_THROUGHPUT_RATIO = 0.9  # in RPS mode, a step achieving less than this share of its offered rate is saturated
+
+
+class CapacityTester(BaseTester):
+    """Capacity search that raises the load step by step until a latency or error-rate SLO is breached.
+
+    Every step is a regular PerformanceTester run (open-loop at the step's RPS, or closed-loop at the step's
+    concurrency). The per-step metrics are kept on the result so the load/latency curve can be plotted, and the last
+    step within the SLO is reported as the knee point.
+    """
+
+    def __init__(self, config):
+        if config.workers > 1:
+            check_shard_caps(config, config.workers)
+        super().__init__(config)
+        self.search = config.capacity_search or CapacitySearch()
+        self._step_summaries: List[Dict] = []
+        self._current: Optional[BaseTester] = None
+
+    def _step_tester(self, level: float) -> BaseTester:
+        update = {"capacity_search": None, "duration": self.search.step_duration, "load_profile": None,
+                  "target_rps": None}
+        if self.search.mode == "rps":
+            update["target_rps"] = level
+        else:
+            update["load_profile"] = LoadProfile(type="linear_ramp", start_level=level)
+        step_config = self.config.model_copy(update=update)
+
+        tester = MultiProcessTester(step_config, PerformanceTester) if self.config.workers > 1 \
+            else PerformanceTester(step_config)
+        tester.live = self.live
+        tester.samples = self.samples
+        return tester
+
+    async def _run_step(self, level: float) -> Dict:
+        tester = self._current = self._step_tester(level)
+        result = await tester.run()
+        self._step_summaries.append(tester.summary())
+        self._current = None
+
+        # Sends skipped by the in-flight cap were offered load the target never absorbed, so they count as errors.
+        offered = result.total_requests + result.missed_sends
+        error_rate = (result.failed_requests + result.missed_sends) / offered if offered else 1.0
+        step = {"level": level, "requests": result.total_requests, "achieved_rps": result.requests_per_second,
+                "average_response_time": result.average_response_time, "percentile_50": result.percentile_50,
+                "percentile_99": result.percentile_99, "error_rate": error_rate,
+                "missed_sends": result.missed_sends}
+        # Completed requests over the scheduled step length, so the drain of in-flight requests is not held against it.
+        saturated = (self.search.mode == "rps"
+                     and result.total_requests / self.search.step_duration < level * MIN_THROUGHPUT_RATIO)
+        step["within_slo"] = (result.successful_requests > 0 and result.percentile_99 <= self.search.max_p99
+                              and error_rate <= self.search.max_error_rate and not saturated)
+        return step
+
+    async def run(self):
+        if self.search.step_size <= 0:
+            raise ValueError("step_size must be positive for capacity search")
+
+        self.start_time = datetime.now()
+        steps: List[Dict] = []
+        self.test_result.capacity_steps = steps
+
+        level = self.search.start_level
+        while level <= self.search.max_level:
+            step = await self._run_step(level)
+            steps.append(step)
+            self.merge_summaries(self._step_summaries)
+            self.test_result.total_requests = self.request_count
+            logger.info(f"Capacity step at {level}: p99={step['percentile_99']:.4f}s, "
+                        f"errors={step['error_rate']:.2%}")
+            if not step["within_slo"]:
+                break
+            level += self.search.step_size
+
+        self._record_knee()
+        self.end_time = datetime.now()
+        self._calculate_metrics()
+        return self.test_result
+
+    def _record_knee(self):
+        """Report the step within the SLO that reached the highest throughput as the knee point"""
+        sustainable = [step for step in self.test_result.capacity_steps or [] if step["within_slo"]]
+        if sustainable:
+            knee = max(sustainable, key=lambda step: step["achieved_rps"])
+            self.test_result.capacity_knee = {"level": knee["level"], "max_sustainable_rps": knee["achieved_rps"],
+                                              "percentile_99": knee["percentile_99"],
+                                              "error_rate": knee["error_rate"]}
+
+    def finalize(self, status: str):
+        """Keep the completed steps and whatever the interrupted step recorded before it was stopped"""
+        if self._current is not None:
+            self.merge_summaries(self._step_summaries + [self._current.summary()])
+        self._record_knee()
+        super().finalize(status)
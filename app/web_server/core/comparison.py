@@ -0,0 +1,136 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.web_server.core.histogram import REPORTED_PERCENTILES, LatencyHistogram
+from app.web_server.models.comparison import RegressionThresholds
+from app.web_server.models.results import TestResult
+
+SIGNIFICANCE_LEVEL = 0.01  # p-value below which a difference is considered real rather than run-to-run noise
+MIN_RELATIVE_EFFECT = 0.02  # relative changes smaller than this are reported as unchanged, however significant
+
+
+def _delta(reference: float, candidate: float) -> Dict:
+    return {"reference": reference, "candidate": candidate, "delta": candidate - reference,
+            "relative": (candidate - reference) / reference if reference else None}
+
+
+def _verdict(change: Optional[float], p_value: Optional[float], min_effect: float = MIN_RELATIVE_EFFECT,
+             higher_is_worse: bool = True) -> str:
+    if change is None or p_value is None:
+        return "inconclusive"
+    if p_value >= SIGNIFICANCE_LEVEL or not change or abs(change) < min_effect:
+        return "unchanged"
+    return "regression" if (change > 0) == higher_is_worse else "improvement"
+
+
+def _histogram_counts(data: Optional[Dict]) -> Optional[np.ndarray]:
+    if not data:
+        return None
+    histogram = LatencyHistogram.from_dict(data)
+    return np.frombuffer(histogram.counts, dtype=np.int64).astype(np.float64) if histogram.count else None
+
+
+def mann_whitney(reference: np.ndarray, candidate: np.ndarray) -> Tuple[float, float]:
+    """Mann-Whitney U test on two histograms sharing a bucket layout, values in the same bucket counting as ties.
+
+    Returns the probability that a candidate latency exceeds a reference one (0.5 when both follow the same
+    distribution) and the two-sided p-value of the normal approximation with tie correction.
+    """
+    n1, n2 = reference.sum(), candidate.sum()
+    n = n1 + n2
+    u = float(np.dot(candidate, np.cumsum(reference) - reference / 2))
+    ties = reference + candidate
+    variance = n1 * n2 / 12 * (n + 1 - float(np.sum(ties ** 3 - ties)) / (n * (n - 1)))
+    if variance <= 0:
+        return u / (n1 * n2), 1.0
+    return u / (n1 * n2), math.erfc(abs(u - n1 * n2 / 2) / math.sqrt(variance) / math.sqrt(2))
+
+
+def welch(reference: np.ndarray, candidate: np.ndarray) -> Optional[float]:
+    """Two-sided p-value of Welch's t-test, with the normal approximation since series span many seconds"""
+    if len(reference) < 2 or len(candidate) < 2:
+        return None
+    difference = abs(candidate.mean() - reference.mean())
+    error = math.sqrt(reference.var(ddof=1) / len(reference) + candidate.var(ddof=1) / len(candidate))
+    if not error:
+        return 0.0 if difference else 1.0
+    return math.erfc(difference / error / math.sqrt(2))
+
+
+def two_proportions(failed_a: int, total_a: int, failed_b: int, total_b: int) -> Optional[float]:
+    """Two-sided p-value of the z-test for a difference between two error rates"""
+    if not total_a or not total_b:
+        return None
+    pooled = (failed_a + failed_b) / (total_a + total_b)
+    error = math.sqrt(pooled * (1 - pooled) * (1 / total_a + 1 / total_b))
+    if not error:
+        return 1.0
+    return math.erfc(abs(failed_b / total_b - failed_a / total_a) / error / math.sqrt(2))
+
+
+def _requests_per_second(timeline: Optional[List[Dict]]) -> np.ndarray:
+    """Per-second request counts, without the first and last seconds which are only partly covered by the test"""
+    requests = np.fromiter((bucket["requests"] for bucket in timeline or [] if not bucket.get("partial")),
+                           dtype=np.float64)
+    return requests[1:-1]
+
+
+def _error_rate(result: TestResult) -> float:
+    return result.failed_requests / result.total_requests if result.total_requests else 0
+
+
+def compare_results(reference: TestResult, candidate: TestResult) -> Dict:
+    """Compare a stored test against a reference one: percentile, throughput and error rate deltas with verdicts.
+
+    Latency distributions are compared with a Mann-Whitney test on the histograms, throughput with Welch's test on
+    the per-second request counts and error rates with a two-proportion test. A change is a regression or an
+    improvement only when it is both significant and at least ``MIN_RELATIVE_EFFECT`` large.
+    """
+    percentiles = {name: _delta(getattr(reference, name), getattr(candidate, name))
+                   for name in ("average_response_time", *REPORTED_PERCENTILES)}
+    probability_slower = latency_p_value = None
+    reference_counts = _histogram_counts(reference.latency_histogram)
+    candidate_counts = _histogram_counts(candidate.latency_histogram)
+    if reference_counts is not None and candidate_counts is not None and len(reference_counts) == len(
+            candidate_counts):
+        probability_slower, latency_p_value = mann_whitney(reference_counts, candidate_counts)
+
+    throughput_p_value = welch(_requests_per_second(reference.timeline), _requests_per_second(candidate.timeline))
+    throughput = _delta(reference.requests_per_second, candidate.requests_per_second)
+
+    errors_p_value = two_proportions(reference.failed_requests, reference.total_requests, candidate.failed_requests,
+                                     candidate.total_requests)
+    errors = _delta(_error_rate(reference), _error_rate(candidate))
+
+    return {"test_id": candidate.test_id, "reference_id": reference.test_id,
+            "latency": {"percentiles": percentiles, "probability_slower": probability_slower,
+                        "p_value": latency_p_value,
+                        "verdict": _verdict(percentiles["percentile_50"]["relative"], latency_p_value)},
+            "throughput": {**throughput, "p_value": throughput_p_value,
+                           "verdict": _verdict(throughput["relative"], throughput_p_value, higher_is_worse=False)},
+            "errors": {**errors, "p_value": errors_p_value,
+                       "verdict": _verdict(errors["delta"], errors_p_value, min_effect=0)},
+            "generator_bound": reference.generator_bound or candidate.generator_bound}
+
+
+def check_thresholds(comparison: Dict, thresholds: RegressionThresholds) -> List[str]:
+    """Describe every threshold a compared test exceeds; an empty list means it passed"""
+    latency, throughput, errors = comparison["latency"], comparison["throughput"], comparison["errors"]
+    checks = [("p50 latency", latency["percentiles"]["percentile_50"]["relative"], thresholds.max_p50_increase,
+               latency["p_value"]),
+              ("p99 latency", latency["percentiles"]["percentile_99"]["relative"], thresholds.max_p99_increase,
+               latency["p_value"]),
+              ("throughput", -throughput["relative"] if throughput["relative"] is not None else None,
+               thresholds.max_rps_decrease, throughput["p_value"]),
+              ("error rate", errors["delta"], thresholds.max_error_rate_increase, errors["p_value"])]
+
+    violations = []
+    for name, change, limit, p_value in checks:
+        if limit is None or change is None or change <= limit:
+            continue
+        if thresholds.require_significance and p_value is not None and p_value >= SIGNIFICANCE_LEVEL:
+            continue
+        violations.append(f"{name} worsened by {change:.1%} (limit {limit:.1%})")
+    return violations
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Type
+
+import httpx
+
+from app.web_server.core.base_tester import BaseTester
+from app.web_server.core.performance_tester import PerformanceTester
+from app.web_server.core.process_pool import check_shard_caps, shard_count, split_config
+from app.web_server.models.config import TestConfig
+
+logger = logging.getLogger(__name__)
+
+START_DELAY = 2.0  # seconds between dispatching a test and the shared start timestamp
+POLL_INTERVAL = 1.0  # seconds between summary polls to each agent
+LIVE_FINALIZE_DELAY = 10.0  # seconds to wait for every agent before finalizing a live bucket
+
+
+class AgentRegistry:
+    """Registry of the load generator agents known to the coordinator"""
+
+    def __init__(self):
+        self._agents: Dict[str, Dict] = {}
+
+    def register(self, url: str) -> Dict:
+        """Register an agent by its base URL, refreshing it if already known"""
+        url = url.rstrip("/")
+        self._agents[url] = {"url": url, "registered_at": datetime.now()}
+        return self._agents[url]
+
+    def unregister(self, url: str) -> bool:
+        """Remove an agent, returning whether it was registered"""
+        return self._agents.pop(url.rstrip("/"), None) is not None
+
+    def get_all(self) -> List[Dict]:
+        """Get all registered agents"""
+        return list(self._agents.values())
+
+
+class DistributedTester(BaseTester):
+    """Tester that fans one test out to remote agents and merges their metric summaries into one result"""
+
+    def __init__(self, config: TestConfig, tester_class: Type[BaseTester], agent_urls: List[str]):
+        if not agent_urls:
+            raise ValueError("At least one registered agent is required for distributed testing")
+        check_shard_caps(config, shard_count(config, len(agent_urls)) * max(config.workers, 1))
+        super().__init__(config)
+        self.tester_class = tester_class
+        self.agent_urls = agent_urls
+        self.test_result.test_type = tester_class.__name__
+        self.live.finalize_after = LIVE_FINALIZE_DELAY
+
+    async def _dispatch(self, client: httpx.AsyncClient, start_at: float, runs: Dict[str, str]):
+        """Send one shard to each agent, adding the run URL of every accepted shard to `runs` as it is accepted.
+
+        `runs` belongs to the caller, so the shards accepted before a failing agent can still be cancelled.
+        """
+        shards = split_config(self.config, len(self.agent_urls))
+        for index, (agent_url, shard) in enumerate(zip(self.agent_urls, shards)):
+            shard.update(workers=self.config.workers, distributed=False)
+            run_id = f"{self.test_id}_{index}"
+            response = await client.post(f"{agent_url}/runs", json={"run_id": run_id,
+                                                                    "tester": self.tester_class.__name__,
+                                                                    "config": shard, "start_at": start_at})
+            response.raise_for_status()
+            runs[run_id] = f"{agent_url}/runs/{run_id}"
+
+    async def _cancel_runs(self, client: httpx.AsyncClient, runs: Dict[str, str]):
+        """Ask every agent to stop its shard, ignoring agents that cannot be reached"""
+        await asyncio.gather(*(client.delete(url) for url in runs.values()), return_exceptions=True)
+
+    async def _forget_run(self, client: httpx.AsyncClient, url: str):
+        """Delete a collected run from its agent; an agent that cannot be reached evicts it on its own later"""
+        try:
+            await client.delete(url)
+        except httpx.HTTPError as e:
+            logger.warning(f"Could not delete agent run {url}: {e}")
+
+    async def _poll(self, client: httpx.AsyncClient, runs: Dict[str, str]) -> List[Dict]:
+        """Poll every agent until all shards finish, merging their latest summaries as progress.
+
+        Each finished run is deleted from its agent once its final summary is collected.
+        """
+        latest: Dict[str, Dict] = {}
+        pending = set(runs)
+        while pending:
+            await asyncio.sleep(POLL_INTERVAL)
+            for run_id in list(pending):
+                response = await client.get(runs[run_id])
+                response.raise_for_status()
+                status = response.json()
+                if status["status"] == "failed":
+                    raise RuntimeError(f"Agent run {run_id} failed: {status.get('error')}")
+                if status.get("summary"):
+                    latest[run_id] = status["summary"]
+                self.live.merge(status.get("live_buckets", []))
+                if status["status"] == "completed":
+                    pending.discard(run_id)
+                    await self._forget_run(client, runs[run_id])
+
+            self.merge_summaries(list(latest.values()))
+            self.test_result.total_requests = self.request_count
+            self.test_result.successful_requests = self.histogram.count
+            self.test_result.failed_requests = self.failed_count
+        return [latest[run_id] for run_id in runs]
+
+    async def run(self):
+        if self.tester_class is PerformanceTester and not self.config.duration:
+            raise ValueError("Duration is required for performance testing")
+
+        start_at = time.time() + START_DELAY
+        runs: Dict[str, str] = {}
+        async with httpx.AsyncClient(timeout=10) as client:
+            try:
+                await self._dispatch(client, start_at, runs)
+                self.start_time = datetime.fromtimestamp(start_at)
+                summaries = await self._poll(client, runs)
+            except (asyncio.CancelledError, Exception):
+                await self._cancel_runs(client, runs)
+                raise
+
+        self.merge_summaries(summaries)
+        # The duration spans the shards themselves, so late starting agents and polling delays are not counted
+        self.start_time = datetime.fromtimestamp(min(summary["started"] for summary in summaries))
+        self.end_time = datetime.fromtimestamp(max(summary["finished"] for summary in summaries))
+        self._calculate_metrics()
+        return self.test_result
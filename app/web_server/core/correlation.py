@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+TARGET_RESOURCES = ("cpu_percent", "memory_percent", "memory_used", "network_sent", "network_recv")
+CORRELATED_RESOURCES = ("cpu_percent", "memory_percent", "network_sent", "network_recv")
+CORRELATED_LATENCIES = ("mean", "p50", "p99")
+MIN_CORRELATED_SECONDS = 3  # seconds with both latency and target samples needed before a coefficient is reported
+
+
+def rows_to_columns(rows: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """Turn stored target samples (ISO timestamps) back into the timestamp and value columns of a TargetMonitor"""
+    timestamps = np.array([datetime.fromisoformat(row["timestamp"]).timestamp() for row in rows], dtype=np.float64)
+    values = np.array([[row[field] for field in TARGET_RESOURCES] for row in rows], dtype=np.float64)
+    return timestamps, values.reshape(len(rows), len(TARGET_RESOURCES))
+
+
+def per_second(timestamps: np.ndarray, values: np.ndarray) -> Dict[int, List[float]]:
+    """Average the samples of each epoch second, the granularity of the live latency buckets"""
+    if not len(timestamps):
+        return {}
+    seconds, inverse, counts = np.unique(np.floor(timestamps).astype(np.int64), return_inverse=True,
+                                         return_counts=True)
+    sums = np.zeros((len(seconds), values.shape[1]))
+    np.add.at(sums, inverse, values)
+    return dict(zip(seconds.tolist(), (sums / counts[:, None]).tolist()))
+
+
+def _pearson(x: np.ndarray, y: np.ndarray) -> Optional[float]:
+    if len(x) < MIN_CORRELATED_SECONDS or not x.std() or not y.std():
+        return None
+    return round(float(np.corrcoef(x, y)[0, 1]), 3)
+
+
+def correlate(buckets: List[Dict], timestamps: np.ndarray, values: np.ndarray) -> Dict:
+    """Join the per-second latency buckets with the target's resources averaged over the same seconds.
+
+    Returns one row per second present on both sides, and the Pearson coefficient of every correlated resource with
+    each latency statistic (over the seconds with at least one successful request) and with the error rate.
+    """
+    resources = per_second(timestamps, values)
+    rows = []
+    for bucket in buckets:
+        sample = resources.get(bucket["timestamp"])
+        if sample is None or bucket.get("partial"):
+            continue
+        row = {"timestamp": bucket["timestamp"], "requests": bucket["requests"], "errors": bucket["errors"],
+               "error_rate": bucket["error_rate"], **{name: bucket[name] for name in CORRELATED_LATENCIES}}
+        row.update(zip(TARGET_RESOURCES, sample))
+        rows.append(row)
+
+    answered = [row for row in rows if row["requests"] > row["errors"]]
+    coefficients = {}
+    for resource in CORRELATED_RESOURCES:
+        answered_values = np.array([row[resource] for row in answered])
+        coefficients[resource] = {latency: _pearson(answered_values, np.array([row[latency] for row in answered]))
+                                  for latency in CORRELATED_LATENCIES}
+        coefficients[resource]["error_rate"] = _pearson(np.array([row[resource] for row in rows]),
+                                                        np.array([row["error_rate"] for row in rows]))
+    return {"rows": rows, "coefficients": coefficients, "seconds": len(rows)}
@@ -0,0 +1,94 @@
+import math
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+DOWNSAMPLE_CACHE_SIZE = 64  # downsampled series kept per process, keyed by test, series, resolution and version
+
+
+def downsample(timestamps: np.ndarray, values: np.ndarray, max_points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Reduce a series to at most `max_points` rows while keeping its peaks and troughs.
+
+    Rows are split into ``max_points // 2`` equal buckets; each bucket becomes two rows, stamped with the bucket's
+    first and last timestamps, holding every column's minimum and maximum in the order they occurred. Each column is
+    reduced independently, so a spike in one metric survives even if other metrics peak elsewhere in the bucket.
+    """
+    count = len(timestamps)
+    if count <= max_points:
+        return timestamps, values
+
+    size = math.ceil(count / max(max_points // 2, 1))
+    buckets = math.ceil(count / size)
+    padded = np.full((buckets * size, values.shape[1]), np.nan)
+    padded[:count] = values
+    shaped = padded.reshape(buckets, size, values.shape[1])
+
+    low_at = np.nanargmin(shaped, axis=1)
+    high_at = np.nanargmax(shaped, axis=1)
+    low = np.take_along_axis(shaped, low_at[:, None, :], axis=1)[:, 0, :]
+    high = np.take_along_axis(shaped, high_at[:, None, :], axis=1)[:, 0, :]
+    low_first = low_at <= high_at
+
+    reduced = np.empty((buckets * 2, values.shape[1]))
+    reduced[0::2] = np.where(low_first, low, high)
+    reduced[1::2] = np.where(low_first, high, low)
+    reduced_timestamps = np.empty(buckets * 2, dtype=timestamps.dtype)
+    reduced_timestamps[0::2] = timestamps[::size]
+    reduced_timestamps[1::2] = timestamps[np.minimum(np.arange(1, buckets + 1) * size, count) - 1]
+    return reduced_timestamps, reduced
+
+
+def downsample_rows(rows: List[Dict], max_points: int, time_field: str = "timestamp",
+                    iso_timestamps: bool = False) -> List[Dict]:
+    """Downsample a list of row dicts sharing numeric fields, e.g. stored resource samples or live buckets"""
+    if len(rows) <= max_points:
+        return rows
+
+    first = rows[0]
+    fields = [field for field in first if field != time_field and isinstance(first[field], (int, float))
+              and not isinstance(first[field], bool)]
+    values = np.array([[row.get(field, np.nan) for field in fields] for row in rows], dtype=float)
+    integral = np.all(np.isnan(values) | (values == np.round(values)), axis=0)
+    timestamps = np.array([row[time_field] for row in rows], dtype="datetime64[us]" if iso_timestamps else None)
+    timestamps, values = downsample(timestamps, values, max_points)
+    times = np.datetime_as_string(timestamps, unit="us").tolist() if iso_timestamps else timestamps.tolist()
+    return columns_to_rows(times, values, fields, time_field, [field for field, is_int in zip(fields, integral)
+                                                              if is_int])
+
+
+def columns_to_rows(times: List, values: np.ndarray, fields: Sequence[str], time_field: str = "timestamp",
+                    int_fields: Iterable[str] = ()) -> List[Dict]:
+    """Turn downsampled columns back into the row dicts the API returns, restoring integer fields"""
+    rows = [{time_field: time, **dict(zip(fields, row))} for time, row in zip(times, values.tolist())]
+    for field in int_fields:
+        for row in rows:
+            row[field] = int(row[field]) if row[field] == row[field] else 0
+    return rows
+
+
+class DownsampleCache:
+    """Small LRU of downsampled series.
+
+    The key includes a version (e.g. the sampler sequence number of a running test) so a growing series is
+    recomputed when it changes, while the series of a finished test is computed once per resolution.
+    """
+
+    def __init__(self, max_entries: int = DOWNSAMPLE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], List[Dict]]) -> List[Dict]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
@@ -0,0 +1,134 @@
+import socket
+import ssl
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+
+from app.web_server.core.histogram import LatencyHistogram
+
+MAX_ERROR_CLASSES = 32  # distinct error classes tracked; any further class is counted as OVERFLOW_CLASS
+OVERFLOW_CLASS = "other"
+MAX_MESSAGE_LENGTH = 200  # characters kept of the first message seen in each class
+ERROR_HISTOGRAM_DIGITS = 1  # coarse precision keeps one latency histogram per class small
+ERROR_PERCENTILES = {"p50": 50.0, "p90": 90.0, "p99": 99.0}
+
+_TIMEOUT_CLASSES = {httpx.ConnectTimeout: "connect_timeout", httpx.ReadTimeout: "read_timeout",
+                    httpx.WriteTimeout: "write_timeout", httpx.PoolTimeout: "pool_timeout"}
+
+
+def _causes(error: BaseException) -> List[BaseException]:
+    """The exception followed by its explicit and implicit causes, as raised through httpx and httpcore"""
+    chain = []
+    while error is not None and error not in chain:
+        chain.append(error)
+        error = error.__cause__ or error.__context__
+    return chain
+
+
+def classify_exception(error: BaseException) -> str:
+    """Map a request exception to a bounded error class, ignoring its message (which may hold URLs or IDs)"""
+    if isinstance(error, httpx.TimeoutException):
+        return _TIMEOUT_CLASSES.get(type(error), "timeout")
+
+    chain = _causes(error)
+    if any(isinstance(cause, ssl.SSLError) for cause in chain):
+        return "tls"
+    if any(isinstance(cause, socket.gaierror) for cause in chain):
+        return "dns"
+    if any(isinstance(cause, ConnectionRefusedError) for cause in chain) or (
+            isinstance(error, httpx.ConnectError) and "refused" in str(error).lower()):
+        return "connect_refused"
+    if any(isinstance(cause, ConnectionResetError) for cause in chain) or "reset by peer" in str(error).lower():
+        return "connection_reset"
+    if isinstance(error, httpx.ConnectError):
+        return "connect_error"
+    if isinstance(error, httpx.RemoteProtocolError):
+        return "protocol_error"
+    if isinstance(error, httpx.NetworkError):
+        return "network_error"
+    return type(error).__name__
+
+
+class ErrorTaxonomy:
+    """Bounded accounting of failed requests by normalized error class, plus a count of every HTTP status code.
+
+    Each class keeps its count, first and last seen times, the first message seen (truncated) and a coarse latency
+    histogram, so the cost per request is constant and memory is bounded by ``MAX_ERROR_CLASSES`` however many
+    distinct messages the target or the network produce.
+    """
+
+    def __init__(self):
+        self.classes: Dict[str, Dict] = {}
+        self.status_codes: Dict[str, int] = {}
+
+    def _entry(self, name: str, first_seen: float, message: str) -> Dict:
+        entry = self.classes.get(name)
+        if entry is None:
+            if len(self.classes) >= MAX_ERROR_CLASSES:
+                name = OVERFLOW_CLASS
+                entry = self.classes.get(name)
+            if entry is None:
+                entry = self.classes[name] = {"name": name, "count": 0, "first_seen": first_seen,
+                                              "last_seen": first_seen, "message": message[:MAX_MESSAGE_LENGTH],
+                                              "latency": LatencyHistogram(ERROR_HISTOGRAM_DIGITS)}
+        return entry
+
+    def record(self, name: str, latency: Optional[float], message: str = "") -> str:
+        """Count one failure of class `name`, returning the class it was counted under"""
+        now = time.time()
+        entry = self._entry(name, now, message)
+        entry["count"] += 1
+        entry["last_seen"] = now
+        if latency is not None:
+            entry["latency"].record(latency)
+        return entry["name"]
+
+    def record_status(self, status_code: int):
+        key = str(status_code)
+        self.status_codes[key] = self.status_codes.get(key, 0) + 1
+
+    def record_response(self, status_code: int, latency: float) -> str:
+        """Count a non-2xx response under its ``http_<status>`` class"""
+        return self.record(f"http_{status_code}", latency, f"HTTP {status_code}")
+
+    def record_exception(self, error: BaseException, latency: Optional[float]) -> str:
+        return self.record(classify_exception(error), latency, f"{type(error).__name__}: {error}")
+
+    def to_dict(self) -> Dict:
+        return {"classes": {name: dict(entry, latency=entry["latency"].to_dict())
+                            for name, entry in self.classes.items()},
+                "status_codes": dict(self.status_codes)}
+
+    def merge_dict(self, data: Optional[Dict]):
+        """Merge the taxonomy of another generator: counts add up and the seen times widen"""
+        if not data:
+            return
+        for name, other in data["classes"].items():
+            entry = self._entry(name, other["first_seen"], other["message"])
+            entry["count"] += other["count"]
+            entry["first_seen"] = min(entry["first_seen"], other["first_seen"])
+            entry["last_seen"] = max(entry["last_seen"], other["last_seen"])
+            entry["latency"].merge(LatencyHistogram.from_dict(other["latency"]))
+        for status_code, count in data["status_codes"].items():
+            self.status_codes[status_code] = self.status_codes.get(status_code, 0) + count
+
+    def metrics(self) -> Dict:
+        """Error classes, most frequent first, with their share of failures and latency, and the status code counts"""
+        failures = sum(entry["count"] for entry in self.classes.values())
+        classes = []
+        for entry in sorted(self.classes.values(), key=lambda entry: entry["count"], reverse=True):
+            histogram = entry["latency"]
+            classes.append({"name": entry["name"], "count": entry["count"], "share": entry["count"] / failures,
+                            "first_seen": datetime.fromtimestamp(entry["first_seen"]).isoformat(),
+                            "last_seen": datetime.fromtimestamp(entry["last_seen"]).isoformat(),
+                            "message": entry["message"],
+                            "latency": {"mean": histogram.mean, "max": histogram.max or 0,
+                                        **histogram.percentiles(ERROR_PERCENTILES)}})
+        return {"classes": classes, "status_codes": dict(sorted(self.status_codes.items()))}
+
+    def descriptions(self, limit: int) -> List[str]:
+        """One line per error class, most frequent first, e.g. ``read_timeout (42x): ReadTimeout: timed out``"""
+        entries = sorted(self.classes.values(), key=lambda entry: entry["count"], reverse=True)[:limit]
+        return [f"{entry['name']} ({entry['count']}x): {entry['message']}" for entry in entries]
@@ -0,0 +1,87 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from app.web_server.core.histogram import LatencyHistogram
+
+LAG_SAMPLE_INTERVAL = 0.1  # seconds between event-loop lag probes
+LAG_HISTOGRAM_HIGHEST = 60.0  # seconds
+LOOP_LAG_P99_THRESHOLD = 0.05  # seconds of scheduling delay above which measured latencies are unreliable
+CPU_PERCENT_THRESHOLD = 90.0  # average share of one core used by a generator's event loop thread
+POOL_WAIT_P99_THRESHOLD = 0.05  # seconds requests waited for a pooled connection
+
+
+class GeneratorHealth:
+    """Self-instrumentation of a load generator: event-loop lag, requests in flight and loop thread CPU.
+
+    While sampling, a probe task sleeps for ``LAG_SAMPLE_INTERVAL`` and records how late it wakes up. A saturated
+    loop adds the same delay to every response time it measures, so high lag, a loop thread pinned near a full core,
+    or requests queueing for pooled connections flag the test as generator-bound. CPU is measured with
+    ``time.thread_time()`` on the loop thread, so other tests running in the same process are not counted.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.lag = LatencyHistogram(2, LAG_HISTOGRAM_HIGHEST)
+        self.cpu_percent = 0.0
+        self.max_cpu_percent = 0.0
+
+    async def _probe(self, live):
+        started_wall = last_wall = time.perf_counter()
+        started_cpu = last_cpu = time.thread_time()
+        while True:
+            expected = time.perf_counter() + LAG_SAMPLE_INTERVAL
+            await asyncio.sleep(LAG_SAMPLE_INTERVAL)
+            now = time.perf_counter()
+            cpu = time.thread_time()
+            lag = max(now - expected, 0)
+
+            self.lag.record(lag)
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.max_cpu_percent = max(self.max_cpu_percent, (cpu - last_cpu) / (now - last_wall) * 100)
+            self.cpu_percent = (cpu - started_cpu) / (now - started_wall) * 100
+            last_wall, last_cpu = now, cpu
+            if live is not None:
+                live.record_generator(lag, self.in_flight)
+
+    @asynccontextmanager
+    async def sampling(self, live=None):
+        """Probe the running loop for the duration of the block, reporting each probe to `live` when given"""
+        probe = asyncio.create_task(self._probe(live))
+        try:
+            yield self
+        finally:
+            probe.cancel()
+
+    def to_dict(self) -> Dict:
+        return {"lag": self.lag.to_dict(), "in_flight": self.in_flight, "peak_in_flight": self.peak_in_flight,
+                "cpu_percent": self.cpu_percent, "max_cpu_percent": self.max_cpu_percent}
+
+    def merge_dict(self, data: Optional[Dict]):
+        """Merge the signals of another generator: lag is combined, requests in flight add up, CPU keeps the worst"""
+        if not data:
+            return
+        self.lag.merge(LatencyHistogram.from_dict(data["lag"]))
+        self.in_flight += data["in_flight"]
+        self.peak_in_flight += data["peak_in_flight"]
+        self.cpu_percent = max(self.cpu_percent, data["cpu_percent"])
+        self.max_cpu_percent = max(self.max_cpu_percent, data["max_cpu_percent"])
+
+    def metrics(self, pool_wait: Optional[LatencyHistogram] = None) -> Dict:
+        """Summarize the signals and flag the generator as the bottleneck when any threshold is crossed"""
+        lag_p99 = self.lag.value_at_percentile(99.0)
+        pool_wait_p99 = pool_wait.value_at_percentile(99.0) if pool_wait is not None else 0
+        reasons = []
+        if lag_p99 > LOOP_LAG_P99_THRESHOLD:
+            reasons.append(f"event-loop lag p99 of {lag_p99 * 1000:.0f} ms")
+        if self.cpu_percent > CPU_PERCENT_THRESHOLD:
+            reasons.append(f"event-loop thread at {self.cpu_percent:.0f}% CPU")
+        if pool_wait_p99 > POOL_WAIT_P99_THRESHOLD:
+            reasons.append(f"connection pool wait p99 of {pool_wait_p99 * 1000:.0f} ms")
+
+        return {"loop_lag_mean": self.lag.mean, "loop_lag_p99": lag_p99, "loop_lag_max": self.lag.max or 0,
+                "in_flight": self.in_flight, "peak_in_flight": self.peak_in_flight, "cpu_percent": self.cpu_percent,
+                "max_cpu_percent": self.max_cpu_percent, "pool_wait_p99": pool_wait_p99,
+                "generator_bound": bool(reasons), "reasons": reasons}
@@ -0,0 +1,151 @@
+import math
+from array import array
+from typing import Dict, Iterable, Optional
+
+UNITS_PER_SECOND = 1_000_000  # values are stored as integer microseconds
+DEFAULT_HIGHEST_TRACKABLE = 3600.0  # seconds
+
+REPORTED_PERCENTILES = {"percentile_50": 50.0, "percentile_75": 75.0, "percentile_90": 90.0,
+                        "percentile_95": 95.0, "percentile_99": 99.0, "percentile_99_9": 99.9}
+
+
+class LatencyHistogram:
+    """Fixed-size, log-bucketed latency histogram in the style of HdrHistogram.
+
+    Memory depends only on the precision and the trackable range, never on the number of recorded values. Each
+    recorded value keeps ``significant_digits`` decimal digits of precision; values above the trackable range are
+    clamped into the last bucket, while the exact min, max and sum are tracked separately.
+    """
+
+    def __init__(self, significant_digits: int = 2, highest_trackable: float = DEFAULT_HIGHEST_TRACKABLE):
+        if not 1 <= significant_digits <= 5:
+            raise ValueError("significant_digits must be between 1 and 5")
+
+        self.significant_digits = significant_digits
+        self.highest_trackable = highest_trackable
+
+        sub_bucket_count = 2 ** math.ceil(math.log2(2 * 10 ** significant_digits))
+        self._sub_bucket_magnitude = sub_bucket_count.bit_length() - 1
+        self._sub_bucket_half_magnitude = self._sub_bucket_magnitude - 1
+        self._sub_bucket_half_count = sub_bucket_count // 2
+        self._highest_units = max(int(highest_trackable * UNITS_PER_SECOND), sub_bucket_count)
+
+        bucket_count = max(self._highest_units.bit_length() - self._sub_bucket_magnitude, 0) + 1
+        self.counts = array("q", bytes(8 * (bucket_count + 1) * self._sub_bucket_half_count))
+
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _index_for(self, units: int) -> int:
+        bucket_index = max(units.bit_length() - self._sub_bucket_magnitude, 0)
+        sub_bucket_index = units >> bucket_index
+        return ((bucket_index + 1) << self._sub_bucket_half_magnitude) + sub_bucket_index - self._sub_bucket_half_count
+
+    def _highest_equivalent(self, index: int) -> int:
+        bucket_index = (index >> self._sub_bucket_half_magnitude) - 1
+        sub_bucket_index = (index & (self._sub_bucket_half_count - 1)) + self._sub_bucket_half_count
+        if bucket_index < 0:
+            sub_bucket_index -= self._sub_bucket_half_count
+            bucket_index = 0
+        return ((sub_bucket_index + 1) << bucket_index) - 1
+
+    def record(self, value: float, count: int = 1):
+        """Record a latency in seconds"""
+        units = min(max(int(value * UNITS_PER_SECOND), 0), self._highest_units)
+        self.counts[self._index_for(units)] += count
+        self.count += count
+        self.total += value * count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add all values recorded in another histogram with the same layout into this one"""
+        if len(other.counts) != len(self.counts) or other.significant_digits != self.significant_digits:
+            raise ValueError("Cannot merge histograms with different precision or range")
+
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+        return self
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0
+
+    def value_at_percentile(self, percentile: float) -> float:
+        """Return the value (in seconds) below which the given percentage of recorded values fall"""
+        if not self.count:
+            return 0
+        if percentile >= 100.0:
+            return self.max
+
+        target = max(math.ceil(self.count * min(percentile, 100.0) / 100.0), 1)
+        running = 0
+        for index, count in enumerate(self.counts):
+            running += count
+            if running >= target:
+                value = self._highest_equivalent(index) / UNITS_PER_SECOND
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def percentiles(self, percentiles: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        """Return several percentiles in a single pass over the buckets"""
+        percentiles = percentiles or REPORTED_PERCENTILES
+        if not self.count:
+            return {name: 0 for name in percentiles}
+
+        targets = sorted((max(math.ceil(self.count * p / 100.0), 1), name) for name, p in percentiles.items())
+        values = {}
+        running = 0
+        position = 0
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            running += count
+            while position < len(targets) and running >= targets[position][0]:
+                value = self._highest_equivalent(index) / UNITS_PER_SECOND
+                values[targets[position][1]] = min(max(value, self.min), self.max)
+                position += 1
+            if position == len(targets):
+                break
+        for _, name in targets[position:]:
+            values[name] = self.max
+        return values
+
+    def to_dict(self) -> Dict:
+        """Serialize into a compact, JSON-friendly dictionary holding only the non-empty buckets"""
+        return {"significant_digits": self.significant_digits, "highest_trackable": self.highest_trackable,
+                "count": self.count, "total": self.total, "min": self.min, "max": self.max,
+                "counts": {str(index): count for index, count in enumerate(self.counts) if count}}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LatencyHistogram":
+        """Rebuild a histogram serialized with `to_dict`"""
+        histogram = cls(data["significant_digits"], data.get("highest_trackable", DEFAULT_HIGHEST_TRACKABLE))
+        for index, count in data.get("counts", {}).items():
+            histogram.counts[int(index)] = count
+        histogram.count = data.get("count", 0)
+        histogram.total = data.get("total", 0.0)
+        histogram.min = data.get("min")
+        histogram.max = data.get("max")
+        return histogram
+
+    @classmethod
+    def merged(cls, histograms: Iterable["LatencyHistogram"]) -> Optional["LatencyHistogram"]:
+        """Merge several histograms into a new one, or return None when there are none"""
+        result = None
+        for histogram in histograms:
+            if result is None:
+                result = cls(histogram.significant_digits, histogram.highest_trackable)
+            result.merge(histogram)
+        return result
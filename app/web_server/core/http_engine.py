@@ -0,0 +1,505 @@
+import asyncio
+import json
+import ssl
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.web_server.core.http_phases import PhaseTrace
+from app.web_server.models.config import TestConfig
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+EVENT_LOOP = "uvloop" if uvloop is not None else "asyncio"
+
+USER_AGENT = "non-functional-tester"
+MAX_HEADER_BYTES = 64 * 1024  # response head size above which the raw engine gives up on a response
+TARGET_CACHE_SIZE = 1024  # parsed URLs kept by the raw engine; scenario URLs with variables are cleared past this
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+_CHUNKED = -1  # body lengths of the raw parser that are not a Content-Length
+_UNTIL_CLOSE = -2
+
+
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """Create an event loop, using uvloop when it is installed"""
+    return uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+
+
+def run(main):
+    """Run a coroutine on a fresh event loop like ``asyncio.run``, using uvloop when it is installed"""
+    return uvloop.run(main) if uvloop is not None else asyncio.run(main)
+
+
+class HttpEngine(ABC):
+    """Interface of the HTTP clients a tester sends its requests through, used as an async context manager"""
+
+    @abstractmethod
+    async def request(self, method: str, url: str, headers: Optional[Dict] = None, content=None,
+                      trace: Optional[PhaseTrace] = None):
+        """Send one request and read the whole response, timestamping its phases on `trace`.
+
+        The response exposes ``status_code``, ``is_success``, ``headers``, ``content`` and ``json()``. Failures raise
+        the httpx exception types, so every engine is classified the same way by the error taxonomy.
+        """
+
+    @abstractmethod
+    async def aclose(self):
+        """Close every pooled connection"""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+class HttpxEngine(HttpEngine):
+    """Engine backed by ``httpx.AsyncClient``: HTTP/1.1 and HTTP/2, redirects off, phases from the trace extension"""
+
+    def __init__(self, config: TestConfig, max_connections: Optional[int]):
+        limits = httpx.Limits(max_connections=max_connections,
+                              max_keepalive_connections=max_connections if config.keep_alive else 0)
+        timeout = httpx.Timeout(connect=config.connect_timeout, read=config.read_timeout,
+                                write=config.write_timeout, pool=config.pool_timeout)
+        self.client = httpx.AsyncClient(limits=limits, timeout=timeout, http2=config.http2)
+
+    async def request(self, method: str, url: str, headers: Optional[Dict] = None, content=None,
+                      trace: Optional[PhaseTrace] = None):
+        return await self.client.request(method, url, headers=headers, content=content,
+                                         extensions={"trace": trace} if trace is not None else None)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class RawResponse:
+    """Response read by the raw engine; headers are only parsed when first accessed"""
+    __slots__ = ("status_code", "content", "_head", "_headers")
+
+    def __init__(self, status_code: int, head: bytes, content: bytes):
+        self.status_code = status_code
+        self.content = content
+        self._head = head
+        self._headers = None
+
+    @property
+    def is_success(self) -> bool:
+        return 200 <= self.status_code < 300
+
+    @property
+    def headers(self) -> httpx.Headers:
+        if self._headers is None:
+            lines = self._head.split(b"\r\n") if self._head else []
+            self._headers = httpx.Headers([(name.strip(), value.strip())
+                                           for name, _, value in (line.partition(b":") for line in lines)])
+        return self._headers
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def _header(head: bytes, name: bytes) -> Optional[bytes]:
+    """Value of header `name` in a lowercased response head that starts with CRLF, or None"""
+    start = head.find(b"\n" + name + b":")
+    if start < 0:
+        return None
+    start += len(name) + 2
+    end = head.find(b"\r", start)
+    return head[start:end if end >= 0 else len(head)].strip()
+
+
+class _Connection(asyncio.Protocol):
+    """One HTTP/1.1 connection of the raw engine, with its in-flight requests answered in order"""
+
+    def __init__(self, pool: "_Pool", read_timeout: float, reusable: bool):
+        self.pool = pool
+        self.read_timeout = read_timeout
+        self.reusable = reusable
+        self.listed = False  # whether the connection is in the pool's `available` stack
+        self.closed = False
+        self.transport = None
+        self.pending = deque()  # (future, trace, head request) of every request sent and not answered yet
+        self.buffer = bytearray()
+        self._loop = asyncio.get_running_loop()
+        self._last_activity = 0.0
+        self._timer = None
+        self._reset()
+
+    def _reset(self):
+        self._status = None
+        self._head = b""
+        self._length = 0
+        self._keep = True
+        self._chunks = []
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data: bytes):
+        self.buffer += data
+        self._last_activity = self._loop.time()
+        try:
+            self._parse()
+        except httpx.RemoteProtocolError as error:
+            self._fail(error)
+            self.transport.abort()
+
+    def connection_lost(self, exc: Optional[Exception]):
+        self.closed = True
+        self.pool.connections.discard(self)
+        self.pool.wake()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._status is not None and self._length == _UNTIL_CLOSE and exc is None:
+            self._complete(bytes(self.buffer))
+        if exc is not None:
+            error = httpx.ReadError(str(exc))
+            error.__cause__ = exc
+        elif self._status is not None:
+            error = httpx.RemoteProtocolError("peer closed connection without sending complete message body")
+        else:
+            error = httpx.RemoteProtocolError("Server disconnected without sending a response.")
+        self._fail(error)
+
+    def _fail(self, error: Exception):
+        while self.pending:
+            future = self.pending.popleft()[0]
+            if not future.done():
+                future.set_exception(error)
+        self._reset()
+
+    def _check_timeout(self):
+        self._timer = None
+        if not self.pending:
+            return
+        remaining = self._last_activity + self.read_timeout - self._loop.time()
+        if remaining > 0:
+            self._timer = self._loop.call_later(remaining, self._check_timeout)
+            return
+        self._fail(httpx.ReadTimeout("timed out"))
+        self.transport.abort()
+
+    async def send(self, data: bytes, trace: PhaseTrace, head: bool):
+        future = self._loop.create_future()
+        self.pending.append((future, trace, head))
+        trace.mark("send_request_headers.started")
+        self.transport.write(data)
+        self._last_activity = self._loop.time()
+        if self._timer is None:
+            self._timer = self._loop.call_later(self.read_timeout, self._check_timeout)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            # the response would arrive for a request nobody waits for; like httpx, drop the connection instead
+            self.transport.abort()
+            raise
+
+    def _parse(self):
+        buffer = self.buffer
+        while self.pending:
+            if self._status is None and not self._parse_head():
+                return
+            if self._length >= 0:
+                if len(buffer) < self._length:
+                    return
+                body = bytes(buffer[:self._length])
+                del buffer[:self._length]
+            elif self._length == _CHUNKED:
+                body = self._parse_chunks()
+                if body is None:
+                    return
+            else:
+                return
+            self._complete(body)
+
+    def _parse_head(self) -> bool:
+        """Consume the status line and headers of the next response, returning False until they are complete"""
+        buffer = self.buffer
+        while True:
+            end = buffer.find(b"\r\n\r\n")
+            if end < 0:
+                if len(buffer) > MAX_HEADER_BYTES:
+                    raise httpx.RemoteProtocolError("Response headers too large")
+                return False
+            status_line, _, head = bytes(buffer[:end]).partition(b"\r\n")
+            del buffer[:end + 4]
+            version = status_line[:8]
+            try:
+                status = int(status_line[9:12])
+            except ValueError:
+                raise httpx.RemoteProtocolError(f"Invalid status line: {status_line[:100]!r}")
+            if not version.startswith(b"HTTP/1."):
+                raise httpx.RemoteProtocolError(f"Unsupported HTTP version: {version!r}")
+            if 100 <= status < 200 and status != 101:
+                continue
+            break
+
+        _, trace, head_request = self.pending[0]
+        trace.mark("receive_response_headers.complete")
+        lowered = b"\r\n" + head.lower()
+        connection = _header(lowered, b"connection") or b""
+        self._keep = b"close" not in connection if version == b"HTTP/1.1" else b"keep-alive" in connection
+        content_length = _header(lowered, b"content-length")
+        if head_request or status in (204, 304):
+            self._length = 0
+        elif b"chunked" in (_header(lowered, b"transfer-encoding") or b""):
+            self._length = _CHUNKED
+        elif content_length is not None:
+            try:
+                self._length = int(content_length)
+            except ValueError:
+                raise httpx.RemoteProtocolError(f"Invalid Content-Length: {content_length[:100]!r}")
+        else:
+            self._length = _UNTIL_CLOSE
+            self._keep = False
+        self._status = status
+        self._head = head
+        return True
+
+    def _parse_chunks(self) -> Optional[bytes]:
+        """Consume the chunks received so far, returning the body once the last chunk and trailers arrived"""
+        buffer = self.buffer
+        while True:
+            line_end = buffer.find(b"\r\n")
+            if line_end < 0:
+                return None
+            try:
+                size = int(bytes(buffer[:line_end]).split(b";", 1)[0], 16)
+            except ValueError:
+                raise httpx.RemoteProtocolError("Invalid chunk size")
+            if not size:
+                if len(buffer) < line_end + 4:
+                    return None
+                end = line_end + 4
+                if buffer[line_end + 2:end] != b"\r\n":
+                    end = buffer.find(b"\r\n\r\n", line_end + 2)
+                    if end < 0:
+                        return None
+                    end += 4
+                del buffer[:end]
+                return b"".join(self._chunks)
+            if len(buffer) < line_end + 2 + size + 2:
+                return None
+            self._chunks.append(bytes(buffer[line_end + 2:line_end + 2 + size]))
+            del buffer[:line_end + 2 + size + 2]
+
+    def _complete(self, body: bytes):
+        future, trace, _ = self.pending.popleft()
+        trace.mark("receive_response_body.complete")
+        response = RawResponse(self._status, self._head, body)
+        keep = self._keep
+        self._reset()
+        if not future.done():
+            future.set_result(response)
+        if not keep or not self.reusable:
+            self.reusable = False
+            if not self.pending:
+                self.transport.close()
+        else:
+            self.pool.release(self)
+
+
+class _Pool:
+    """Connections to one origin: a semaphore of request slots (None when unbounded), a stack of connections with
+    spare capacity and the requests waiting for one when no more connections may be opened"""
+    __slots__ = ("slots", "available", "connections", "opening", "waiters")
+
+    def __init__(self, slots: Optional[int]):
+        self.slots = asyncio.Semaphore(slots) if slots is not None else None
+        self.available = deque()
+        self.connections = set()
+        self.opening = 0  # connections being opened, counted against the connection limit
+        self.waiters = deque()
+
+    def release(self, connection: _Connection):
+        """List a connection that can take one more request again, waking a request waiting for one"""
+        if not connection.listed:
+            self.available.append(connection)
+            connection.listed = True
+        self.wake()
+
+    def wake(self):
+        """Let the oldest waiting request look for a connection again (or open one after a connection closed)"""
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def connection(self, depth: int) -> Optional[_Connection]:
+        """Most recently used open connection that can take one more request, or None to open a new one"""
+        available = self.available
+        while available:
+            connection = available[-1]
+            if connection.closed or not connection.reusable:
+                available.pop()
+                connection.listed = False
+                continue
+            if len(connection.pending) + 1 >= depth:
+                available.pop()
+                connection.listed = False
+            return connection
+        return None
+
+
+class RawEngine(HttpEngine):
+    """Lean HTTP/1.1 engine on asyncio protocols, for generating more load per core than httpx.
+
+    Requests are encoded to bytes once and reused while the method, URL, headers and body objects stay the same (the
+    configured request of a plain test), and responses are parsed only as far as the status line and the headers
+    that delimit the body (Content-Length, chunked encoding or connection close). With `pipelining` above 1, up to
+    that many requests are written on a connection before their responses arrive; only use it with targets that
+    support HTTP/1.1 pipelining. The body is not decompressed, so requests ask for ``identity`` encoding. Like httpx,
+    a `max_connections` of None leaves the number of connections unbounded.
+    """
+
+    def __init__(self, config: TestConfig, max_connections: Optional[int]):
+        if config.http2:
+            raise ValueError("The raw HTTP engine only supports HTTP/1.1")
+        if config.pipelining < 1:
+            raise ValueError("pipelining must be at least 1")
+        self.keep_alive = config.keep_alive
+        self.depth = config.pipelining if config.keep_alive else 1
+        self.max_connections = max_connections
+        self.connect_timeout = config.connect_timeout
+        self.read_timeout = config.read_timeout
+        self.pool_timeout = config.pool_timeout
+        self._pools: Dict[Tuple, _Pool] = {}
+        self._targets: Dict[str, Tuple] = {}
+        self._encoded = None
+        self._ssl_context = None
+
+    def _target(self, url: str) -> Tuple:
+        """(origin, host, port, TLS, request target, Host header) of a URL"""
+        target = self._targets.get(url)
+        if target is None:
+            parts = urlsplit(url)
+            if parts.scheme not in DEFAULT_PORTS:
+                raise httpx.UnsupportedProtocol(f"Request URL has an unsupported protocol '{parts.scheme}://'.")
+            if not parts.hostname:
+                raise httpx.LocalProtocolError(f"Request URL is missing a host: {url!r}")
+            port = parts.port or DEFAULT_PORTS[parts.scheme]
+            path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+            target = ((parts.scheme, parts.hostname, port), parts.hostname, port, parts.scheme == "https", path,
+                      parts.netloc.rpartition("@")[2])
+            if len(self._targets) >= TARGET_CACHE_SIZE:
+                self._targets.clear()
+            self._targets[url] = target
+        return target
+
+    def _encode(self, method: str, url: str, headers: Optional[Dict], content) -> bytes:
+        encoded = self._encoded
+        if encoded is not None and encoded[1] is url and encoded[2] is headers and encoded[3] is content and (
+                encoded[0] == method):
+            return encoded[4]
+
+        _, _, _, _, path, host = self._target(url)
+        body = content.encode() if isinstance(content, str) else content
+        fields = {"host": ("Host", host), "accept": ("Accept", "*/*"),
+                  "accept-encoding": ("Accept-Encoding", "identity"),
+                  "connection": ("Connection", "keep-alive" if self.keep_alive else "close"),
+                  "user-agent": ("User-Agent", USER_AGENT)}
+        if body:
+            fields["content-length"] = ("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            fields[name.lower()] = (name, value)
+        head = f"{method} {path} HTTP/1.1\r\n" + "".join(f"{name}: {value}\r\n" for name, value in fields.values())
+        data = head.encode("latin-1") + b"\r\n" + (body or b"")
+        self._encoded = (method, url, headers, content, data)
+        return data
+
+    async def _connect(self, pool: _Pool, host: str, port: int, tls: bool, trace: PhaseTrace) -> _Connection:
+        loop = asyncio.get_running_loop()
+        if tls and self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+        trace.mark("connect_tcp.started")
+        try:
+            _, connection = await asyncio.wait_for(
+                loop.create_connection(lambda: _Connection(pool, self.read_timeout, self.keep_alive), host, port,
+                                       ssl=self._ssl_context if tls else None, server_hostname=host if tls else None),
+                self.connect_timeout)
+        except asyncio.TimeoutError as error:
+            raise httpx.ConnectTimeout("timed out") from error
+        except OSError as error:
+            raise httpx.ConnectError(str(error)) from error
+        trace.mark("connect_tcp.complete")
+        pool.connections.add(connection)
+        if self.depth > 1:
+            pool.release(connection)
+        return connection
+
+    async def request(self, method: str, url: str, headers: Optional[Dict] = None, content=None,
+                      trace: Optional[PhaseTrace] = None):
+        trace = trace if trace is not None else PhaseTrace()
+        data = self._encode(method, url, headers, content)
+        origin, host, port, tls, _, _ = self._target(url)
+        pool = self._pools.get(origin)
+        if pool is None:
+            slots = self.max_connections * self.depth if self.max_connections is not None else None
+            pool = self._pools[origin] = _Pool(slots)
+
+        slots = pool.slots
+        if slots is None:
+            return await self._send(pool, data, host, port, tls, trace, method == "HEAD")
+        if slots.locked():
+            try:
+                await asyncio.wait_for(slots.acquire(), self.pool_timeout)
+            except asyncio.TimeoutError:
+                raise httpx.PoolTimeout("timed out waiting for a pooled connection") from None
+        else:
+            await slots.acquire()
+        try:
+            return await self._send(pool, data, host, port, tls, trace, method == "HEAD")
+        finally:
+            slots.release()
+
+    async def _send(self, pool: _Pool, data: bytes, host: str, port: int, tls: bool, trace: PhaseTrace, head: bool):
+        """Send on a connection with spare capacity, opening one while under `max_connections` and otherwise
+        waiting for one to free up"""
+        connection = pool.connection(self.depth)
+        while connection is None:
+            if self.max_connections is None or len(pool.connections) + pool.opening < self.max_connections:
+                pool.opening += 1
+                try:
+                    connection = await self._connect(pool, host, port, tls, trace)
+                finally:
+                    pool.opening -= 1
+                    if connection is None:
+                        pool.wake()
+            else:
+                waiter = asyncio.get_running_loop().create_future()
+                pool.waiters.append(waiter)
+                try:
+                    await waiter
+                except asyncio.CancelledError:
+                    pool.wake()  # pass on a wake-up this request may have consumed
+                    raise
+                connection = pool.connection(self.depth)
+                if connection is not None and connection.listed:
+                    pool.wake()  # the connection still has room for the next waiting request
+        return await connection.send(data, trace, head)
+
+    async def aclose(self):
+        for pool in self._pools.values():
+            for connection in list(pool.connections):
+                connection.transport.close()
+        self._pools.clear()
+
+
+ENGINES = {"httpx": HttpxEngine, "raw": RawEngine}
+
+
+def create_engine(config: TestConfig, max_connections: Optional[int]) -> HttpEngine:
+    """Build the HTTP engine selected by ``config.engine``, with None as an unbounded `max_connections`"""
+    engine = ENGINES.get(config.engine)
+    if engine is None:
+        raise ValueError(f"Unknown HTTP engine: {config.engine}")
+    return engine(config, max_connections)
@@ -0,0 +1,69 @@
+import time
+from typing import Dict, Optional
+
+from app.web_server.core.histogram import LatencyHistogram
+
+PHASES = ("pool_wait", "connect", "ttfb", "download")
+PHASE_PERCENTILES = {"p50": 50.0, "p90": 90.0, "p99": 99.0}
+
+
+class PhaseTrace:
+    """httpx/httpcore `trace` extension callback that timestamps the phases of one request.
+
+    Timestamps use ``time.perf_counter()`` so they can be compared with the request start time recorded by the
+    tester: the pool wait ends when a connection starts being opened or the request is written on a reused one.
+    Engines without trace callbacks stamp the same event names directly with `mark`.
+    """
+    __slots__ = ("events",)
+
+    def __init__(self):
+        self.events: Dict[str, float] = {}
+
+    async def __call__(self, name: str, info: Dict):
+        self.events[name.split(".", 1)[1]] = time.perf_counter()
+
+    def mark(self, event: str):
+        self.events[event] = time.perf_counter()
+
+    def phases(self, start: float, end: float) -> Dict[str, float]:
+        """Split the time between `start` and `end` into pool wait, connect/TLS, time to first byte and download"""
+        events = self.events
+        send_started = events.get("send_request_headers.started")
+        if send_started is None:
+            return {}
+
+        connect_started = events.get("connect_tcp.started")
+        connect_done = events.get("start_tls.complete") or events.get("connect_tcp.complete")
+        headers_done = events.get("receive_response_headers.complete", end)
+        body_done = events.get("receive_response_body.complete", end)
+        return {"pool_wait": max((connect_started or send_started) - start, 0),
+                "connect": connect_done - connect_started if connect_started and connect_done else 0,
+                "ttfb": headers_done - send_started,
+                "download": max(body_done - headers_done, 0)}
+
+
+class PhaseRecorder:
+    """Set of per-phase latency histograms that can be summarized and merged like the main one"""
+
+    def __init__(self, significant_digits: int = 2):
+        self.histograms = {phase: LatencyHistogram(significant_digits) for phase in PHASES}
+
+    def record(self, phases: Dict[str, float]):
+        for phase, value in phases.items():
+            self.histograms[phase].record(value)
+
+    def to_dict(self) -> Dict[str, Dict]:
+        return {phase: histogram.to_dict() for phase, histogram in self.histograms.items()}
+
+    def merge_dict(self, data: Optional[Dict[str, Dict]]):
+        for phase, histogram in (data or {}).items():
+            self.histograms[phase].merge(LatencyHistogram.from_dict(histogram))
+
+    def metrics(self) -> Dict[str, Dict]:
+        """Mean, p50/p90/p99 and max of each phase that was observed, in seconds"""
+        metrics = {}
+        for phase, histogram in self.histograms.items():
+            if histogram.count:
+                metrics[phase] = {"mean": histogram.mean, "max": histogram.max,
+                                  **histogram.percentiles(PHASE_PERCENTILES)}
+        return metrics
@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from app.web_server.core.histogram import LatencyHistogram
+
+BUCKET_PERCENTILES = {"p50": 50.0, "p90": 90.0, "p99": 99.0}
+LIVE_HISTOGRAM_DIGITS = 1  # coarse precision keeps each open bucket small
+LIVE_HISTOGRAM_HIGHEST = 120.0  # seconds
+
+
+class _OpenBucket:
+    """Mutable per-second accumulator used until the second is finalized"""
+    __slots__ = ("requests", "errors", "error_classes", "histogram", "loop_lag", "in_flight")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.error_classes: Dict[str, int] = {}
+        self.histogram = LatencyHistogram(LIVE_HISTOGRAM_DIGITS, LIVE_HISTOGRAM_HIGHEST)
+        self.loop_lag = 0.0
+        self.in_flight = 0
+
+    def to_row(self, second: int, partial: bool = False) -> Dict:
+        row = {"timestamp": second, "requests": self.requests, "errors": self.errors,
+               "error_rate": self.errors / self.requests if self.requests else 0,
+               "error_classes": dict(self.error_classes), "mean": self.histogram.mean,
+               "max": self.histogram.max or 0, "loop_lag": self.loop_lag, "in_flight": self.in_flight}
+        row.update(self.histogram.percentiles(BUCKET_PERCENTILES))
+        if partial:
+            row["partial"] = True
+        return row
+
+
+class LiveMetrics:
+    """Rolling per-second aggregator of request counts, errors and latency percentiles.
+
+    Requests are accumulated into an open bucket per wall-clock second. Once a second is older than
+    ``finalize_after`` it is reduced to a small summary row, and only the most recent ``max_buckets`` rows are kept,
+    so memory stays bounded regardless of the test length. A lock guards the buckets because the API reads them
+    from a different thread than the one recording requests.
+    """
+
+    def __init__(self, max_buckets: int = 3600, finalize_after: float = 2.0):
+        self.finalize_after = finalize_after
+        self.export = False
+        self._open: Dict[int, _OpenBucket] = {}
+        self._closed: deque = deque(maxlen=max_buckets)
+        self._pending_export: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def record(self, latency: Optional[float], success: bool, timestamp: Optional[float] = None,
+               error_class: Optional[str] = None):
+        """Record one finished request in the bucket of its completion second, counting failures by error class"""
+        second = int(timestamp if timestamp is not None else time.time())
+        with self._lock:
+            bucket = self._open.get(second)
+            if bucket is None:
+                self._finalize(second)
+                bucket = self._open[second] = _OpenBucket()
+
+            bucket.requests += 1
+            if success:
+                bucket.histogram.record(latency)
+            else:
+                bucket.errors += 1
+                if error_class:
+                    bucket.error_classes[error_class] = bucket.error_classes.get(error_class, 0) + 1
+
+    def record_generator(self, loop_lag: float, in_flight: int, timestamp: Optional[float] = None):
+        """Record one generator probe: the second keeps its worst event-loop lag and highest in-flight count"""
+        second = int(timestamp if timestamp is not None else time.time())
+        with self._lock:
+            bucket = self._open.get(second)
+            if bucket is None:
+                self._finalize(second)
+                bucket = self._open[second] = _OpenBucket()
+            bucket.loop_lag = max(bucket.loop_lag, loop_lag)
+            bucket.in_flight = max(bucket.in_flight, in_flight)
+
+    def _finalize(self, now: Optional[float] = None, flush: bool = False):
+        """Reduce open buckets older than `finalize_after` (or all of them when flushing) to summary rows"""
+        now = now if now is not None else time.time()
+        for second in sorted(self._open):
+            if not flush and second >= now - self.finalize_after:
+                break
+            bucket = self._open.pop(second)
+            self._closed.append(bucket.to_row(second))
+            if self.export:
+                self._pending_export.append({"timestamp": second, "requests": bucket.requests,
+                                             "errors": bucket.errors, "error_classes": bucket.error_classes,
+                                             "histogram": bucket.histogram.to_dict(),
+                                             "loop_lag": bucket.loop_lag, "in_flight": bucket.in_flight})
+
+    def buckets(self, since: Optional[int] = None, include_open: bool = True) -> List[Dict]:
+        """Return the buckets newer than `since`, finalized ones first, followed by partial in-progress seconds"""
+        with self._lock:
+            self._finalize()
+            rows = [row for row in self._closed if since is None or row["timestamp"] > since]
+            if include_open:
+                rows.extend(self._open[second].to_row(second, partial=True) for second in sorted(self._open)
+                            if since is None or second > since)
+            return rows
+
+    @property
+    def cursor(self) -> Optional[int]:
+        """Timestamp of the newest finalized bucket, to be passed back as `since`"""
+        return self._closed[-1]["timestamp"] if self._closed else None
+
+    def flush(self) -> List[Dict]:
+        """Finalize every open bucket and return all retained rows"""
+        with self._lock:
+            self._finalize(flush=True)
+            return list(self._closed)
+
+    def drain(self) -> List[Dict]:
+        """Return the finalized buckets not yet exported, in a mergeable form, when `export` is enabled"""
+        with self._lock:
+            self._finalize()
+            drained, self._pending_export = self._pending_export, []
+            return drained
+
+    def merge(self, exported: List[Dict]):
+        """Merge buckets drained from other aggregators, e.g. worker processes or remote agents"""
+        with self._lock:
+            for item in exported:
+                second = item["timestamp"]
+                bucket = self._open.get(second)
+                if bucket is None:
+                    closed = next((row for row in reversed(self._closed) if row["timestamp"] == second), None)
+                    if closed is not None:
+                        # Arrived after the second was finalized: keep the counts, percentiles stay approximate.
+                        closed["requests"] += item["requests"]
+                        closed["errors"] += item["errors"]
+                        closed["error_rate"] = closed["errors"] / closed["requests"] if closed["requests"] else 0
+                        for name, count in item.get("error_classes", {}).items():
+                            closed["error_classes"][name] = closed["error_classes"].get(name, 0) + count
+                        closed["loop_lag"] = max(closed["loop_lag"], item.get("loop_lag", 0))
+                        closed["in_flight"] += item.get("in_flight", 0)
+                        continue
+                    bucket = self._open[second] = _OpenBucket()
+
+                bucket.requests += item["requests"]
+                bucket.errors += item["errors"]
+                for name, count in item.get("error_classes", {}).items():
+                    bucket.error_classes[name] = bucket.error_classes.get(name, 0) + count
+                bucket.histogram.merge(LatencyHistogram.from_dict(item["histogram"]))
+                # Each source is a separate event loop: the worst lag matters, requests in flight add up.
+                bucket.loop_lag = max(bucket.loop_lag, item.get("loop_lag", 0))
+                bucket.in_flight += item.get("in_flight", 0)
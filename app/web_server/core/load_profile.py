@@ -0,0 +1,49 @@
+from typing import Optional
+
+from app.web_server.models.load_profile import LoadProfile
+
+
+def level_at(profile: LoadProfile, elapsed: float) -> float:
+    """Return the load level the profile asks for `elapsed` seconds into the test"""
+    if profile.type == "linear_ramp":
+        end_level = profile.end_level if profile.end_level is not None else profile.start_level
+        if not profile.ramp_duration or elapsed >= profile.ramp_duration:
+            return end_level
+        return profile.start_level + (end_level - profile.start_level) * elapsed / profile.ramp_duration
+
+    if profile.type == "steps":
+        if not profile.steps:
+            return profile.start_level
+        for step in profile.steps:
+            if elapsed < step.duration:
+                return step.level
+            elapsed -= step.duration
+        return profile.steps[-1].level
+
+    if profile.type == "spike":
+        spike_start = profile.spike_start or 0
+        if spike_start <= elapsed < spike_start + (profile.spike_duration or 0):
+            return profile.spike_level if profile.spike_level is not None else profile.start_level
+        return profile.start_level
+
+    raise ValueError(f"Unknown load profile type: {profile.type}")
+
+
+def max_level(profile: LoadProfile) -> float:
+    """Return the highest level the profile ever reaches"""
+    levels = [profile.start_level, profile.end_level or 0, profile.spike_level or 0]
+    levels.extend(step.level for step in profile.steps or [])
+    return max(levels)
+
+
+def scale_profile(profile: LoadProfile, factor: float, offset: float = 0.0) -> LoadProfile:
+    """Return a copy of the profile with every level mapped to `level * factor + offset`, e.g. to split it across
+    workers"""
+    def scale(level: Optional[float]) -> Optional[float]:
+        return level * factor + offset if level is not None else None
+
+    return profile.model_copy(update={
+        "start_level": scale(profile.start_level), "end_level": scale(profile.end_level),
+        "spike_level": scale(profile.spike_level),
+        "steps": [step.model_copy(update={"level": scale(step.level)}) for step in profile.steps]
+        if profile.steps else None})
@@ -1,10 +1,14 @@
 import asyncio
+import math
 import time
 from datetime import datetime
 
-import httpx
-
 from app.web_server.core.base_tester import BaseTester
+from app.web_server.core.http_engine import HttpEngine
+from app.web_server.core.load_profile import level_at, max_level
+
+LATE_SEND_THRESHOLD = 0.01  # seconds after the scheduled time before a send counts as late
+IDLE_TICK = 0.1  # seconds an idle worker (or a zero-rate timeline) waits before checking the profile again
 
 
 class PerformanceTester(BaseTester):
@@ -14,13 +18,82 @@ class PerformanceTester(BaseTester):
             raise ValueError("Duration is required for performance testing")
 
         self.start_time = datetime.now()
-        end_time = self.start_time.timestamp() + self.config.duration
 
-        async with httpx.AsyncClient() as client:
-            while time.time() < end_time:
-                tasks = [self._make_request(client) for _ in range(self.config.concurrency)]
-                await asyncio.gather(*tasks)
+        async with self._create_client() as client, self.health.sampling(self.live):
+            if self.config.target_rps:
+                await self._run_open_loop(client)
+            elif self.config.load_profile:
+                await self._run_profiled_closed_loop(client)
+            else:
+                await self._run_closed_loop(client)
 
         self.end_time = datetime.now()
         self._calculate_metrics()
         return self.test_result
+
+    async def _run_closed_loop(self, client: HttpEngine):
+        """Fire batches of `concurrency` requests, each batch waiting for the previous one to finish"""
+        end_time = self.start_time.timestamp() + self.config.duration
+        while time.time() < end_time:
+            tasks = [self._run_iteration(client) for _ in range(self.config.concurrency)]
+            await asyncio.gather(*tasks)
+
+    async def _run_profiled_closed_loop(self, client: HttpEngine):
+        """Keep as many users busy as the load profile asks for, with a worker pool sized for its peak"""
+        profile = self.config.load_profile
+        started = time.perf_counter()
+
+        async def worker(index: int):
+            while (elapsed := time.perf_counter() - started) < self.config.duration:
+                if index < round(level_at(profile, elapsed)):
+                    await self._run_iteration(client)
+                else:
+                    await asyncio.sleep(IDLE_TICK)
+
+        await asyncio.gather(*(worker(index) for index in range(math.ceil(max_level(profile)))))
+
+    def _rate_at(self, elapsed: float) -> float:
+        if self.config.load_profile:
+            return level_at(self.config.load_profile, elapsed)
+        return self.config.target_rps
+
+    async def _run_open_loop(self, client: HttpEngine):
+        """Send requests on an arrival timeline at `target_rps` (or the load profile's rate), independently of
+        response times"""
+        if self.config.target_rps <= 0:
+            raise ValueError("target_rps must be positive for open-loop testing")
+
+        max_in_flight = self.config.max_in_flight
+        in_flight = set()
+        timeline_start = time.perf_counter()
+        timeline_end = timeline_start + self.config.duration
+        intended_start = timeline_start
+
+        try:
+            while intended_start < timeline_end:
+                rate = self._rate_at(intended_start - timeline_start)
+                if rate <= 0:
+                    intended_start += IDLE_TICK
+                    continue
+
+                delay = intended_start - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                if max_in_flight and len(in_flight) >= max_in_flight:
+                    self.test_result.missed_sends += 1
+                else:
+                    if time.perf_counter() - intended_start > LATE_SEND_THRESHOLD:
+                        self.test_result.late_sends += 1
+                    task = asyncio.create_task(self._run_iteration(client, intended_start))
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+                intended_start += 1.0 / rate
+        except asyncio.CancelledError:
+            # Stopped mid-timeline: requests already sent are abandoned with it instead of outliving the test.
+            for task in in_flight:
+                task.cancel()
+            raise
+
+        if in_flight:
+            await asyncio.gather(*in_flight)
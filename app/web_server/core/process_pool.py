@@ -0,0 +1,370 @@
+import asyncio
+import itertools
+import logging
+import math
+import multiprocessing
+import queue
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Type
+
+from app.web_server.core.base_tester import BaseTester
+from app.web_server.core.http_engine import create_engine, new_event_loop
+from app.web_server.core.load_profile import max_level, scale_profile
+from app.web_server.core.performance_tester import PerformanceTester
+from app.web_server.core.sample_recorder import SampleRecorder
+from app.web_server.core.stress_tester import StressTester
+from app.web_server.models.config import TestConfig
+
+logger = logging.getLogger(__name__)
+
+TESTER_CLASSES: Dict[str, Type[BaseTester]] = {"StressTester": StressTester, "PerformanceTester": PerformanceTester}
+SUMMARY_INTERVAL = 1.0  # seconds between progress summaries streamed by each worker
+LIVE_FINALIZE_DELAY = 5.0  # seconds the parent waits for all workers before finalizing a live bucket
+CANCEL = "cancel"  # task queue message kind asking a worker to stop a shard
+WORKER_CHECK_INTERVAL = 1.0  # seconds between checks that the workers running a test are still alive
+WORKER_START_TIMEOUT = 30.0  # seconds a new worker process has to import the testers and report it is ready
+
+
+async def _run_shard(job_id: int, tester_name: str, config: Dict, result_queue, cancelled: set):
+    """Run one shard of a test and stream its metric summaries back to the parent"""
+    config = dict(config)
+    samples_path = config.pop("samples_path", None)
+    tester = TESTER_CLASSES[tester_name](TestConfig(**config))
+    tester.live.export = True
+    if samples_path:
+        tester.samples = SampleRecorder(samples_path)
+    run_task = asyncio.create_task(tester.run())
+
+    async def report_progress():
+        while True:
+            await asyncio.sleep(SUMMARY_INTERVAL)
+            if job_id in cancelled:
+                run_task.cancel()
+                return
+            result_queue.put((job_id, "progress", dict(tester.summary(), live_buckets=tester.live.drain())))
+
+    reporter = asyncio.create_task(report_progress())
+    try:
+        await run_task
+        result_queue.put((job_id, "done", dict(tester.summary(), live_buckets=tester.live.drain(),
+                                               started=tester.start_time.timestamp(),
+                                               finished=tester.end_time.timestamp())))
+    except asyncio.CancelledError:
+        pass  # the parent stopped waiting for this shard, so its partial summary is not reported
+    except Exception as e:
+        logger.exception("Worker shard failed")
+        result_queue.put((job_id, "error", str(e)))
+    finally:
+        reporter.cancel()
+        cancelled.discard(job_id)
+        if tester.samples:
+            tester.samples.close()
+
+
+def _read_tasks(task_queue, tasks: queue.Queue, cancelled: set):
+    """Forward shard tasks to the worker loop, recording cancellations as soon as they arrive"""
+    while True:
+        task = task_queue.get()
+        if task is not None and task[0] == CANCEL:
+            cancelled.add(task[1])
+            continue
+        tasks.put(task)
+        if task is None:
+            break
+
+
+async def _warm_up():
+    """Build and close an HTTP client once, so its lazy imports and TLS setup are not billed to the first shard"""
+    async with create_engine(TestConfig(target_url="http://127.0.0.1/"), 1):
+        pass
+
+
+def _worker_main(task_queue, result_queue, ready):
+    """Entry point of a worker process: run shards on a private event loop until told to stop"""
+    loop = new_event_loop()
+    asyncio.set_event_loop(loop)
+    loop.run_until_complete(_warm_up())
+    ready.set()
+    tasks: queue.Queue = queue.Queue()
+    cancelled = set()
+    threading.Thread(target=_read_tasks, args=(task_queue, tasks, cancelled), daemon=True).start()
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            if task[0] in cancelled:
+                cancelled.discard(task[0])
+                continue
+            loop.run_until_complete(_run_shard(*task, result_queue, cancelled))
+    finally:
+        loop.close()
+
+
+class WorkerPool:
+    """Pool of long-lived load generator processes, each with its own event loop and HTTP client.
+
+    Processes are spawned on first use and reused by every following test; the pool only grows when a test asks
+    for more workers than are already running. `ensure_size` returns once new workers have imported the testers and
+    warmed up their HTTP client, and final shard summaries carry the shard's own start and end time, so a tester can
+    measure its duration without the time spent spawning processes.
+    """
+
+    def __init__(self):
+        self._context = multiprocessing.get_context("spawn")
+        self._result_queue = self._context.Queue()
+        self._workers: List[tuple] = []
+        self._jobs: Dict[int, tuple] = {}
+        self._job_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._dispatcher: Optional[threading.Thread] = None
+
+    @property
+    def size(self) -> int:
+        return len(self._workers)
+
+    def _start_worker(self) -> tuple:
+        """Start one worker process, returning its (process, task queue, ready event)"""
+        task_queue = self._context.Queue()
+        ready = self._context.Event()
+        process = self._context.Process(target=_worker_main, args=(task_queue, self._result_queue, ready),
+                                        daemon=True)
+        process.start()
+        return process, task_queue, ready
+
+    def ensure_size(self, size: int):
+        """Start worker processes until at least `size` are running, blocking until the new ones are ready"""
+        with self._lock:
+            started = [self._start_worker() for _ in range(size - len(self._workers))]
+            for process, task_queue, ready in started:
+                if not ready.wait(WORKER_START_TIMEOUT):
+                    logger.warning(f"Worker process {process.pid} did not report ready in time")
+                self._workers.append((process, task_queue))
+
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch_results, daemon=True)
+                self._dispatcher.start()
+
+    def _replace_worker(self, index: int, process):
+        """Start a fresh worker in place of `process` at `index`, unless another test already replaced it"""
+        with self._lock:
+            if index >= len(self._workers) or self._workers[index][0] is not process:
+                return
+            logger.warning(f"Worker process {process.pid} exited with code {process.exitcode}, replacing it")
+            replacement, task_queue, _ = self._start_worker()
+            self._workers[index] = (replacement, task_queue)
+
+    def _dispatch_results(self):
+        """Route messages coming back from the workers to the event loop of the job that is waiting on them"""
+        while True:
+            message = self._result_queue.get()
+            if message is None:
+                break
+            job = self._jobs.get(message[0])
+            if job:
+                loop, queue = job
+                loop.call_soon_threadsafe(queue.put_nowait, message)
+
+    async def run(self, tester_name: str, shard_configs: List[Dict], on_progress=None, on_live=None) -> List[Dict]:
+        """Run each shard config on its own worker and return their final summaries.
+
+        `on_progress` is called with the latest summary of every shard whenever any worker reports progress, and
+        `on_live` with the live metric buckets each worker finalized since its previous report.
+        """
+        self.ensure_size(len(shard_configs))
+        job_ids = [next(self._job_ids) for _ in shard_configs]
+        queue: asyncio.Queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        for job_id in job_ids:
+            self._jobs[job_id] = (loop, queue)
+
+        # Several shard jobs are queued per worker in submission order, so concurrent tests interleave instead of
+        # racing for the same processes.
+        processes = {}
+        for index, (job_id, config) in enumerate(zip(job_ids, shard_configs)):
+            process, task_queue = self._workers[index]
+            processes[job_id] = (index, process)
+            task_queue.put((job_id, tester_name, config))
+
+        latest: Dict[int, Dict] = {}
+        pending = set(job_ids)
+        errors = []
+        next_check = loop.time() + WORKER_CHECK_INTERVAL
+        try:
+            while pending:
+                try:
+                    message = await asyncio.wait_for(queue.get(), max(next_check - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    message = None
+                # Checked on a fixed schedule rather than when no message arrives, since the shards still running
+                # keep reporting progress while a killed worker never reports back
+                if loop.time() >= next_check:
+                    for job_id in list(pending):
+                        index, process = processes[job_id]
+                        if not process.is_alive():
+                            errors.append(f"worker process exited with code {process.exitcode}")
+                            pending.discard(job_id)
+                            self._replace_worker(index, process)
+                    next_check = loop.time() + WORKER_CHECK_INTERVAL
+                if message is None:
+                    continue
+                job_id, kind, payload = message
+                if job_id not in pending:
+                    continue
+                if kind == "error":
+                    errors.append(payload)
+                    pending.discard(job_id)
+                    continue
+                live_buckets = payload.pop("live_buckets", [])
+                if on_live and live_buckets:
+                    on_live(live_buckets)
+                latest[job_id] = payload
+                if kind == "done":
+                    pending.discard(job_id)
+                if on_progress:
+                    on_progress(list(latest.values()))
+        except asyncio.CancelledError:
+            for index, job_id in enumerate(job_ids):
+                if job_id in pending and self._workers[index][0] is processes[job_id][1]:
+                    self._workers[index][1].put((CANCEL, job_id))
+            raise
+        finally:
+            for job_id in job_ids:
+                self._jobs.pop(job_id, None)
+
+        if errors:
+            raise RuntimeError(f"{len(errors)} worker shard(s) failed: {errors[0]}")
+        return [latest[job_id] for job_id in job_ids]
+
+    def shutdown(self):
+        """Stop all worker processes and the dispatcher thread"""
+        with self._lock:
+            for _, task_queue in self._workers:
+                task_queue.put(None)
+            for process, _ in self._workers:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+            self._workers = []
+            if self._dispatcher is not None:
+                self._result_queue.put(None)
+                self._dispatcher.join(timeout=5)
+                self._dispatcher = None
+
+
+_pool: Optional[WorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> WorkerPool:
+    """Return the process-wide worker pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool()
+        return _pool
+
+
+def shutdown_worker_pool():
+    """Stop the process-wide worker pool if it was ever started"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+def shard_count(config: TestConfig, workers: int) -> int:
+    """Number of shards `split_config` splits a test into: a closed-loop test gets at most one per user, since every
+    shard runs at least one"""
+    if config.target_rps:
+        return workers
+    users = math.ceil(max_level(config.load_profile)) if config.load_profile else config.concurrency
+    return min(workers, max(users, 1))
+
+
+def check_shard_caps(config: TestConfig, shards: int):
+    """Raise ValueError when the in-flight or connection cap cannot give every one of `shards` at least one slot"""
+    for name in ("max_in_flight", "max_connections"):
+        cap = getattr(config, name)
+        if cap and shards > cap:
+            raise ValueError(f"{name} is {cap}, too low to split the test across {shards} load generators")
+
+
+def _spread(total: int, shards: int, index: int) -> int:
+    """Share of `total` given to shard `index`, the remainder going one each to the first shards"""
+    return total // shards + (1 if index < total % shards else 0)
+
+
+def split_config(config: TestConfig, workers: int) -> List[Dict]:
+    """Split a test config into per-worker shards that together generate the requested load.
+
+    Request budgets, users and the in-flight and connection caps are spread in whole units, so the shards add up to
+    exactly the configured values. A closed-loop load profile is split the same way: shard `index` runs every
+    `workers`-th user starting at `index`, which its level offset reproduces once rounded to whole users.
+    """
+    shard_total = shard_count(config, workers)
+    if shard_total < workers:
+        logger.warning(f"Splitting the test across {shard_total} workers instead of {workers}: "
+                       f"it never runs more than {shard_total} users")
+    workers = shard_total
+    check_shard_caps(config, workers)
+    shards = []
+    for index in range(workers):
+        shard = config.model_dump()
+        shard["workers"] = 1
+        shard["requests"] = _spread(config.requests, workers, index)
+        shard["concurrency"] = max(_spread(config.concurrency, workers, index), 1)
+        if config.target_rps:
+            shard["target_rps"] = config.target_rps / workers
+        if config.max_in_flight:
+            shard["max_in_flight"] = _spread(config.max_in_flight, workers, index)
+        if config.max_connections:
+            shard["max_connections"] = _spread(config.max_connections, workers, index)
+        if config.load_profile:
+            offset = 0.0 if config.target_rps else ((workers - 1) / 2 - index) / workers
+            shard["load_profile"] = scale_profile(config.load_profile, 1 / workers, offset).model_dump()
+        if config.duration or shard["requests"] > 0:
+            shards.append(shard)
+    return shards
+
+
+class MultiProcessTester(BaseTester):
+    """Tester that splits a test across worker processes and merges their summaries into one result"""
+
+    def __init__(self, config: TestConfig, tester_class: Type[BaseTester]):
+        check_shard_caps(config, shard_count(config, max(config.workers, 1)))
+        super().__init__(config)
+        self.tester_class = tester_class
+        self.test_result.test_type = tester_class.__name__
+        self.live.finalize_after = LIVE_FINALIZE_DELAY
+
+    def _on_progress(self, summaries: List[Dict]):
+        self.merge_summaries(summaries)
+        self.test_result.total_requests = self.request_count
+        self.test_result.successful_requests = self.histogram.count
+        self.test_result.failed_requests = self.failed_count
+
+    async def prepare(self):
+        """Spawn and warm up the worker processes of the test ahead of a scheduled start"""
+        await asyncio.get_running_loop().run_in_executor(None, get_worker_pool().ensure_size,
+                                                         max(self.config.workers, 1))
+
+    async def run(self):
+        if self.tester_class is PerformanceTester and not self.config.duration:
+            raise ValueError("Duration is required for performance testing")
+
+        shards = split_config(self.config, max(self.config.workers, 1))
+        await asyncio.get_running_loop().run_in_executor(None, get_worker_pool().ensure_size, len(shards))
+        self.start_time = datetime.now()
+        if self.samples:
+            for index, shard in enumerate(shards):
+                shard["samples_path"] = self.samples.shard_path(index)
+        summaries = await get_worker_pool().run(self.tester_class.__name__, shards,
+                                                on_progress=self._on_progress, on_live=self.live.merge)
+        self.merge_summaries(summaries)
+        # The duration spans the shards themselves, so process start-up and first-use imports are not counted
+        self.start_time = datetime.fromtimestamp(min(summary["started"] for summary in summaries))
+        self.end_time = datetime.fromtimestamp(max(summary["finished"] for summary in summaries))
+        self._calculate_metrics()
+        return self.test_result
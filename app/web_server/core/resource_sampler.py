@@ -0,0 +1,116 @@
+import threading
+import time
+from array import array
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import psutil
+
+from app.web_server.core.downsampling import columns_to_rows, downsample
+
+SAMPLE_FIELDS = ("timestamp", "cpu_percent", "memory_percent", "memory_used", "network_sent", "network_recv",
+                 "process_cpu_percent", "process_rss", "open_sockets")
+BYTES_PER_MB = 1024 * 1024
+
+
+class ResourceSampler:
+    """Low-overhead sampler of host and load-generator process resources.
+
+    Every tick takes a single psutil snapshot per counter and writes it into fixed-size, column-oriented ring
+    buffers, so memory is bounded by ``buffer_size`` samples. Aggregates are maintained incrementally, and samples
+    are addressed by a monotonically increasing sequence number that clients can use as a cursor.
+    """
+
+    def __init__(self, buffer_size: int = 3600):
+        self.buffer_size = buffer_size
+        self.seq = 0
+        self._columns = {field: array("d", bytes(8 * buffer_size)) for field in SAMPLE_FIELDS}
+        self._lock = threading.Lock()
+        self._process = psutil.Process()
+        self._process.cpu_percent()
+        psutil.cpu_percent()
+        self._last_network = psutil.net_io_counters()
+
+        self._cpu_max = 0.0
+        self._cpu_total = 0.0
+        self._memory_max = 0.0
+        self._memory_total = 0.0
+        self._process_cpu_max = 0.0
+        self._process_rss_max = 0.0
+        self._open_sockets_max = 0
+
+    def _count_sockets(self) -> int:
+        connections = getattr(self._process, "net_connections", None) or self._process.connections
+        try:
+            return len(connections(kind="inet"))
+        except psutil.Error:
+            return 0
+
+    def sample(self):
+        """Take one snapshot of the host and of this process and append it to the ring buffers"""
+        timestamp = time.time()
+        cpu = psutil.cpu_percent()
+        memory = psutil.virtual_memory()
+        network = psutil.net_io_counters()
+        with self._process.oneshot():
+            process_cpu = self._process.cpu_percent()
+            process_rss = self._process.memory_info().rss / BYTES_PER_MB
+        open_sockets = self._count_sockets()
+
+        memory_used = memory.used / BYTES_PER_MB
+        values = (timestamp, cpu, memory.percent, memory_used, network.bytes_sent - self._last_network.bytes_sent,
+                  network.bytes_recv - self._last_network.bytes_recv, process_cpu, process_rss, open_sockets)
+        self._last_network = network
+
+        with self._lock:
+            index = self.seq % self.buffer_size
+            for field, value in zip(SAMPLE_FIELDS, values):
+                self._columns[field][index] = value
+            self.seq += 1
+
+            self._cpu_max = max(self._cpu_max, cpu)
+            self._cpu_total += cpu
+            self._memory_max = max(self._memory_max, memory_used)
+            self._memory_total += memory_used
+            self._process_cpu_max = max(self._process_cpu_max, process_cpu)
+            self._process_rss_max = max(self._process_rss_max, process_rss)
+            self._open_sockets_max = max(self._open_sockets_max, open_sockets)
+
+    @property
+    def metrics(self) -> Dict:
+        """Aggregates over every sample taken, including those already evicted from the ring buffer"""
+        if not self.seq:
+            return {}
+        return {"max_cpu": self._cpu_max, "avg_cpu": self._cpu_total / self.seq, "max_memory": self._memory_max,
+                "avg_memory": self._memory_total / self.seq, "max_process_cpu": self._process_cpu_max,
+                "max_process_rss": self._process_rss_max, "max_open_sockets": self._open_sockets_max}
+
+    def samples_since(self, cursor: int = 0, max_points: Optional[int] = None) -> Tuple[List[Dict], int]:
+        """Return the retained samples with a sequence number >= `cursor`, and the cursor for the next call.
+
+        With `max_points`, longer series are downsampled straight from the ring buffers with NumPy.
+        """
+        with self._lock:
+            start = max(cursor, self.seq - self.buffer_size, 0)
+            if max_points and self.seq - start > max_points:
+                return self._downsampled(start, max_points), self.seq
+            samples = []
+            for seq in range(start, self.seq):
+                index = seq % self.buffer_size
+                sample = {field: self._columns[field][index] for field in SAMPLE_FIELDS}
+                sample["timestamp"] = datetime.fromtimestamp(sample["timestamp"]).isoformat()
+                sample["open_sockets"] = int(sample["open_sockets"])
+                samples.append(sample)
+            return samples, self.seq
+
+    def _downsampled(self, start: int, max_points: int) -> List[Dict]:
+        count = self.seq - start
+        offset = start % self.buffer_size
+        columns = {field: np.roll(np.frombuffer(self._columns[field], dtype=np.float64), -offset)[:count]
+                   for field in SAMPLE_FIELDS}
+        fields = SAMPLE_FIELDS[1:]
+        timestamps, values = downsample(columns["timestamp"], np.column_stack([columns[f] for f in fields]),
+                                        max_points)
+        times = [datetime.fromtimestamp(timestamp).isoformat() for timestamp in timestamps.tolist()]
+        return columns_to_rows(times, values, fields, int_fields=("open_sockets",))
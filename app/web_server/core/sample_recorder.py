@@ -0,0 +1,156 @@
+import io
+import json
+import math
+import os
+import shutil
+import struct
+import time
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_SAMPLES_DIR = "samples"  # spill directory, overridden by the SAMPLES_DIR environment variable
+SAMPLES_SUFFIX = ".samples"
+FLUSH_BYTES = 64 * 1024  # records are buffered and appended to the spill file in blocks of this size
+EXPORT_CHUNK_RECORDS = 65536  # records read and formatted per exported chunk
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv",
+                  "arrow": "application/vnd.apache.arrow.stream"}
+
+# completion time (epoch seconds), latency (seconds, NaN when no response arrived), HTTP status (0 without a
+# response), success flag and one byte of padding: 16 bytes per request
+_RECORD = struct.Struct("<dfHBx")
+SAMPLE_DTYPE = np.dtype({"names": ["timestamp", "latency", "status", "success"],
+                         "formats": ["<f8", "<f4", "<u2", "u1"], "offsets": [0, 8, 12, 14],
+                         "itemsize": _RECORD.size})
+CSV_HEADER = "timestamp,latency,status,success,worker\n"
+
+
+def samples_directory(test_id: str) -> str:
+    return os.path.join(os.getenv("SAMPLES_DIR", DEFAULT_SAMPLES_DIR), test_id)
+
+
+class SampleRecorder:
+    """Append-only spill file of fixed-width raw request samples.
+
+    Records are buffered and appended in ``FLUSH_BYTES`` blocks, so memory stays constant however long the test
+    runs. Within one file records are in completion order, which keeps the timestamps sorted and lets readers slice
+    a time range with a binary search. The file is only created once the first block is written.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._buffer = bytearray()
+        self._file = None
+        self._epoch = time.time() - time.perf_counter()
+
+    @classmethod
+    def for_test(cls, test_id: str, index: int = 0) -> "SampleRecorder":
+        return cls(os.path.join(samples_directory(test_id), f"{index}{SAMPLES_SUFFIX}"))
+
+    def shard_path(self, index: int) -> str:
+        """Path of the spill file written by worker `index` of the same test"""
+        return os.path.join(os.path.dirname(self.path), f"{index}{SAMPLES_SUFFIX}")
+
+    def record(self, finished: float, latency: Optional[float], status: int, success: bool):
+        """Buffer one request sample; `finished` is the ``time.perf_counter()`` value at which it completed"""
+        self._buffer += _RECORD.pack(self._epoch + finished, math.nan if latency is None else latency, status,
+                                     success)
+        if len(self._buffer) >= FLUSH_BYTES:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._file = open(self.path, "ab", buffering=0)
+        self._file.write(self._buffer)
+        self._buffer.clear()
+
+    def close(self):
+        """Write the buffered records and close the file; recording again reopens it for appending"""
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def sample_files(test_id: str) -> List[Tuple[int, str]]:
+    """Return the (worker index, path) of every spill file of a test"""
+    directory = samples_directory(test_id)
+    if not os.path.isdir(directory):
+        return []
+    files = [(int(name[:-len(SAMPLES_SUFFIX)]), os.path.join(directory, name)) for name in os.listdir(directory)
+             if name.endswith(SAMPLES_SUFFIX) and name[:-len(SAMPLES_SUFFIX)].isdigit()]
+    return sorted(files)
+
+
+def delete_samples(test_id: str):
+    """Remove every spill file of a test"""
+    shutil.rmtree(samples_directory(test_id), ignore_errors=True)
+
+
+def read_samples(test_id: str, start: Optional[float] = None,
+                 end: Optional[float] = None) -> Iterator[Tuple[int, np.ndarray]]:
+    """Yield (worker index, records) chunks completed between the `start` and `end` epoch seconds.
+
+    Files are memory-mapped, so only the pages of the requested range are read; a record still being appended
+    (a file size that is not a whole number of records) is ignored.
+    """
+    for worker, path in sample_files(test_id):
+        count = os.path.getsize(path) // SAMPLE_DTYPE.itemsize
+        if not count:
+            continue
+        records = np.memmap(path, dtype=SAMPLE_DTYPE, mode="r", shape=(count,))
+        timestamps = records["timestamp"]
+        first = int(np.searchsorted(timestamps, start, side="left")) if start is not None else 0
+        last = int(np.searchsorted(timestamps, end, side="right")) if end is not None else count
+        for offset in range(first, last, EXPORT_CHUNK_RECORDS):
+            yield worker, np.array(records[offset:min(offset + EXPORT_CHUNK_RECORDS, last)])
+        del records
+
+
+def _rows(chunk: np.ndarray):
+    latencies = np.round(chunk["latency"].astype(np.float64), 6)
+    return zip(chunk["timestamp"].tolist(), np.where(np.isnan(latencies), None, latencies).tolist(),
+               chunk["status"].tolist(), chunk["success"].astype(bool).tolist())
+
+
+def _ndjson_chunks(chunks) -> Iterator[bytes]:
+    for worker, chunk in chunks:
+        yield "".join(json.dumps({"timestamp": timestamp, "latency": latency, "status": status, "success": success,
+                                  "worker": worker}) + "\n"
+                      for timestamp, latency, status, success in _rows(chunk)).encode()
+
+
+def _csv_chunks(chunks) -> Iterator[bytes]:
+    yield CSV_HEADER.encode()
+    for worker, chunk in chunks:
+        yield "".join(f"{timestamp:.6f},{'' if latency is None else f'{latency:.6f}'},{status},{int(success)},"
+                      f"{worker}\n" for timestamp, latency, status, success in _rows(chunk)).encode()
+
+
+def _arrow_chunks(chunks) -> Iterator[bytes]:
+    import pyarrow as pa
+
+    schema = pa.schema([("timestamp", pa.float64()), ("latency", pa.float32()), ("status", pa.uint16()),
+                        ("success", pa.bool_()), ("worker", pa.uint16())])
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for worker, chunk in chunks:
+            latencies = np.ascontiguousarray(chunk["latency"])
+            writer.write_batch(pa.record_batch(
+                [pa.array(np.ascontiguousarray(chunk["timestamp"])), pa.array(latencies, mask=np.isnan(latencies)),
+                 pa.array(np.ascontiguousarray(chunk["status"])), pa.array(chunk["success"].astype(bool)),
+                 pa.array(np.full(len(chunk), worker, dtype=np.uint16))], schema=schema))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()
+
+
+def export_samples(test_id: str, export_format: str, start: Optional[float] = None,
+                   end: Optional[float] = None) -> Iterator[bytes]:
+    """Stream the raw samples of a test, chunk by chunk, as NDJSON, CSV or an Arrow IPC stream"""
+    writers = {"ndjson": _ndjson_chunks, "csv": _csv_chunks, "arrow": _arrow_chunks}
+    return writers[export_format](read_samples(test_id, start, end))
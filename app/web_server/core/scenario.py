@@ -0,0 +1,183 @@
+import csv
+import json
+import os
+import re
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.web_server.models.scenario import Scenario, ScenarioStep
+
+DATA_DIR = os.getenv("SCENARIO_DATA_DIR", "data")  # the only directory scenario data files may be read from
+VARIABLE_PATTERN = re.compile(r"\$\{(\w+)\}")
+BYTES_VARIABLE_PATTERN = re.compile(rb"\$\{(\w+)\}")
+
+
+class Template:
+    """String template split once into literal and variable segments, rendered without re-parsing"""
+    __slots__ = ("segments", "constant")
+
+    def __init__(self, text: str):
+        parts = VARIABLE_PATTERN.split(text)
+        self.segments = [(index % 2 == 1, part) for index, part in enumerate(parts) if part]
+        self.constant = text if len(parts) == 1 else None
+
+    def render(self, variables: Dict[str, Any]) -> str:
+        if self.constant is not None:
+            return self.constant
+        return "".join(str(variables.get(part, "")) if is_variable else part for is_variable, part in self.segments)
+
+
+class BodyTemplate:
+    """Request body serialized to bytes once; variables are spliced in as bytes on each render.
+
+    Values substituted into JSON bodies are JSON-escaped so they cannot break the document.
+    """
+    __slots__ = ("segments", "constant", "json_escape")
+
+    def __init__(self, body: Any):
+        self.json_escape = not isinstance(body, str)
+        encoded = body.encode() if isinstance(body, str) else json.dumps(body, separators=(",", ":")).encode()
+        parts = BYTES_VARIABLE_PATTERN.split(encoded)
+        self.segments = [(index % 2 == 1, part.decode() if index % 2 else part) for index, part in enumerate(parts)
+                         if part]
+        self.constant = encoded if len(parts) == 1 else None
+
+    def _encode(self, value: Any) -> bytes:
+        if self.json_escape:
+            return json.dumps(str(value))[1:-1].encode()
+        return str(value).encode()
+
+    def render(self, variables: Dict[str, Any]) -> bytes:
+        if self.constant is not None:
+            return self.constant
+        return b"".join(self._encode(variables.get(part, "")) if is_variable else part
+                        for is_variable, part in self.segments)
+
+
+def resolve_data_file(name: str, data_dir: Optional[str] = None) -> str:
+    """Resolve a scenario data file name against the data directory, rejecting paths that lead outside of it.
+
+    The name comes from the API caller and the file's rows are sent to a target the caller chooses, so any other
+    server-side file would be exfiltrated.
+    """
+    base = os.path.realpath(data_dir or DATA_DIR)
+    path = os.path.realpath(os.path.join(base, name))
+    if os.path.commonpath([base, path]) != base:
+        raise ValueError(f"Data file must be inside the scenario data directory: {name}")
+    return path
+
+
+class DataFeed:
+    """Lazily streams rows from a CSV or JSONL file, starting over from the top when it is exhausted"""
+
+    def __init__(self, path: str, data_format: Optional[str] = None):
+        self.path = path
+        self.data_format = (data_format or path.rsplit(".", 1)[-1]).lower()
+        if self.data_format not in ("csv", "jsonl"):
+            raise ValueError(f"Unsupported data file format: {self.data_format}")
+        self._rows: Optional[Iterator[Dict]] = None
+
+    def _open(self) -> Iterator[Dict]:
+        with open(self.path, newline="", encoding="utf-8") as file:
+            if self.data_format == "csv":
+                yield from csv.DictReader(file)
+            else:
+                for number, line in enumerate(file, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        row = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        raise ValueError(f"Line {number} of data file {self.path} is not valid JSON: {e.msg}")
+                    if not isinstance(row, dict):
+                        raise ValueError(f"Line {number} of data file {self.path} is not a JSON object")
+                    yield row
+
+    def validate(self):
+        """Read the whole file once, raising ValueError when it is missing, unreadable, malformed or empty.
+
+        Done when the test is configured, since a bad row met mid-test would fail the run with no hint of the
+        scenario.
+        """
+        try:
+            rows = sum(1 for _ in self._open())
+        except OSError as e:
+            raise ValueError(f"Cannot read data file {self.path}: {e.strerror}")
+        except UnicodeDecodeError:
+            raise ValueError(f"Data file {self.path} is not UTF-8 text")
+        except csv.Error as e:
+            raise ValueError(f"Data file {self.path} is not valid CSV: {e}")
+        if not rows:
+            raise ValueError(f"Data file {self.path} has no rows")
+
+    def next_row(self) -> Dict:
+        """Return the next row, reopening the file after the last one"""
+        for _ in range(2):
+            if self._rows is None:
+                self._rows = self._open()
+            row = next(self._rows, None)
+            if row is not None:
+                return row
+            self._rows = None
+        raise ValueError(f"Data file {self.path} has no rows")
+
+
+def extract_value(response, expression: str) -> Any:
+    """Extract a value from a response with a ``json:path.to.value`` or ``header:Name`` expression"""
+    source, _, path = expression.partition(":")
+    if source == "header":
+        return response.headers.get(path)
+    if source != "json":
+        raise ValueError(f"Unsupported extraction source: {source}")
+
+    value = response.json()
+    for key in filter(None, path.split(".")):
+        value = value[int(key)] if isinstance(value, list) else value.get(key)
+        if value is None:
+            return None
+    return value
+
+
+class CompiledStep:
+    """Scenario step with its URL, headers and body pre-compiled into templates"""
+    __slots__ = ("method", "url", "headers", "body", "extract")
+
+    def __init__(self, step: ScenarioStep):
+        self.method = step.method.upper()
+        self.url = Template(step.url)
+        headers = dict(step.headers or {})
+        if step.body is not None and not isinstance(step.body, str):
+            headers.setdefault("Content-Type", "application/json")
+        self.headers = {name: Template(value) for name, value in headers.items()}
+        self.body = BodyTemplate(step.body) if step.body is not None else None
+        self.extract = step.extract or {}
+
+    def render(self, variables: Dict[str, Any]):
+        return (self.method, self.url.render(variables),
+                {name: value.render(variables) for name, value in self.headers.items()},
+                self.body.render(variables) if self.body else None)
+
+
+class ScenarioRunner:
+    """Executes scenario iterations through a tester so every step is recorded like a regular request"""
+
+    def __init__(self, scenario: Scenario):
+        self.steps: List[CompiledStep] = [CompiledStep(step) for step in scenario.steps]
+        self.feed = DataFeed(resolve_data_file(scenario.data_file), scenario.data_format) if scenario.data_file \
+            else None
+        if self.feed:
+            self.feed.validate()
+
+    async def run_iteration(self, tester, client, intended_start: Optional[float] = None):
+        """Run every step in order, stopping at the first failed request"""
+        variables = dict(self.feed.next_row()) if self.feed else {}
+        for index, step in enumerate(self.steps):
+            method, url, headers, content = step.render(variables)
+            response = await tester._make_request(client, intended_start if index == 0 else None, method=method,
+                                                  url=url, headers=headers, content=content)
+            if response is None or not response.is_success:
+                return
+            for name, expression in step.extract.items():
+                try:
+                    variables[name] = extract_value(response, expression)
+                except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+                    variables[name] = None
@@ -0,0 +1,162 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.web_server.core.base_tester import BaseTester
+from app.web_server.core.http_engine import run
+from app.web_server.storage.base import BaseStorage
+
+logger = logging.getLogger(__name__)
+
+ORPHANED_ERROR = "The server stopped before the test finished"
+
+
+class TestScheduler:
+    """Admission queue that runs submitted tests by priority, with at most `max_concurrent` executing at once.
+
+    Each running test gets a dedicated thread with its own event loop, so its request timing is not disturbed by the
+    loop serving API and dashboard traffic, nor by other tests. Every status change is persisted to `storage`, and
+    a cancelled or failed test still stores the metrics it recorded up to that point.
+    """
+
+    def __init__(self, storage: BaseStorage, max_concurrent: int = 1):
+        self.storage = storage
+        self.max_concurrent = max(max_concurrent, 1)
+        self.active: Dict[str, BaseTester] = {}
+        self._queue: List[tuple] = []
+        self._queued: Dict[str, BaseTester] = {}
+        self._order = itertools.count()
+        self._threads: Dict[str, threading.Thread] = {}
+        self._tasks: Dict[str, tuple] = {}
+        self._cancel_requested = set()
+        self._lock = threading.Lock()
+
+    def submit(self, tester: BaseTester, priority: int = 0):
+        """Queue a test, starting it right away when a slot is free; higher priorities leave the queue first"""
+        tester.test_result.status = "queued"
+        self.storage.save(tester.test_id, tester.test_result)
+        with self._lock:
+            self._queued[tester.test_id] = tester
+            heapq.heappush(self._queue, (-priority, next(self._order), tester.test_id))
+        self._dispatch()
+        return tester.test_result
+
+    def _dispatch(self):
+        """Start queued tests while fewer than `max_concurrent` are running"""
+        with self._lock:
+            while self._queue and len(self.active) < self.max_concurrent:
+                _, _, test_id = heapq.heappop(self._queue)
+                tester = self._queued.pop(test_id, None)
+                if tester is None:
+                    continue
+                self.active[test_id] = tester
+                thread = threading.Thread(target=self._run, args=(tester,), name=f"test-{test_id}", daemon=True)
+                self._threads[test_id] = thread
+                thread.start()
+
+    def _run(self, tester: BaseTester):
+        """Thread entry point: run the test on a private event loop, then hand the slot to the next queued test"""
+        try:
+            run(self._execute(tester))
+        except Exception:
+            logger.exception(f"Test {tester.test_id} crashed")
+        finally:
+            with self._lock:
+                self.active.pop(tester.test_id, None)
+                self._threads.pop(tester.test_id, None)
+                self._tasks.pop(tester.test_id, None)
+                self._cancel_requested.discard(tester.test_id)
+            self._dispatch()
+
+    async def _execute(self, tester: BaseTester):
+        test_id = tester.test_id
+        task = asyncio.current_task()
+        with self._lock:
+            self._tasks[test_id] = (asyncio.get_running_loop(), task)
+            if test_id in self._cancel_requested:
+                task.cancel()
+
+        tester.test_result.status = "running"
+        tester.test_result.start_time = datetime.now()
+        self.storage.save(test_id, tester.test_result)
+
+        monitor_task = asyncio.create_task(tester.monitor_resources())
+        try:
+            await tester.run()
+        except asyncio.CancelledError:
+            tester.finalize("cancelled")
+        except Exception as e:
+            logger.exception(f"Test {test_id} failed")
+            tester.finalize("failed")
+            tester.test_result.errors = (tester.test_result.errors or []) + [str(e)]
+        finally:
+            tester.monitoring = False
+            await monitor_task
+            self.storage.save(test_id, tester.test_result)
+
+    def cancel(self, test_id: str) -> bool:
+        """Cancel a queued or running test, returning False when it is not scheduled (unknown or finished)"""
+        with self._lock:
+            tester = self._queued.pop(test_id, None)
+            if tester is None:
+                if test_id not in self.active:
+                    return False
+                if test_id in self._cancel_requested:
+                    return True
+                self._cancel_requested.add(test_id)
+                if test_id in self._tasks:
+                    loop, task = self._tasks[test_id]
+                    loop.call_soon_threadsafe(task.cancel)
+                return True
+
+        tester.finalize("cancelled")
+        self.storage.save(test_id, tester.test_result)
+        return True
+
+    def fail_orphans(self) -> int:
+        """Mark stored tests left queued or running by a server that was killed as failed, returning how many.
+
+        Tests this scheduler is running or queueing are left alone, so it is safe to call at any time.
+        """
+        orphans = []
+        for status in ("queued", "running"):
+            cursor = None
+            while True:
+                summaries, cursor = self.storage.list_summaries(limit=500, cursor=cursor, status=status)
+                orphans.extend(summary.test_id for summary in summaries
+                               if summary.test_id not in self.active and summary.test_id not in self._queued)
+                if cursor is None:
+                    break
+
+        for test_id in orphans:
+            test_result = self.storage.get(test_id)
+            logger.warning(f"Test {test_id} was left {test_result.status} by a previous server, marking it failed")
+            test_result.status = "failed"
+            test_result.errors = (test_result.errors or []) + [ORPHANED_ERROR]
+            self.storage.save(test_id, test_result)
+        return len(orphans)
+
+    def join(self, test_id: str, timeout: Optional[float] = None):
+        """Block until the thread running `test_id` exits, e.g. to wait for a cancellation to be saved"""
+        thread = self._threads.get(test_id)
+        if thread is not None:
+            thread.join(timeout)
+
+    def status(self) -> Dict:
+        """Return the running tests and the queued ones in the order they will start"""
+        with self._lock:
+            entries = [entry for entry in sorted(self._queue) if entry[2] in self._queued]
+            queued = [{"test_id": test_id, "priority": -priority, "position": position}
+                      for position, (priority, _, test_id) in enumerate(entries)]
+            return {"max_concurrent": self.max_concurrent, "running": list(self.active), "queued": queued}
+
+    def shutdown(self, timeout: float = 10.0):
+        """Cancel every queued and running test and wait for their partial results to be saved"""
+        for test_id in list(self._queued) + list(self.active):
+            self.cancel(test_id)
+        for thread in list(self._threads.values()):
+            thread.join(timeout)
@@ -1,27 +1,74 @@
 import asyncio
+import math
+import time
 from datetime import datetime
 
-import httpx
-
 from app.web_server.core.base_tester import BaseTester
+from app.web_server.core.http_engine import HttpEngine
+from app.web_server.core.load_profile import level_at, max_level
+from app.web_server.core.performance_tester import IDLE_TICK
 
 
 class StressTester(BaseTester):
     """Stress tester that executes a fixed number of requests with controlled concurrency"""
+    def __init__(self, config):
+        super().__init__(config)
+        self._remaining = config.requests
+        self._busy_time = 0.0
+        self._started = None
+
     async def run(self):
         self.start_time = datetime.now()
+        self._remaining = self.config.requests
+        self._busy_time = 0.0
 
-        async with httpx.AsyncClient() as client:
-            tasks = []
-            for _ in range(self.config.requests):
-                tasks.append(self._make_request(client))
-                if len(tasks) >= self.config.concurrency:
-                    await asyncio.gather(*tasks)
-                    tasks = []
-
-            if tasks:
-                await asyncio.gather(*tasks)
+        async with self._create_client() as client, self.health.sampling(self.live):
+            pool_size = math.ceil(max_level(self.config.load_profile)) if self.config.load_profile \
+                else self.config.concurrency
+            self._started = time.perf_counter()
+            workers = [self._worker(client, index) for index in range(min(pool_size, self.config.requests))]
+            await asyncio.gather(*workers)
+            finished = time.perf_counter()
 
         self.end_time = datetime.now()
         self._calculate_metrics()
+        self.test_result.effective_concurrency = self._effective_concurrency(finished)
         return self.test_result
+
+    def _effective_concurrency(self, until: float) -> float:
+        """Average number of workers busy with a request between the start of the run and `until`"""
+        elapsed = until - self._started if self._started is not None else 0
+        return self._busy_time / elapsed if elapsed > 0 else 0
+
+    def summary(self):
+        """Report the effective concurrency reached so far while the run is in progress"""
+        summary = super().summary()
+        if self.end_time is None:
+            summary["effective_concurrency"] = self._effective_concurrency(time.perf_counter())
+        return summary
+
+    def finalize(self, status: str):
+        """Close out a cancelled or failed run, with the effective concurrency of the requests it completed"""
+        super().finalize(status)
+        self.test_result.effective_concurrency = self._effective_concurrency(time.perf_counter())
+
+    async def _worker(self, client: HttpEngine, index: int):
+        """Keep one request in flight, pulling from the shared request budget until it is exhausted.
+
+        With a load profile, workers beyond the profile's current level stay idle.
+        """
+        profile = self.config.load_profile
+        while self._remaining > 0:
+            if profile and index >= round(level_at(profile, time.perf_counter() - self._started)):
+                await asyncio.sleep(IDLE_TICK)
+                continue
+
+            self._remaining -= 1
+            start = time.perf_counter()
+            try:
+                await self._run_iteration(client)
+            finally:
+                self._busy_time += time.perf_counter() - start
+
+            if self.config.think_time and self._remaining > 0:
+                await asyncio.sleep(self.config.think_time)
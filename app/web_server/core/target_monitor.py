@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from app.web_server.core.downsampling import columns_to_rows, downsample
+
+logger = logging.getLogger(__name__)
+
+TARGET_FIELDS = ("timestamp", "cpu_percent", "memory_percent", "memory_used", "network_sent", "network_recv")
+PULL_INTERVAL = 1.0  # seconds between batch pulls from the target agent
+PULL_TIMEOUT = 5.0  # seconds
+
+
+class TargetMonitor:
+    """Collector of the resource samples buffered by a target host agent (``app/target_agent_main.py``).
+
+    Batches are pulled every ``PULL_INTERVAL`` seconds into a fixed-size ring buffer. Every pull is also a clock
+    probe: the agent stamps its answer with its own time, and the offset between the two clocks is estimated as that
+    time minus the midpoint of the request. The estimate of the fastest round trip is kept, so its error stays below
+    half that round trip. Samples keep the agent's timestamps and are shifted by the best offset when read, which
+    lines them up with the per-second latency buckets recorded by the tester.
+    """
+
+    def __init__(self, url: str, buffer_size: int = 36000):
+        self.url = url.rstrip("/")
+        self.buffer_size = buffer_size
+        self.seq = 0
+        self.clock_offset = 0.0  # agent clock minus local clock, in seconds
+        self.round_trip: Optional[float] = None
+        self.interval: Optional[float] = None
+        self.dropped = 0
+        self.last_error: Optional[str] = None
+        self._values = np.zeros((buffer_size, len(TARGET_FIELDS)))
+        self._cursor = 0
+        self._lock = threading.Lock()
+
+        self._cpu_max = 0.0
+        self._cpu_total = 0.0
+        self._memory_max = 0.0
+        self._memory_total = 0.0
+        self._network_sent_max = 0.0
+        self._network_recv_max = 0.0
+
+    async def _probe(self, client: httpx.AsyncClient, path: str, params: Optional[Dict] = None) -> Dict:
+        started = time.time()
+        response = await client.get(f"{self.url}{path}", params=params)
+        finished = time.time()
+        response.raise_for_status()
+        data = response.json()
+        round_trip = finished - started
+        if self.round_trip is None or round_trip <= self.round_trip:
+            self.round_trip = round_trip
+            self.clock_offset = data["agent_time"] - (started + finished) / 2
+        self.interval = data["interval"]
+        return data
+
+    async def pull(self, client: httpx.AsyncClient) -> bool:
+        """Pull one batch of samples into the buffer, returning whether the agent has more waiting"""
+        batch = await self._probe(client, "/samples", {"cursor": self._cursor})
+        samples = batch["samples"]
+        values = np.column_stack([np.asarray(samples[field], dtype=np.float64) for field in TARGET_FIELDS])
+        self._cursor = batch["cursor"]
+        self.dropped += batch["dropped"]
+        if not len(values):
+            return batch["more"]
+
+        with self._lock:
+            kept = values[-self.buffer_size:]
+            self.seq += len(values) - len(kept)
+            self._values[(self.seq + np.arange(len(kept))) % self.buffer_size] = kept
+            self.seq += len(kept)
+            self._cpu_max = max(self._cpu_max, float(values[:, 1].max()))
+            self._cpu_total += float(values[:, 1].sum())
+            self._memory_max = max(self._memory_max, float(values[:, 3].max()))
+            self._memory_total += float(values[:, 3].sum())
+            self._network_sent_max = max(self._network_sent_max, float(values[:, 4].max()))
+            self._network_recv_max = max(self._network_recv_max, float(values[:, 5].max()))
+        return batch["more"]
+
+    async def run(self, running: Callable[[], bool]):
+        """Pull batches while `running()` holds, then once more to drain what the agent buffered since.
+
+        Collection starts at the agent's current sample, so history buffered before the test is skipped. Agent
+        failures are kept in `last_error` and retried on the next pull instead of failing the test.
+        """
+        started = False
+        async with httpx.AsyncClient(timeout=PULL_TIMEOUT) as client:
+            while True:
+                active = running()
+                try:
+                    if not started:
+                        self._cursor = (await self._probe(client, "/health"))["seq"]
+                        started = True
+                    while await self.pull(client):
+                        pass
+                    self.last_error = None
+                except (httpx.HTTPError, ValueError, KeyError) as e:
+                    if self.last_error is None:
+                        logger.warning(f"Target agent {self.url} unavailable: {e}")
+                    self.last_error = f"{type(e).__name__}: {e}"
+                if not active:
+                    break
+                await asyncio.sleep(PULL_INTERVAL)
+
+    def columns(self, cursor: int = 0) -> Tuple[np.ndarray, np.ndarray, int]:
+        """Return the aligned timestamps and the value columns of the retained samples from `cursor` on"""
+        with self._lock:
+            start = max(cursor, self.seq - self.buffer_size, 0)
+            indexes = np.arange(start, self.seq) % self.buffer_size
+            values = self._values[indexes]
+            return values[:, 0] - self.clock_offset, values[:, 1:], self.seq
+
+    def samples_since(self, cursor: int = 0, max_points: Optional[int] = None) -> Tuple[List[Dict], int]:
+        """Return the retained samples from `cursor` on, downsampled to `max_points` rows when given"""
+        timestamps, values, next_cursor = self.columns(cursor)
+        if max_points:
+            timestamps, values = downsample(timestamps, values, max_points)
+        times = [datetime.fromtimestamp(timestamp).isoformat() for timestamp in timestamps.tolist()]
+        return columns_to_rows(times, values, TARGET_FIELDS[1:]), next_cursor
+
+    @property
+    def metrics(self) -> Dict:
+        """Aggregates over every pulled sample, with the clock alignment and collection health"""
+        metrics = {"agent_url": self.url, "samples": self.seq, "dropped": self.dropped, "interval": self.interval,
+                   "clock_offset": self.clock_offset,
+                   "clock_uncertainty": self.round_trip / 2 if self.round_trip is not None else None,
+                   "last_error": self.last_error}
+        if self.seq:
+            metrics.update(max_cpu=self._cpu_max, avg_cpu=self._cpu_total / self.seq, max_memory=self._memory_max,
+                           avg_memory=self._memory_total / self.seq, max_network_sent=self._network_sent_max,
+                           max_network_recv=self._network_recv_max)
+        return metrics
@@ -0,0 +1,18 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.web_server.models.config import TestConfig
+
+
+class AgentRegistration(BaseModel):
+    """Model used to register a load generator agent with the coordinator"""
+    url: str
+
+
+class AgentRunRequest(BaseModel):
+    """Model describing one shard of a distributed test sent from the coordinator to an agent"""
+    run_id: str
+    tester: str
+    config: TestConfig
+    start_at: Optional[float] = None  # epoch timestamp shared by every agent of the test
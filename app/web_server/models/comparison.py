@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class RegressionThresholds(BaseModel):
+    """Pass/fail limits for a test compared with its baseline; a limit set to None is not checked"""
+    max_p50_increase: Optional[float] = 0.10  # relative increase of the median latency
+    max_p99_increase: Optional[float] = 0.10  # relative increase of the 99th percentile latency
+    max_rps_decrease: Optional[float] = 0.10  # relative decrease of requests per second
+    max_error_rate_increase: Optional[float] = 0.01  # absolute increase of the share of failed requests
+    require_significance: bool = True  # only fail on changes that are statistically significant
+
+
+class Baseline(BaseModel):
+    """Named reference test that later runs of the same configuration are gated against"""
+    test_id: str
+    thresholds: RegressionThresholds = RegressionThresholds()
+    updated_at: Optional[datetime] = None
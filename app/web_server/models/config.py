@@ -2,6 +2,9 @@ from typing import Optional, Dict
 
 from pydantic import BaseModel
 
+from app.web_server.models.load_profile import CapacitySearch, LoadProfile
+from app.web_server.models.scenario import Scenario
+
 
 class TestConfig(BaseModel):
     """Configuration model for performance and stress tests"""
@@ -9,5 +12,32 @@ class TestConfig(BaseModel):
     requests: int = 100
     concurrency: int = 10
     duration: Optional[int] = None
+    method: str = "GET"
     headers: Optional[Dict] = None
     payload: Optional[Dict] = None
+    scenario: Optional[Scenario] = None  # multi-step requests; each scenario iteration counts as one of `requests`
+    think_time: Optional[float] = None  # seconds each stress worker pauses between its requests
+    workers: int = 1  # number of load generator processes the test is split across (per agent when distributed)
+    distributed: bool = False  # fan the test out to the registered agents instead of running it locally
+    live_buckets: int = 3600  # per-second live metric buckets kept in memory
+    max_connections: Optional[int] = None  # connection pool size, defaults to concurrency (or max_in_flight)
+    keep_alive: bool = True  # reuse connections; False opens a new connection per request
+    http2: bool = False
+    engine: str = "httpx"  # HTTP client: "httpx", or "raw" for the lean HTTP/1.1 engine on asyncio protocols
+    pipelining: int = 1  # requests written per connection before their responses arrive (raw engine only)
+    connect_timeout: float = 5.0
+    read_timeout: float = 5.0
+    write_timeout: float = 5.0
+    pool_timeout: float = 5.0
+    monitor_interval: float = 1.0  # seconds between resource samples
+    resource_buffer_size: int = 3600  # resource samples retained in the ring buffer
+    target_agent_url: Optional[str] = None  # target host agent (app/target_agent_main.py) to pull resources from
+    target_buffer_size: int = 36000  # target host samples retained, one hour at the agent's default interval
+    monitor_in_thread: bool = False  # sample resources in a background thread instead of on the event loop
+    histogram_precision: int = 2  # significant decimal digits kept by the latency histogram
+    record_samples: bool = False  # spill every request sample to disk for export via /test-results/{id}/samples
+    target_rps: Optional[float] = None  # enables open-loop (constant arrival rate) mode
+    max_in_flight: Optional[int] = None  # cap on outstanding requests in open-loop mode
+    load_profile: Optional[LoadProfile] = None  # varies concurrency (or target_rps in open-loop mode) over time
+    capacity_search: Optional[CapacitySearch] = None
+    priority: int = 0  # tests with a higher priority leave the scheduler queue first
@@ -0,0 +1,37 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class LoadStep(BaseModel):
+    """Constant load level held for a number of seconds"""
+    duration: float
+    level: float
+
+
+class LoadProfile(BaseModel):
+    """Time-varying load level: concurrent users in closed-loop tests, requests per second in open-loop tests.
+
+    `linear_ramp` goes from `start_level` to `end_level` over `ramp_duration` and then holds; `steps` walks through
+    `steps` and holds the last level; `spike` holds `start_level` and jumps to `spike_level` from `spike_start` for
+    `spike_duration` seconds.
+    """
+    type: str = "linear_ramp"
+    start_level: float = 1
+    end_level: Optional[float] = None
+    ramp_duration: Optional[float] = None
+    steps: Optional[List[LoadStep]] = None
+    spike_level: Optional[float] = None
+    spike_start: Optional[float] = None
+    spike_duration: Optional[float] = None
+
+
+class CapacitySearch(BaseModel):
+    """Settings of a capacity search: load grows step by step until a latency or error-rate SLO is breached"""
+    mode: str = "rps"  # "rps" steps the open-loop arrival rate, "concurrency" steps closed-loop users
+    start_level: float = 10
+    step_size: float = 10
+    max_level: float = 1000
+    step_duration: int = 10
+    max_p99: float = 1.0  # seconds
+    max_error_rate: float = 0.01
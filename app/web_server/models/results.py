@@ -16,9 +16,50 @@ class TestResult(BaseModel):
     average_response_time: float
     min_response_time: float
     max_response_time: float
-    percentile_90: float
+    percentile_50: float = 0
+    percentile_75: float = 0
+    percentile_90: float = 0
+    percentile_95: float = 0
+    percentile_99: float = 0
+    percentile_99_9: float = 0
     requests_per_second: float
+    missed_sends: int = 0
+    late_sends: int = 0
+    effective_concurrency: float = 0
+    generator_bound: bool = False  # the load generator, not the target, limited the test
     status: str = "running"
     errors: Optional[List[str]] = None
     resource_stats: Optional[List[Dict]] = None
+    resource_stats_seq: int = 0  # sampler sequence number of the first stored resource sample
     resource_metrics: Optional[Dict] = None
+    target_stats: Optional[List[Dict]] = None  # target host samples, aligned to the local clock
+    target_stats_seq: int = 0  # sequence number of the first stored target host sample
+    target_metrics: Optional[Dict] = None
+    target_correlation: Optional[Dict] = None  # coefficients of target resources with per-second latency
+    latency_histogram: Optional[Dict] = None
+    timeline: Optional[List[Dict]] = None
+    phase_timings: Optional[Dict[str, Dict]] = None
+    capacity_steps: Optional[List[Dict]] = None
+    capacity_knee: Optional[Dict] = None
+    generator_metrics: Optional[Dict] = None
+    error_taxonomy: Optional[Dict] = None  # failures by error class and counts of every HTTP status code
+
+
+class TestSummary(BaseModel):
+    """Lightweight projection of a TestResult used when listing stored tests"""
+    test_id: str
+    test_type: str
+    status: str
+    start_time: datetime
+    end_time: Optional[datetime] = None
+    total_requests: int
+    successful_requests: int
+    failed_requests: int
+    average_response_time: float
+    percentile_99: float = 0
+    requests_per_second: float
+    generator_bound: bool = False
+
+    @classmethod
+    def from_result(cls, result: TestResult) -> "TestSummary":
+        return cls(**{field: getattr(result, field) for field in cls.model_fields})
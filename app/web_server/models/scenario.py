@@ -0,0 +1,25 @@
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class ScenarioStep(BaseModel):
+    """Single HTTP request of a scenario.
+
+    `url`, header values and `body` may reference variables as ``${name}``; variables come from the current data
+    file row and from values extracted by earlier steps, e.g. ``{"token": "json:data.access_token"}`` or
+    ``{"session": "header:X-Session-Id"}``.
+    """
+    name: Optional[str] = None
+    method: str = "GET"
+    url: str
+    headers: Optional[Dict[str, str]] = None
+    body: Optional[Any] = None  # dicts and lists are sent as JSON, strings as-is
+    extract: Optional[Dict[str, str]] = None
+
+
+class Scenario(BaseModel):
+    """Ordered list of steps executed as one iteration, with an optional CSV/JSONL data feed"""
+    steps: List[ScenarioStep]
+    data_file: Optional[str] = None  # name of a file in the scenario data directory (SCENARIO_DATA_DIR)
+    data_format: Optional[str] = None  # "csv" or "jsonl", inferred from the file extension when omitted
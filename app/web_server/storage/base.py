@@ -0,0 +1,63 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.web_server.models.comparison import Baseline
+from app.web_server.models.results import TestResult, TestSummary
+
+# bulky fields stored apart from summaries
+SERIES_FIELDS = ("resource_stats", "timeline", "latency_histogram", "target_stats")
+
+
+class BaseStorage(ABC):
+    """Interface implemented by every test result storage backend"""
+    version = 0  # incremented on every save, lets callers detect changes cheaply
+
+    @abstractmethod
+    def save(self, test_id: str, result: TestResult):
+        """Store or replace a test result"""
+
+    @abstractmethod
+    def get(self, test_id: str, include_series: bool = True) -> Optional[TestResult]:
+        """Retrieve a test result by its ID, optionally without its bulky time series"""
+
+    @abstractmethod
+    def delete(self, test_id: str) -> bool:
+        """Remove a test result and its time series, returning whether it was stored"""
+
+    @abstractmethod
+    def get_all(self) -> List[TestResult]:
+        """Get the summaries of all stored test results, newest first"""
+
+    @abstractmethod
+    def list_summaries(self, limit: int = 50, cursor: Optional[str] = None, test_type: Optional[str] = None,
+                       status: Optional[str] = None, start_from: Optional[datetime] = None,
+                       start_to: Optional[datetime] = None) -> Tuple[List[TestSummary], Optional[str]]:
+        """Return one page of summaries, newest first, and the cursor of the next page (None on the last page)"""
+
+    @abstractmethod
+    def get_series(self, test_id: str, name: str) -> Optional[Any]:
+        """Retrieve one bulky field (see `SERIES_FIELDS`) of a stored test result"""
+
+    @abstractmethod
+    def save_baseline(self, name: str, baseline: Baseline):
+        """Store or replace the baseline tagged `name`"""
+
+    @abstractmethod
+    def get_baseline(self, name: str) -> Optional[Baseline]:
+        """Retrieve the baseline tagged `name`"""
+
+    @abstractmethod
+    def list_baselines(self) -> Dict[str, Baseline]:
+        """Return every baseline by tag"""
+
+
+def encode_cursor(summary: TestSummary) -> str:
+    """Build the keyset pagination cursor pointing after `summary`"""
+    return f"{summary.start_time.isoformat()}|{summary.test_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Split a pagination cursor into its start time and test ID"""
+    start_time, _, test_id = cursor.partition("|")
+    return start_time, test_id
@@ -1,22 +1,138 @@
-from typing import Dict
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from app.web_server.models.results import TestResult
+from app.web_server.models.comparison import Baseline
+from app.web_server.models.results import TestResult, TestSummary
+from app.web_server.storage.base import BaseStorage, decode_cursor, encode_cursor
 
 
-class MemoryStorage:
-    """In-memory storage for test results using a dictionary-based implementation"""
-    def __init__(self):
-        """Initialize the memory storage with an empty dictionary"""
-        self._storage: Dict[str, TestResult] = {}
+class MemoryStorage(BaseStorage):
+    """In-memory LRU cache of test results, optionally in front of a persistent storage backend.
+
+    Running tests are never evicted: their cached result is updated in place as they progress, while the backend
+    only holds the copy saved when they started.
+    """
+    def __init__(self, backend: Optional[BaseStorage] = None, max_entries: int = 100,
+                 on_remove: Optional[Callable[[str], None]] = None):
+        """Initialize the cache, bounded to `max_entries` results, writing through to `backend` when given.
+
+        `on_remove` is called with the ID of every result that leaves the storage for good: deleted ones, and
+        evicted ones when there is no backend to keep them.
+        """
+        self._storage: OrderedDict[str, TestResult] = OrderedDict()
+        self._backend = backend
+        self._max_entries = max_entries
+        self._on_remove = on_remove
+        self._baselines: Dict[str, Baseline] = {}
+        self._lock = threading.RLock()
+
+    def _cache(self, test_id: str, result: TestResult):
+        evicted = []
+        with self._lock:
+            self._storage[test_id] = result
+            self._storage.move_to_end(test_id)
+            while len(self._storage) > self._max_entries:
+                evictable = next((cached_id for cached_id, cached in self._storage.items()
+                                  if cached.status != "running" and cached_id != test_id), None)
+                if evictable is None:
+                    break
+                del self._storage[evictable]
+                evicted.append(evictable)
+        if self._on_remove and not self._backend:
+            for evicted_id in evicted:
+                self._on_remove(evicted_id)
 
     def save(self, test_id: str, result: TestResult):
-        """Store a test result in memory"""
-        self._storage[test_id] = result
+        """Store a test result in memory and in the backend"""
+        self._cache(test_id, result)
+        if self._backend:
+            self._backend.save(test_id, result)
+        self.version += 1
 
-    def get(self, test_id: str) -> TestResult:
-        """Retrieve a test result by its ID"""
-        return self._storage.get(test_id)
+    def get(self, test_id: str, include_series: bool = True) -> Optional[TestResult]:
+        """Retrieve a test result by its ID, falling back to the backend on a cache miss"""
+        with self._lock:
+            result = self._storage.get(test_id)
+            if result is not None:
+                self._storage.move_to_end(test_id)
+                return result
+
+        if self._backend:
+            result = self._backend.get(test_id, include_series)
+            if result is not None and include_series:
+                self._cache(test_id, result)
+        return result
+
+    def delete(self, test_id: str) -> bool:
+        """Remove a test result from memory and from the backend"""
+        with self._lock:
+            deleted = self._storage.pop(test_id, None) is not None
+        if self._backend:
+            deleted = self._backend.delete(test_id) or deleted
+        if deleted and self._on_remove:
+            self._on_remove(test_id)
+        self.version += 1
+        return deleted
 
     def get_all(self) -> list[TestResult]:
         """Get all stored test results"""
-        return list(self._storage.values())
+        if self._backend:
+            return self._backend.get_all()
+        with self._lock:
+            return list(self._storage.values())
+
+    def list_summaries(self, limit: int = 50, cursor: Optional[str] = None, test_type: Optional[str] = None,
+                       status: Optional[str] = None, start_from: Optional[datetime] = None,
+                       start_to: Optional[datetime] = None) -> Tuple[List[TestSummary], Optional[str]]:
+        """Return one page of summaries, preferring the cached (possibly still running) results over the backend"""
+        if self._backend:
+            summaries, next_cursor = self._backend.list_summaries(limit, cursor, test_type, status, start_from,
+                                                                  start_to)
+            with self._lock:
+                return [TestSummary.from_result(self._storage[s.test_id]) if s.test_id in self._storage else s
+                        for s in summaries], next_cursor
+
+        with self._lock:
+            results = list(self._storage.values())
+        summaries = sorted((TestSummary.from_result(r) for r in results), key=lambda s: (s.start_time, s.test_id),
+                           reverse=True)
+        if cursor:
+            cursor_start, cursor_id = decode_cursor(cursor)
+            summaries = [s for s in summaries if (s.start_time.isoformat(), s.test_id) < (cursor_start, cursor_id)]
+        summaries = [s for s in summaries if (not test_type or s.test_type == test_type)
+                     and (not status or s.status == status) and (not start_from or s.start_time >= start_from)
+                     and (not start_to or s.start_time <= start_to)]
+        page = summaries[:limit]
+        return page, encode_cursor(page[-1]) if len(summaries) > limit else None
+
+    def get_series(self, test_id: str, name: str) -> Optional[Any]:
+        """Retrieve one bulky field of a test result"""
+        with self._lock:
+            result = self._storage.get(test_id)
+        if result is not None:
+            return getattr(result, name)
+        return self._backend.get_series(test_id, name) if self._backend else None
+
+    def save_baseline(self, name: str, baseline: Baseline):
+        """Store a baseline in the backend, or in memory when there is none"""
+        if self._backend:
+            self._backend.save_baseline(name, baseline)
+            return
+        with self._lock:
+            self._baselines[name] = baseline
+
+    def get_baseline(self, name: str) -> Optional[Baseline]:
+        """Retrieve the baseline tagged `name`"""
+        if self._backend:
+            return self._backend.get_baseline(name)
+        with self._lock:
+            return self._baselines.get(name)
+
+    def list_baselines(self) -> Dict[str, Baseline]:
+        """Return every baseline by tag"""
+        if self._backend:
+            return self._backend.list_baselines()
+        with self._lock:
+            return dict(sorted(self._baselines.items()))
@@ -0,0 +1,146 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.web_server.models.comparison import Baseline
+from app.web_server.models.results import TestResult, TestSummary
+from app.web_server.storage.base import BaseStorage, SERIES_FIELDS, decode_cursor, encode_cursor
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS test_results (
+    test_id TEXT PRIMARY KEY,
+    test_type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT,
+    summary TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_test_results_type ON test_results (test_type, start_time);
+CREATE INDEX IF NOT EXISTS idx_test_results_status ON test_results (status, start_time);
+CREATE INDEX IF NOT EXISTS idx_test_results_start ON test_results (start_time);
+CREATE TABLE IF NOT EXISTS test_series (
+    test_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (test_id, name)
+);
+CREATE TABLE IF NOT EXISTS baselines (
+    name TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+
+class SQLiteStorage(BaseStorage):
+    """Persistent storage keeping indexed result summaries and, in a separate table, their bulky time series"""
+
+    def __init__(self, path: str = "test_results.db"):
+        """Open (and create if needed) the SQLite database at `path`"""
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def save(self, test_id: str, result: TestResult):
+        """Store the result summary and each non-empty bulky field in a single transaction, dropping the stored
+        fields that are now empty"""
+        summary = result.model_dump_json(exclude=set(SERIES_FIELDS))
+        series = [(test_id, name, json.dumps(getattr(result, name))) for name in SERIES_FIELDS
+                  if getattr(result, name)]
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO test_results (test_id, test_type, status, start_time, end_time, summary) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (test_id, result.test_type, result.status, result.start_time.isoformat(),
+                 result.end_time.isoformat() if result.end_time else None, summary))
+            self._connection.execute("DELETE FROM test_series WHERE test_id = ?", (test_id,))
+            self._connection.executemany("INSERT OR REPLACE INTO test_series (test_id, name, data) VALUES (?, ?, ?)",
+                                         series)
+            self.version += 1
+
+    def get(self, test_id: str, include_series: bool = True) -> Optional[TestResult]:
+        """Retrieve a test result by its ID, loading its time series only when requested"""
+        with self._lock:
+            row = self._connection.execute("SELECT summary FROM test_results WHERE test_id = ?",
+                                           (test_id,)).fetchone()
+            if row is None:
+                return None
+            data = json.loads(row[0])
+            if include_series:
+                for name, series in self._connection.execute("SELECT name, data FROM test_series WHERE test_id = ?",
+                                                             (test_id,)):
+                    data[name] = json.loads(series)
+        return TestResult(**data)
+
+    def delete(self, test_id: str) -> bool:
+        """Remove the result summary and its bulky fields in a single transaction"""
+        with self._lock, self._connection:
+            deleted = self._connection.execute("DELETE FROM test_results WHERE test_id = ?", (test_id,)).rowcount
+            self._connection.execute("DELETE FROM test_series WHERE test_id = ?", (test_id,))
+            self.version += 1
+        return deleted > 0
+
+    def get_all(self) -> List[TestResult]:
+        """Get the summaries of all stored test results, newest first"""
+        with self._lock:
+            rows = self._connection.execute("SELECT summary FROM test_results ORDER BY start_time DESC").fetchall()
+        return [TestResult.model_validate_json(row[0]) for row in rows]
+
+    def list_summaries(self, limit: int = 50, cursor: Optional[str] = None, test_type: Optional[str] = None,
+                       status: Optional[str] = None, start_from: Optional[datetime] = None,
+                       start_to: Optional[datetime] = None) -> Tuple[List[TestSummary], Optional[str]]:
+        """Return one page of summaries using the indexed columns for filtering and keyset pagination"""
+        clauses, params = [], []
+        if test_type:
+            clauses.append("test_type = ?")
+            params.append(test_type)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if start_from:
+            clauses.append("start_time >= ?")
+            params.append(start_from.isoformat())
+        if start_to:
+            clauses.append("start_time <= ?")
+            params.append(start_to.isoformat())
+        if cursor:
+            cursor_start, cursor_id = decode_cursor(cursor)
+            clauses.append("(start_time < ? OR (start_time = ? AND test_id < ?))")
+            params.extend([cursor_start, cursor_start, cursor_id])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT summary FROM test_results {where} ORDER BY start_time DESC, test_id DESC LIMIT ?",
+                (*params, limit + 1)).fetchall()
+
+        summaries = [TestSummary.model_validate_json(row[0]) for row in rows[:limit]]
+        next_cursor = encode_cursor(summaries[-1]) if len(rows) > limit else None
+        return summaries, next_cursor
+
+    def get_series(self, test_id: str, name: str) -> Optional[Any]:
+        """Retrieve one bulky field of a stored test result"""
+        with self._lock:
+            row = self._connection.execute("SELECT data FROM test_series WHERE test_id = ? AND name = ?",
+                                           (test_id, name)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_baseline(self, name: str, baseline: Baseline):
+        """Store or replace the baseline tagged `name`"""
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO baselines (name, data) VALUES (?, ?)",
+                                     (name, baseline.model_dump_json()))
+
+    def get_baseline(self, name: str) -> Optional[Baseline]:
+        """Retrieve the baseline tagged `name`"""
+        with self._lock:
+            row = self._connection.execute("SELECT data FROM baselines WHERE name = ?", (name,)).fetchone()
+        return Baseline.model_validate_json(row[0]) if row else None
+
+    def list_baselines(self) -> Dict[str, Baseline]:
+        """Return every baseline by tag"""
+        with self._lock:
+            rows = self._connection.execute("SELECT name, data FROM baselines ORDER BY name").fetchall()
+        return {name: Baseline.model_validate_json(data) for name, data in rows}
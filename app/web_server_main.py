@@ -1,65 +1,392 @@
 import asyncio
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import FastAPI, BackgroundTasks
+from fastapi import FastAPI, Header, Query, Response
+from fastapi.responses import StreamingResponse
 
+from app.web_server.core.capacity_tester import CapacityTester
+from app.web_server.core.comparison import check_thresholds, compare_results
+from app.web_server.core.coordinator import AgentRegistry, DistributedTester
+from app.web_server.core.correlation import correlate, rows_to_columns
+from app.web_server.core.downsampling import DownsampleCache, downsample_rows
 from app.web_server.core.performance_tester import PerformanceTester
+from app.web_server.core.process_pool import MultiProcessTester, shutdown_worker_pool
+from app.web_server.core.sample_recorder import EXPORT_FORMATS, delete_samples, export_samples, sample_files
+from app.web_server.core.scheduler import TestScheduler
 from app.web_server.core.stress_tester import StressTester
+from app.web_server.models.agent import AgentRegistration
+from app.web_server.models.comparison import Baseline
 from app.web_server.models.config import TestConfig
 from app.web_server.storage.memory_storage import MemoryStorage
+from app.web_server.storage.sqlite_storage import SQLiteStorage
 
 app = FastAPI()
-storage = MemoryStorage()
+storage = MemoryStorage(SQLiteStorage(os.getenv("RESULTS_DB_PATH", "test_results.db")),
+                        max_entries=int(os.getenv("RESULTS_CACHE_SIZE", "100")), on_remove=delete_samples)
+agents = AgentRegistry()
+scheduler = TestScheduler(storage, max_concurrent=int(os.getenv("MAX_CONCURRENT_TESTS", "1")))
+active_testers = scheduler.active
+downsample_cache = DownsampleCache()
 
+STREAM_INTERVAL = 1.0  # seconds between checks for new samples on push streams
+CANCEL_TIMEOUT = 10.0  # seconds DELETE /tests/{test_id} waits for a running test to stop and save its metrics
 
-async def _run_tester(tester):
-    """Common function to run tests and monitor resources."""
-    monitor_task = asyncio.create_task(tester.monitor_resources())
-    result = await tester.run()
-    tester.monitoring = False
-    await monitor_task
-    return result
 
+@app.on_event("startup")
+def _fail_orphaned_tests():
+    scheduler.fail_orphans()
 
-def _setup_test(tester, background_tasks: BackgroundTasks):
-    """Common setup for both test types."""
-    test_id = tester.test_id
-    storage.save(test_id, tester.test_result)
 
-    async def run_and_save():
-        result = await _run_tester(tester)
-        storage.save(test_id, result)
+@app.on_event("shutdown")
+def _shutdown_workers():
+    scheduler.shutdown()
+    shutdown_worker_pool()
 
-    background_tasks.add_task(run_and_save)
-    return tester.test_result
+
+def _create_tester(tester_class, config: TestConfig):
+    """Create a tester, fanning it out to agents or splitting it across worker processes when requested"""
+    if tester_class is CapacityTester:
+        if config.distributed:
+            raise ValueError("Capacity search cannot be distributed across agents")
+        return CapacityTester(config)
+    if config.distributed:
+        if config.record_samples:
+            raise ValueError("Raw samples cannot be recorded for distributed tests, they would stay on the agents")
+        return DistributedTester(config, tester_class, [agent["url"] for agent in agents.get_all()])
+    if config.workers > 1:
+        return MultiProcessTester(config, tester_class)
+    return tester_class(config)
+
+
+def _start_test(tester_class, config: TestConfig):
+    """Create a tester and queue it on the scheduler, reporting configuration problems as an error response"""
+    try:
+        tester = _create_tester(tester_class, config)
+    except ValueError as e:
+        return {"error": str(e)}
+    return scheduler.submit(tester, config.priority)
 
 
 @app.post("/stress-test")
-async def run_stress_test(config: TestConfig, background_tasks: BackgroundTasks):
-    tester = StressTester(config)
-    return _setup_test(tester, background_tasks)
+async def run_stress_test(config: TestConfig):
+    return _start_test(StressTester, config)
 
 
 @app.post("/performance-test")
-async def run_performance_test(config: TestConfig, background_tasks: BackgroundTasks):
-    tester = PerformanceTester(config)
-    return _setup_test(tester, background_tasks)
+async def run_performance_test(config: TestConfig):
+    return _start_test(PerformanceTester, config)
+
+
+@app.post("/capacity-test")
+async def run_capacity_test(config: TestConfig):
+    return _start_test(CapacityTester, config)
+
+
+@app.get("/tests")
+async def list_scheduled_tests():
+    return scheduler.status()
+
+
+@app.delete("/tests/{test_id}")
+async def cancel_test(test_id: str):
+    """Cancel a queued or running test; a running one is given `CANCEL_TIMEOUT` seconds to save partial metrics"""
+    if not scheduler.cancel(test_id):
+        return {"error": "Test not found or already finished"}
+
+    await asyncio.get_running_loop().run_in_executor(None, scheduler.join, test_id, CANCEL_TIMEOUT)
+    test_result = storage.get(test_id, include_series=False)
+    return {"test_id": test_id, "status": test_result.status if test_result else "cancelled"}
+
+
+@app.post("/agents")
+async def register_agent(registration: AgentRegistration):
+    return agents.register(registration.url)
+
+
+@app.get("/agents")
+async def list_agents():
+    return agents.get_all()
+
+
+@app.delete("/agents")
+async def unregister_agent(url: str):
+    return {"deleted": agents.unregister(url)}
 
 
 @app.get("/test-results/{test_id}")
-async def get_test_result(test_id: str):
-    return storage.get(test_id) or {"error": "Test not found"}
+async def get_test_result(test_id: str, include_series: bool = True):
+    return storage.get(test_id, include_series) or {"error": "Test not found"}
+
+
+@app.delete("/test-results/{test_id}")
+async def delete_test_result(test_id: str):
+    """Delete a finished test's result, time series and recorded samples"""
+    test_result = storage.get(test_id, include_series=False)
+    if not test_result:
+        return {"error": "Test not found"}
+    if test_result.status in ("queued", "running"):
+        return {"error": "Test is still queued or running, cancel it first"}
+    return {"deleted": storage.delete(test_id)}
+
+
+@app.get("/test-results/{test_id}/samples")
+async def get_test_samples(test_id: str, format: str = Query("ndjson", pattern="^(ndjson|csv|arrow)$"),
+                           start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Stream the raw request samples recorded with `record_samples`, optionally only those completed between
+    `start` and `end`"""
+    if not storage.get(test_id, include_series=False):
+        return {"error": "Test not found"}
+    if not sample_files(test_id):
+        return {"error": "No samples recorded for this test"}
+    if format == "arrow":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return {"error": "Arrow export requires the pyarrow package"}
+
+    chunks = export_samples(test_id, format, start.timestamp() if start else None, end.timestamp() if end else None)
+    return StreamingResponse(chunks, media_type=EXPORT_FORMATS[format],
+                             headers={"Content-Disposition": f'attachment; filename="{test_id}.{format}"'})
+
+
+def _results_etag(*parts) -> str:
+    """Weak ETag derived from the storage version, the query and the progress of running tests"""
+    progress = sorted((test_id, tester.request_count, tester.test_result.status)
+                      for test_id, tester in list(active_testers.items()))
+    digest = hashlib.sha1(repr((storage.version, parts, progress)).encode()).hexdigest()
+    return f'W/"{digest}"'
 
 
 @app.get("/test-results")
-async def list_test_results():
-    return storage.get_all()
+async def list_test_results(response: Response, limit: int = Query(50, ge=1, le=500), cursor: Optional[str] = None,
+                            test_type: Optional[str] = None, status: Optional[str] = None,
+                            start_from: Optional[datetime] = None, start_to: Optional[datetime] = None,
+                            if_none_match: Optional[str] = Header(None)):
+    etag = _results_etag(limit, cursor, test_type, status, start_from, start_to)
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    summaries, next_cursor = storage.list_summaries(limit, cursor, test_type, status, start_from, start_to)
+    response.headers["ETag"] = etag
+    return {"items": summaries, "next_cursor": next_cursor}
+
+
+@app.put("/baselines/{name}")
+async def save_baseline(name: str, baseline: Baseline):
+    """Tag a finished test as the baseline `name`, with the thresholds later runs are gated against"""
+    test_result = storage.get(baseline.test_id, include_series=False)
+    if not test_result or test_result.status in ("queued", "running"):
+        return {"error": "Test not found or not finished"}
+
+    baseline.updated_at = datetime.now()
+    storage.save_baseline(name, baseline)
+    return baseline
+
+
+@app.get("/baselines")
+async def list_baselines():
+    return storage.list_baselines()
+
+
+@app.get("/compare")
+async def compare_tests(test_ids: List[str] = Query([]), baseline: Optional[str] = None):
+    """Compare tests against a reference: the `baseline` tag when given (adding a pass/fail verdict from its
+    thresholds), otherwise the first of `test_ids`"""
+    tag = None
+    if baseline:
+        tag = storage.get_baseline(baseline)
+        if not tag:
+            return {"error": "Baseline not found"}
+        test_ids = [tag.test_id] + [test_id for test_id in test_ids if test_id != tag.test_id]
+    if len(test_ids) < 2:
+        return {"error": "At least two tests are needed, or one test and a baseline"}
+
+    results = []
+    for test_id in test_ids:
+        test_result = storage.get(test_id, include_series=False)
+        if not test_result or test_result.status in ("queued", "running"):
+            return {"error": f"Test {test_id} not found or not finished"}
+        # Only the series the comparison reads are loaded, not the resource and target samples
+        results.append(test_result.model_copy(update={name: storage.get_series(test_id, name)
+                                                      for name in ("latency_histogram", "timeline")}))
+
+    reference, candidates = results[0], results[1:]
+    comparisons = [compare_results(reference, candidate) for candidate in candidates]
+    response = {"reference_id": reference.test_id, "comparisons": comparisons}
+    if tag:
+        for comparison in comparisons:
+            comparison["violations"] = check_thresholds(comparison, tag.thresholds)
+            comparison["passed"] = not comparison["violations"]
+        response.update(baseline=baseline, thresholds=tag.thresholds,
+                        passed=all(comparison["passed"] for comparison in comparisons))
+    return response
+
+
+def _resource_stats_since(test_id: str, cursor: int, max_points: Optional[int] = None):
+    """Return the resource samples after `cursor`, the next cursor and whether the test is still running.
+
+    The cursor is the sampler sequence number both while the test runs and once its samples are stored, so a client
+    polling across completion resumes where it left off. With `max_points`, the samples are downsampled (keeping each
+    interval's minimum and maximum) before serialization.
+    """
+    tester = active_testers.get(test_id)
+    if tester:
+        if max_points:
+            samples, next_cursor = downsample_cache.get_or_compute(
+                (test_id, "resource_stats", cursor, max_points, tester.sampler.seq),
+                lambda: tester.sampler.samples_since(cursor, max_points))
+        else:
+            samples, next_cursor = tester.sampler.samples_since(cursor)
+        return {"resource_stats": samples, "cursor": next_cursor, "resource_metrics": tester.sampler.metrics,
+                "running": True}
+
+    test_result = storage.get(test_id, include_series=False)
+    if not test_result:
+        return None
+
+    def stored_samples():
+        samples = storage.get_series(test_id, "resource_stats") or []
+        first_seq = test_result.resource_stats_seq
+        selected = samples[max(cursor - first_seq, 0):]
+        if max_points:
+            selected = downsample_rows(selected, max_points, iso_timestamps=True)
+        return selected, max(first_seq + len(samples), cursor)
+
+    if max_points:
+        samples, next_cursor = downsample_cache.get_or_compute((test_id, "resource_stats", cursor, max_points, "final"),
+                                                               stored_samples)
+    else:
+        samples, next_cursor = stored_samples()
+    return {"resource_stats": samples, "cursor": next_cursor, "resource_metrics": test_result.resource_metrics or {},
+            "running": False}
 
 
 @app.get("/resource-stats/{test_id}")
-async def get_resource_stats(test_id: str):
-    test_result = storage.get(test_id)
+async def get_resource_stats(test_id: str, cursor: int = 0, max_points: Optional[int] = Query(None, ge=2)):
+    """Return the resource samples after `cursor`, downsampled to at most `max_points` rows when given"""
+    stats = _resource_stats_since(test_id, cursor, max_points)
+    if not stats:
+        return {"error": "Test not found"}
+
+    stats.pop("running")
+    return stats
+
+
+@app.get("/resource-stats/{test_id}/stream")
+async def stream_resource_stats(test_id: str, cursor: int = 0, last_event_id: Optional[str] = Header(None)):
+    """Server-Sent Events stream pushing only the resource samples recorded after the client's cursor"""
+    if last_event_id and last_event_id.isdigit():
+        cursor = int(last_event_id)
+
+    async def events():
+        position = cursor
+        while True:
+            stats = _resource_stats_since(test_id, position)
+            if not stats:
+                yield "event: error\ndata: {\"error\": \"Test not found\"}\n\n"
+                return
+
+            running = stats.pop("running")
+            if stats["resource_stats"] or not running:
+                position = stats["cursor"]
+                yield f"id: {position}\ndata: {json.dumps(stats)}\n\n"
+            else:
+                yield ": keep-alive\n\n"
+
+            if not running:
+                yield "event: end\ndata: {}\n\n"
+                return
+            await asyncio.sleep(STREAM_INTERVAL)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+def _downsampled_buckets(key: tuple, buckets, max_points: int):
+    """Downsample the finalized buckets, caching them under `key`, and append the partial seconds unchanged"""
+    closed = [bucket for bucket in buckets if not bucket.get("partial")]
+    partial = [bucket for bucket in buckets if bucket.get("partial")]
+    reduced = downsample_cache.get_or_compute(key, lambda: downsample_rows(closed, max(max_points - len(partial), 2)))
+    return reduced + partial
+
+
+@app.get("/live-metrics/{test_id}")
+async def get_live_metrics(test_id: str, since: Optional[int] = None, max_points: Optional[int] = Query(None, ge=2)):
+    """Return the per-second buckets newer than `since`, downsampled to about `max_points` rows when given"""
+    tester = active_testers.get(test_id)
+    if tester:
+        buckets = tester.live.buckets(since)
+        if max_points:
+            buckets = _downsampled_buckets((test_id, "timeline", since, max_points, tester.live.cursor), buckets,
+                                           max_points)
+        return {"status": tester.test_result.status, "buckets": buckets, "cursor": tester.live.cursor,
+                "generator": tester.generator_metrics()}
+
+    test_result = storage.get(test_id, include_series=False)
+    if not test_result:
+        return {"error": "Test not found"}
+
+    buckets = [b for b in storage.get_series(test_id, "timeline") or [] if since is None or b["timestamp"] > since]
+    cursor = buckets[-1]["timestamp"] if buckets else since
+    if max_points:
+        buckets = _downsampled_buckets((test_id, "timeline", since, max_points, "final"), buckets, max_points)
+    return {"status": test_result.status, "buckets": buckets,
+            "cursor": cursor, "generator": test_result.generator_metrics}
+
+
+@app.get("/target-stats/{test_id}")
+async def get_target_stats(test_id: str, cursor: int = 0, max_points: Optional[int] = Query(None, ge=2)):
+    """Return the target host samples after `cursor`, aligned to the test clock and downsampled when requested"""
+    tester = active_testers.get(test_id)
+    if tester and tester.target:
+        if max_points:
+            samples, next_cursor = downsample_cache.get_or_compute(
+                (test_id, "target_stats", cursor, max_points, tester.target.seq),
+                lambda: tester.target.samples_since(cursor, max_points))
+        else:
+            samples, next_cursor = tester.target.samples_since(cursor)
+        return {"target_stats": samples, "cursor": next_cursor, "target_metrics": tester.target.metrics}
+
+    test_result = storage.get(test_id, include_series=False)
     if not test_result:
         return {"error": "Test not found"}
+    samples = storage.get_series(test_id, "target_stats") or []
+    first_seq = test_result.target_stats_seq
+    selected = samples[max(cursor - first_seq, 0):]
+    if max_points:
+        selected = downsample_cache.get_or_compute((test_id, "target_stats", cursor, max_points, "final"),
+                                                   lambda: downsample_rows(selected, max_points, iso_timestamps=True))
+    return {"target_stats": selected, "cursor": max(first_seq + len(samples), cursor),
+            "target_metrics": test_result.target_metrics or {}}
+
+
+@app.get("/target-stats/{test_id}/correlation")
+async def get_target_correlation(test_id: str, max_points: Optional[int] = Query(None, ge=2)):
+    """Join the per-second latency buckets with the target host resources of the same seconds.
+
+    Returns the joined rows (downsampled to `max_points` when given), the Pearson coefficient of each target
+    resource with mean/p50/p99 latency and error rate, and the agent's collection metrics.
+    """
+    tester = active_testers.get(test_id)
+    if tester and tester.target:
+        timestamps, values, _ = tester.target.columns()
+        correlation = correlate(tester.live.buckets(), timestamps, values)
+        correlation["target_metrics"] = tester.target.metrics
+    else:
+        test_result = storage.get(test_id, include_series=False)
+        if not test_result:
+            return {"error": "Test not found"}
+        if not test_result.target_metrics:
+            return {"error": "Test has no target agent samples"}
+        correlation = downsample_cache.get_or_compute(
+            (test_id, "target_correlation", "final"),
+            lambda: correlate(storage.get_series(test_id, "timeline") or [],
+                              *rows_to_columns(storage.get_series(test_id, "target_stats") or [])))
+        correlation = dict(correlation, target_metrics=test_result.target_metrics)
 
-    return {"resource_stats": test_result.resource_stats if test_result.resource_stats else [],
-            "resource_metrics": test_result.resource_metrics if test_result.resource_metrics else {}}
+    if max_points:
+        correlation["rows"] = downsample_rows(correlation["rows"], max_points)
+    return correlation
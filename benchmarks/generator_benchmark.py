@@ -0,0 +1,155 @@
+"""Benchmark of the load generator's own ceiling.
+
+Drives StressTester and PerformanceTester, with each HTTP engine, against a local stand-in target (zero and fixed
+latency) at increasing concurrency and reports, per case, the generated RPS, CPU time per request, memory growth per
+million requests and the time spent computing the end-of-test metrics. Each case runs in a fresh process, with the
+target in another one, so CPU and memory figures belong to the generator alone. The report is JSON, to compare
+versions:
+
+    python -m benchmarks.generator_benchmark --output bench.json
+"""
+import argparse
+import asyncio
+import gc
+import itertools
+import json
+import logging
+import multiprocessing
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional
+
+import psutil
+
+from benchmarks.target_server import run_target
+
+BYTES_PER_MB = 1024 * 1024
+DEFAULT_CONCURRENCY = [1, 10, 50, 100]
+DEFAULT_LATENCIES = [0.0, 0.01]  # seconds: a zero-latency target exposes the generator ceiling
+DEFAULT_REQUESTS_PER_USER = 200  # StressTester budget per concurrent user
+DEFAULT_DURATION = 5  # PerformanceTester duration in seconds
+WARMUP_REQUESTS = 100  # sent before measuring, so lazy imports and pool setup are not billed to the case
+
+
+async def _drive(tester, monitor: bool):
+    if not monitor:
+        await tester.run()
+        return
+    monitor_task = asyncio.create_task(tester.monitor_resources())
+    await tester.run()
+    tester.monitoring = False
+    await monitor_task
+
+
+def _run_case(tester_name: str, engine: str, target_url: str, concurrency: int, requests_per_user: int,
+              duration: int, monitor: bool) -> Dict:
+    """Run one case in the current process and measure what the generator itself consumed"""
+    logging.disable(logging.ERROR)  # failed requests are counted in the result, logging each one would skew CPU
+    from app.web_server.core.http_engine import run
+    from app.web_server.core.process_pool import TESTER_CLASSES
+    from app.web_server.core.stress_tester import StressTester
+    from app.web_server.models.config import TestConfig
+
+    run(StressTester(TestConfig(target_url=target_url, requests=WARMUP_REQUESTS, concurrency=concurrency,
+                                engine=engine)).run())
+    config = TestConfig(target_url=target_url, concurrency=concurrency, requests=concurrency * requests_per_user,
+                        duration=duration, engine=engine)
+    tester = TESTER_CLASSES[tester_name](config)
+    process = psutil.Process()
+    gc.collect()
+    rss_before = process.memory_info().rss
+    cpu_before = time.process_time()
+    started = time.perf_counter()
+
+    run(_drive(tester, monitor))
+
+    wall_time = time.perf_counter() - started
+    cpu_time = time.process_time() - cpu_before
+    rss_growth = max(process.memory_info().rss - rss_before, 0)
+
+    metrics_started = time.perf_counter()
+    tester._calculate_metrics()
+    metrics_time = time.perf_counter() - metrics_started
+
+    requests = tester.request_count
+    return {"tester": tester_name, "engine": engine, "concurrency": concurrency, "monitor": monitor,
+            "requests": requests, "failed": tester.failed_count, "wall_time": wall_time, "cpu_time": cpu_time,
+            "rps": requests / wall_time if wall_time else 0,
+            "rps_per_core": requests / cpu_time if cpu_time else 0,
+            "cpu_per_request_us": cpu_time / requests * 1e6 if requests else 0,
+            "memory_growth_mb": rss_growth / BYTES_PER_MB,
+            "memory_per_million_requests_mb": rss_growth / BYTES_PER_MB / requests * 1e6 if requests else 0,
+            "metrics_computation_ms": metrics_time * 1000, "p50": tester.test_result.percentile_50,
+            "p99": tester.test_result.percentile_99}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(testers, engines, concurrency_levels, latencies, requests_per_user: int, duration: int,
+                   monitor_variants) -> Dict:
+    """Run every case of the matrix, starting one stand-in target per latency, and return the full report"""
+    from app.web_server.core.http_engine import EVENT_LOOP
+
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for latency in latencies:
+        ready = context.Queue()
+        target = context.Process(target=run_target, args=(latency, 0, ready), daemon=True)
+        target.start()
+        target_url = f"http://127.0.0.1:{ready.get(timeout=10)}/"
+        try:
+            for tester_name, engine in itertools.product(testers, engines):
+                for concurrency in concurrency_levels:
+                    for monitor in monitor_variants:
+                        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                            result = executor.submit(_run_case, tester_name, engine, target_url, concurrency,
+                                                     requests_per_user, duration, monitor).result()
+                        result["target_latency"] = latency
+                        results.append(result)
+                        print(f"{tester_name}/{engine} latency={latency}s concurrency={concurrency} "
+                              f"monitor={monitor}: {result['rps']:.0f} rps, "
+                              f"{result['cpu_per_request_us']:.0f} us CPU/request", file=sys.stderr)
+        finally:
+            target.terminate()
+            target.join()
+
+    return {"benchmark": "generator", "created_at": datetime.now().isoformat(), "git_commit": _git_commit(),
+            "python": platform.python_version(), "platform": platform.platform(), "cpu_count": psutil.cpu_count(),
+            "event_loop": EVENT_LOOP,
+            "parameters": {"testers": testers, "engines": engines, "concurrency": concurrency_levels,
+                           "latencies": latencies, "requests_per_user": requests_per_user, "duration": duration},
+            "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the maximum load the generator can produce")
+    parser.add_argument("--testers", nargs="+", default=["StressTester", "PerformanceTester"])
+    parser.add_argument("--engines", nargs="+", default=["httpx", "raw"])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--latencies", nargs="+", type=float, default=DEFAULT_LATENCIES)
+    parser.add_argument("--requests-per-user", type=int, default=DEFAULT_REQUESTS_PER_USER)
+    parser.add_argument("--duration", type=int, default=DEFAULT_DURATION)
+    parser.add_argument("--monitor", action="store_true", help="also run every case with resource monitoring on")
+    parser.add_argument("--output", help="file to write the JSON report to (default: stdout)")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.testers, args.engines, args.concurrency, args.latencies, args.requests_per_user,
+                            args.duration, [False, True] if args.monitor else [False])
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
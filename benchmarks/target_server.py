@@ -0,0 +1,62 @@
+import argparse
+import asyncio
+import threading
+from typing import Optional
+
+from app import target_agent_main
+
+RESPONSE = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nContent-Type: text/plain\r\n\r\nok"
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, latency: float):
+    """Answer every keep-alive HTTP/1.1 request on one connection after `latency` seconds"""
+    try:
+        while await reader.readline():
+            content_length = 0
+            while True:
+                header = await reader.readline()
+                if header in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = header.partition(b":")
+                if name.strip().lower() == b"content-length":
+                    content_length = int(value)
+            if content_length:
+                await reader.readexactly(content_length)
+            if latency:
+                await asyncio.sleep(latency)
+            writer.write(RESPONSE)
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(latency: float = 0.0, port: int = 0, ready=None):
+    """Serve the stand-in target on 127.0.0.1, reporting the bound port through `ready` (a queue) when given"""
+    server = await asyncio.start_server(lambda reader, writer: _handle(reader, writer, latency), "127.0.0.1", port,
+                                        backlog=4096)
+    if ready is not None:
+        ready.put(server.sockets[0].getsockname()[1])
+    async with server:
+        await server.serve_forever()
+
+
+def run_target(latency: float = 0.0, port: int = 0, ready: Optional[object] = None):
+    """Process entry point for the stand-in target"""
+    try:
+        asyncio.run(serve(latency, port, ready))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Minimal HTTP/1.1 target with a fixed response latency")
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before each response")
+    parser.add_argument("--agent-port", type=int, help="also serve the target host resource agent on this port")
+    args = parser.parse_args()
+    if args.agent_port:
+        threading.Thread(target=target_agent_main.serve, args=(args.agent_port,), kwargs={"host": "127.0.0.1"},
+                         name="target-agent", daemon=True).start()
+    run_target(args.latency, args.port)
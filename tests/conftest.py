@@ -0,0 +1,107 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+import uvicorn
+
+from benchmarks.target_server import serve
+
+SLOW_TARGET_LATENCY = 0.02  # seconds
+
+
+class _Target:
+    """Stand-in target served on 127.0.0.1 from a background thread with its own event loop"""
+
+    def __init__(self, latency: float = 0.0):
+        self.loop = asyncio.new_event_loop()
+        self.ready = _Ready()
+        self.thread = threading.Thread(target=self._run, args=(latency,), daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.ready.wait()}/"
+
+    def _run(self, latency: float):
+        asyncio.set_event_loop(self.loop)
+        self.task = self.loop.create_task(serve(latency, 0, self.ready))
+        try:
+            self.loop.run_until_complete(self.task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            # Connections a cancelled test left open are still being served; stop them before closing the loop
+            handlers = asyncio.all_tasks(self.loop)
+            for handler in handlers:
+                handler.cancel()
+            self.loop.run_until_complete(asyncio.gather(*handlers, return_exceptions=True))
+            self.loop.close()
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.task.cancel)
+        self.thread.join(5)
+
+
+class ServedApp:
+    """ASGI app served by uvicorn on 127.0.0.1 from a background thread"""
+
+    def __init__(self, app):
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.thread.start()
+        deadline = time.monotonic() + 5
+        while not self.server.started:
+            assert time.monotonic() < deadline, "app server did not start"
+            time.sleep(0.01)
+        self.url = f"http://127.0.0.1:{self.server.servers[0].sockets[0].getsockname()[1]}"
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(5)
+
+
+class _Ready:
+    """Queue-like receiver of the port bound by `serve`"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.port = None
+
+    def put(self, port: int):
+        self.port = port
+        self.event.set()
+
+    def wait(self) -> int:
+        assert self.event.wait(5), "target server did not start"
+        return self.port
+
+
+@pytest.fixture(scope="session")
+def target_url():
+    """URL of a keep-alive HTTP/1.1 target on localhost answering ``200 ok`` immediately"""
+    target = _Target()
+    yield target.url
+    target.stop()
+
+
+@pytest.fixture(scope="session")
+def slow_target_url():
+    """URL of a localhost target that waits `SLOW_TARGET_LATENCY` seconds before each response"""
+    target = _Target(SLOW_TARGET_LATENCY)
+    yield target.url
+    target.stop()
+
+
+@pytest.fixture(scope="session")
+def server(tmp_path_factory):
+    """The API module, with its results stored in a temporary database"""
+    os.environ["RESULTS_DB_PATH"] = str(tmp_path_factory.mktemp("results") / "test_results.db")
+    from app import web_server_main
+    return web_server_main
+
+
+@pytest.fixture(scope="session")
+def api_url(server):
+    """Base URL of the API served over HTTP, for clients that talk to it through a real socket"""
+    served = ServedApp(server.app)
+    yield served.url
+    served.stop()
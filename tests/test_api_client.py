@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from app.web_client.api import client as client_module
+from app.web_client.api.client import APIClient
+from app.web_server.core.stress_tester import StressTester
+from app.web_server.models.config import TestConfig
+
+
+@pytest.fixture
+def api_client(api_url):
+    return APIClient(api_url)
+
+
+def _stored_test(server, status: str = "completed") -> StressTester:
+    tester = StressTester(TestConfig(target_url="http://127.0.0.1/"))
+    tester.finalize(status)
+    server.storage.save(tester.test_id, tester.test_result)
+    return tester
+
+
+def test_etag_cache_keeps_only_the_most_recent_queries(api_client, monkeypatch):
+    monkeypatch.setattr(client_module, "ETAG_CACHE_SIZE", 3)
+    for limit in range(1, 6):
+        assert api_client.fetch_test_results_page(limit) is not None
+    assert api_client.fetch_test_results_page(3) is not None
+
+    assert [key[1] for key in api_client._etag_cache] == [(("limit", 4),), (("limit", 5),), (("limit", 3),)]
+
+
+def test_cached_page_is_revalidated(server, api_client):
+    first = api_client.fetch_test_results_page(500)
+    assert api_client.fetch_test_results_page(500) is first
+
+    tester = _stored_test(server)
+    page = api_client.fetch_test_results_page(500)
+    assert page is not first
+    assert tester.test_id in [item["test_id"] for item in page["items"]]
+
+
+def test_deleting_a_test_drops_its_cached_result(server, api_client):
+    tester = _stored_test(server)
+    assert api_client.fetch_test_result(tester.test_id)["test_id"] == tester.test_id
+    assert tester.test_id in api_client._completed_results
+
+    assert api_client.delete_test_result(tester.test_id) == {"deleted": True}
+    assert tester.test_id not in api_client._completed_results
+    assert api_client.fetch_test_result(tester.test_id) is None
+
+
+def test_resource_stats_are_fetched_from_a_cursor(server, api_client):
+    tester = StressTester(TestConfig(target_url="http://127.0.0.1/"))
+    for _ in range(3):
+        tester._sample_resources()
+    tester.monitoring = False
+    asyncio.run(tester.monitor_resources())
+    tester.finalize("completed")
+    server.storage.save(tester.test_id, tester.test_result)
+
+    stats = api_client.fetch_resource_stats(tester.test_id, cursor=2)
+
+    assert len(stats["resource_stats"]) == 1
+    assert stats["cursor"] == 3
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from app.web_server.core.comparison import mann_whitney, two_proportions, welch
+
+# Reference values computed with scipy 1.17.1, which is not a dependency of the project:
+#   stats.mannwhitneyu(candidate, reference, use_continuity=False, method="asymptotic") on the bucket indices
+#   stats.ttest_ind(candidate, reference, equal_var=False).statistic, with a two-sided normal p-value
+#   stats.chi2_contingency(table, correction=False).pvalue
+
+
+def test_mann_whitney_matches_scipy_with_bucket_ties():
+    reference = np.array([0, 3, 5, 8, 4, 2, 0, 1], dtype=np.float64)
+    candidate = np.array([1, 1, 4, 6, 7, 5, 2, 0], dtype=np.float64)
+
+    probability_slower, p_value = mann_whitney(reference, candidate)
+
+    assert probability_slower == pytest.approx(0.6195652173913043, rel=1e-12)
+    assert p_value == pytest.approx(0.1429302460911472, rel=1e-9)
+
+
+def test_mann_whitney_identical_distributions():
+    counts = np.array([2, 5, 9, 4, 1], dtype=np.float64)
+
+    assert mann_whitney(counts, counts.copy()) == pytest.approx((0.5, 1.0))
+
+
+def test_mann_whitney_single_shared_bucket_is_not_significant():
+    assert mann_whitney(np.array([0, 10.0]), np.array([0, 7.0])) == (0.5, 1.0)
+
+
+def test_welch_matches_scipy_statistic():
+    reference = np.array([101, 98, 103, 97, 100, 102, 99, 100], dtype=np.float64)
+    candidate = np.array([95, 97, 94, 96, 99, 93, 96, 95, 94], dtype=np.float64)
+
+    assert welch(reference, candidate) == pytest.approx(9.56235730351959e-07, rel=1e-9)
+
+
+def test_welch_degenerate_series():
+    assert welch(np.array([100.0]), np.array([90.0, 91.0])) is None
+    assert welch(np.array([100.0, 100.0]), np.array([100.0, 100.0])) == 1.0
+    assert welch(np.array([100.0, 100.0]), np.array([90.0, 90.0])) == 0.0
+
+
+def test_two_proportions_matches_scipy_chi_square():
+    assert two_proportions(12, 1000, 30, 1000) == pytest.approx(0.004999109504464614, rel=1e-9)
+
+
+def test_two_proportions_degenerate_counts():
+    assert two_proportions(0, 0, 3, 100) is None
+    assert two_proportions(0, 100, 0, 100) == 1.0
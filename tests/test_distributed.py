@@ -0,0 +1,57 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app import agent_main
+from app.web_server.core.coordinator import POLL_INTERVAL, DistributedTester
+from app.web_server.core.performance_tester import PerformanceTester
+from app.web_server.core.stress_tester import StressTester
+from app.web_server.models.config import TestConfig
+from tests.conftest import ServedApp
+
+
+@pytest.fixture
+def agents():
+    agents = [ServedApp(agent_main.app), ServedApp(agent_main.app)]
+    yield [agent.url for agent in agents]
+    for agent in agents:
+        agent.stop()
+
+
+def test_coordinator_merges_agent_summaries(agents, target_url):
+    config = TestConfig(target_url=target_url, requests=301, concurrency=5)
+    result = asyncio.run(DistributedTester(config, StressTester, agents).run())
+
+    assert result.total_requests == 301
+    assert result.successful_requests == 301
+    assert result.failed_requests == 0
+    assert result.latency_histogram["count"] == 301
+    assert result.error_taxonomy["status_codes"] == {"200": 301}
+    assert 0 < result.min_response_time <= result.percentile_50 <= result.max_response_time
+
+
+def test_coordinator_deletes_collected_runs(agents, target_url):
+    config = TestConfig(target_url=target_url, requests=20, concurrency=2)
+    asyncio.run(DistributedTester(config, StressTester, agents).run())
+
+    assert agent_main.runs == {}
+
+
+def test_failed_dispatch_cancels_accepted_shards(agents, target_url):
+    config = TestConfig(target_url=target_url, duration=30, concurrency=2)
+    unreachable = "http://127.0.0.1:1"
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(DistributedTester(config, PerformanceTester, [agents[0], unreachable]).run())
+
+    assert agent_main.runs == {}
+
+
+def test_duration_spans_the_agent_shards(agents, target_url):
+    config = TestConfig(target_url=target_url, duration=2, concurrency=2)
+    tester = DistributedTester(config, PerformanceTester, agents)
+    result = asyncio.run(tester.run())
+
+    duration = (tester.end_time - tester.start_time).total_seconds()
+    assert 2.0 <= duration < 2.0 + POLL_INTERVAL / 4
+    assert result.requests_per_second == pytest.approx(result.total_requests / duration)
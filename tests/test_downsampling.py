@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.web_server.core.downsampling import DownsampleCache, downsample, downsample_rows
+from app.web_server.core.resource_sampler import ResourceSampler
+
+
+@pytest.fixture(scope="module")
+def series():
+    rng = np.random.default_rng(3)
+    timestamps = np.arange(10_000, dtype=float)
+    values = np.column_stack([rng.normal(50, 5, 10_000), rng.normal(0, 1, 10_000)])
+    values[1234, 0] = 400.0  # a one-sample spike in the first column only
+    values[8765, 1] = -90.0  # a one-sample dip in the second
+    return timestamps, values
+
+
+def test_downsample_keeps_global_and_per_bucket_extremes(series):
+    timestamps, values = series
+    reduced_timestamps, reduced = downsample(timestamps, values, 200)
+
+    assert len(reduced) <= 200
+    assert reduced[:, 0].max() == 400.0
+    assert reduced[:, 1].min() == -90.0
+    size = len(timestamps) // 100
+    for bucket in range(100):
+        window = values[bucket * size:(bucket + 1) * size]
+        assert set(reduced[2 * bucket:2 * bucket + 2, 0]) == {window[:, 0].min(), window[:, 0].max()}
+    assert reduced_timestamps[0] == timestamps[0]
+    assert reduced_timestamps[-1] == timestamps[-1]
+    assert np.all(np.diff(reduced_timestamps) >= 0)
+
+
+def test_downsample_keeps_the_order_of_minimum_and_maximum():
+    timestamps = np.arange(4, dtype=float)
+    values = np.array([[5.0], [9.0], [1.0], [3.0]])
+
+    _, reduced = downsample(timestamps, values, 2)
+
+    assert reduced[:, 0].tolist() == [9.0, 1.0]
+
+
+def test_short_series_are_returned_unchanged(series):
+    timestamps, values = series
+    reduced_timestamps, reduced = downsample(timestamps[:50], values[:50], 200)
+
+    assert np.array_equal(reduced, values[:50])
+    assert np.array_equal(reduced_timestamps, timestamps[:50])
+
+
+def test_downsample_rows_with_iso_timestamps_and_integer_fields():
+    start = datetime(2026, 1, 1)
+    rows = [{"timestamp": (start + timedelta(seconds=second)).isoformat(), "cpu_percent": float(second % 7),
+             "open_sockets": second % 5} for second in range(1000)]
+    rows[500]["cpu_percent"] = 99.5
+
+    reduced = downsample_rows(rows, 50, iso_timestamps=True)
+
+    assert len(reduced) <= 50
+    assert max(row["cpu_percent"] for row in reduced) == 99.5
+    assert all(isinstance(row["open_sockets"], int) for row in reduced)
+    assert reduced[0]["timestamp"] == rows[0]["timestamp"] + ".000000"
+    assert datetime.fromisoformat(reduced[-1]["timestamp"]) == datetime.fromisoformat(rows[-1]["timestamp"])
+
+
+def test_sampler_downsamples_a_wrapped_ring_buffer(monkeypatch):
+    sampler = ResourceSampler(buffer_size=100)
+    cpu = iter([float(value) for value in range(250)])
+    monkeypatch.setattr("app.web_server.core.resource_sampler.psutil.cpu_percent", lambda: next(cpu))
+    for _ in range(250):
+        sampler.sample()
+
+    samples, cursor = sampler.samples_since(0, max_points=10)
+
+    assert cursor == 250
+    assert len(samples) <= 10
+    assert min(sample["cpu_percent"] for sample in samples) == 150.0  # oldest retained sample
+    assert max(sample["cpu_percent"] for sample in samples) == 249.0
+
+
+def test_downsample_cache_is_bounded_and_reuses_entries():
+    cache = DownsampleCache(max_entries=2)
+    calls = []
+
+    def compute(key):
+        calls.append(key)
+        return [key]
+
+    for key in ("a", "b", "a", "c", "b"):
+        cache.get_or_compute(key, lambda key=key: compute(key))
+
+    assert calls == ["a", "b", "c", "b"]
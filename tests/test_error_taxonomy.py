@@ -0,0 +1,123 @@
+import asyncio
+import socket
+import ssl
+
+import httpx
+import pytest
+
+from app.web_server.core.error_taxonomy import MAX_ERROR_CLASSES, OVERFLOW_CLASS, ErrorTaxonomy, classify_exception
+from app.web_server.core.stress_tester import StressTester
+from app.web_server.models.config import TestConfig
+
+
+def _raised_from(error: BaseException, cause: BaseException) -> BaseException:
+    try:
+        raise error from cause
+    except BaseException as raised:
+        return raised
+
+
+def _closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.parametrize("error, name", [
+    (_raised_from(httpx.ConnectError("[Errno -2] Name or service not known"), socket.gaierror(-2, "unknown")), "dns"),
+    (_raised_from(httpx.ConnectError("handshake failed"), ssl.SSLError(1, "certificate verify failed")), "tls"),
+    (_raised_from(httpx.ReadError(""), ConnectionResetError(104, "Connection reset by peer")), "connection_reset"),
+    (httpx.RemoteProtocolError("Server disconnected without sending a response."), "protocol_error"),
+    (httpx.PoolTimeout(""), "pool_timeout"),
+    (ValueError("unexpected"), "ValueError"),
+])
+def test_classify_exception_follows_the_cause_chain(error, name):
+    assert classify_exception(error) == name
+
+
+def test_classify_refused_connection():
+    async def request():
+        async with httpx.AsyncClient() as client:
+            await client.get(f"http://127.0.0.1:{_closed_port()}/")
+
+    with pytest.raises(httpx.ConnectError) as raised:
+        asyncio.run(request())
+    assert classify_exception(raised.value) == "connect_refused"
+
+
+def test_classify_read_timeout():
+    # A listening socket that never accepts completes the handshake from its backlog but never answers
+    with socket.socket() as server:
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+
+        async def request():
+            async with httpx.AsyncClient(timeout=httpx.Timeout(5.0, read=0.2)) as client:
+                await client.get(f"http://127.0.0.1:{server.getsockname()[1]}/")
+
+        with pytest.raises(httpx.ReadTimeout) as raised:
+            asyncio.run(request())
+    assert classify_exception(raised.value) == "read_timeout"
+
+
+def test_classes_are_bounded():
+    taxonomy = ErrorTaxonomy()
+    for status_code in range(400, 400 + MAX_ERROR_CLASSES + 10):
+        taxonomy.record_response(status_code, 0.01)
+
+    assert len(taxonomy.classes) == MAX_ERROR_CLASSES + 1
+    assert taxonomy.classes[OVERFLOW_CLASS]["count"] == 10
+    assert sum(entry["count"] for entry in taxonomy.classes.values()) == MAX_ERROR_CLASSES + 10
+
+
+def test_messages_do_not_create_classes():
+    taxonomy = ErrorTaxonomy()
+    for index in range(100):
+        error = _raised_from(httpx.ConnectError(f"failed to reach http://host-{index}.example/items/{index}"),
+                             ConnectionRefusedError(111, "Connection refused"))
+        assert taxonomy.record_exception(error, None) == "connect_refused"
+
+    entry = taxonomy.classes["connect_refused"]
+    assert list(taxonomy.classes) == ["connect_refused"]
+    assert entry["count"] == 100
+    assert "host-0.example" in entry["message"]
+
+
+def test_refused_target_is_counted_by_class():
+    config = TestConfig(target_url=f"http://127.0.0.1:{_closed_port()}/", requests=20, concurrency=4)
+    tester = StressTester(config)
+    result = asyncio.run(tester.run())
+
+    assert result.failed_requests == 20
+    assert [(entry["name"], entry["count"], entry["share"]) for entry in result.error_taxonomy["classes"]] == \
+        [("connect_refused", 20, 1.0)]
+    assert result.errors[0].startswith("connect_refused (20x): ConnectError")
+    live = {}
+    for row in tester.live.buckets():
+        for name, count in row["error_classes"].items():
+            live[name] = live.get(name, 0) + count
+    assert live == {"connect_refused": 20}
+
+
+def test_merge_and_metrics_order_classes_by_count():
+    first, second = ErrorTaxonomy(), ErrorTaxonomy()
+    for _ in range(3):
+        first.record_response(503, 0.1)
+        first.record_status(503)
+    first.record("read_timeout", None, "ReadTimeout: ")
+    for _ in range(4):
+        second.record("read_timeout", None, "ReadTimeout: ")
+    second.record_response(500, 0.2)
+    second.record_status(500)
+    second.record_status(200)
+
+    first.merge_dict(second.to_dict())
+    first.merge_dict(None)
+    metrics = first.metrics()
+
+    assert [(entry["name"], entry["count"]) for entry in metrics["classes"]] == \
+        [("read_timeout", 5), ("http_503", 3), ("http_500", 1)]
+    assert [entry["share"] for entry in metrics["classes"]] == pytest.approx([5 / 9, 3 / 9, 1 / 9])
+    assert metrics["status_codes"] == {"200": 1, "500": 1, "503": 3}
+    assert metrics["classes"][1]["latency"]["max"] == pytest.approx(0.1, rel=0.1)
+    assert first.descriptions(1) == ["read_timeout (5x): ReadTimeout: "]
@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+from app.web_server.core.generator_health import GeneratorHealth
+from app.web_server.core.performance_tester import PerformanceTester
+from app.web_server.core.stress_tester import StressTester
+from app.web_server.models.config import TestConfig
+
+
+def test_healthy_generator_is_not_flagged(target_url):
+    result = asyncio.run(PerformanceTester(TestConfig(target_url=target_url, duration=1, target_rps=50)).run())
+
+    metrics = result.generator_metrics
+    assert metrics["generator_bound"] is False
+    assert metrics["reasons"] == []
+    assert metrics["loop_lag_p99"] < 0.05
+
+
+def test_blocked_event_loop_flags_the_generator(target_url):
+    tester = PerformanceTester(TestConfig(target_url=target_url, duration=2, target_rps=50))
+
+    async def run_with_blocked_loop():
+        run = asyncio.create_task(tester.run())
+        await asyncio.sleep(0.5)
+        time.sleep(0.3)
+        return await run
+
+    metrics = asyncio.run(run_with_blocked_loop()).generator_metrics
+
+    assert metrics["generator_bound"] is True
+    assert metrics["loop_lag_max"] >= 0.25
+    assert any(reason.startswith("event-loop lag") for reason in metrics["reasons"])
+
+
+def test_connection_pool_wait_flags_the_generator(slow_target_url):
+    config = TestConfig(target_url=slow_target_url, requests=50, concurrency=10, max_connections=1)
+    metrics = asyncio.run(StressTester(config).run()).generator_metrics
+
+    # Ten workers share one connection, so each request queues behind about nine others
+    assert metrics["pool_wait_p99"] > 0.1
+    assert metrics["generator_bound"] is True
+    assert any(reason.startswith("connection pool wait") for reason in metrics["reasons"])
+
+
+def test_merge_adds_requests_in_flight_and_keeps_the_worst_cpu():
+    first, second = GeneratorHealth(), GeneratorHealth()
+    first.lag.record(0.001)
+    first.in_flight, first.peak_in_flight, first.cpu_percent, first.max_cpu_percent = 3, 8, 40.0, 70.0
+    second.lag.record(0.2)
+    second.in_flight, second.peak_in_flight, second.cpu_percent, second.max_cpu_percent = 2, 5, 95.0, 99.0
+
+    first.merge_dict(second.to_dict())
+    first.merge_dict(None)
+
+    assert (first.in_flight, first.peak_in_flight) == (5, 13)
+    assert (first.cpu_percent, first.max_cpu_percent) == (95.0, 99.0)
+    assert first.lag.count == 2
+    metrics = first.metrics()
+    assert metrics["generator_bound"] is True
+    assert len(metrics["reasons"]) == 2
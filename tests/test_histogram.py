@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from app.web_server.core.histogram import REPORTED_PERCENTILES, LatencyHistogram
+
+
+@pytest.fixture(scope="module")
+def latencies():
+    return np.random.default_rng(7).lognormal(mean=-4.0, sigma=1.0, size=19_997)  # no percentile falls on an exact rank
+
+
+@pytest.mark.parametrize("digits", [1, 2, 3])
+def test_percentiles_match_numpy_within_precision(latencies, digits):
+    histogram = LatencyHistogram(digits)
+    for value in latencies:
+        histogram.record(float(value))
+
+    for name, percentile in REPORTED_PERCENTILES.items():
+        expected = np.percentile(latencies, percentile, method="inverted_cdf")
+        assert histogram.value_at_percentile(percentile) == pytest.approx(expected, rel=10 ** -digits, abs=1e-6)
+        assert histogram.percentiles()[name] == histogram.value_at_percentile(percentile)
+
+
+def test_exact_count_mean_min_and_max(latencies):
+    histogram = LatencyHistogram()
+    for value in latencies:
+        histogram.record(float(value))
+
+    assert histogram.count == len(latencies)
+    assert histogram.mean == pytest.approx(latencies.mean())
+    assert histogram.min == latencies.min()
+    assert histogram.max == latencies.max()
+    assert histogram.value_at_percentile(100) == latencies.max()
+
+
+def test_merge_and_serialization_equal_a_single_histogram(latencies):
+    single = LatencyHistogram()
+    parts = [LatencyHistogram() for _ in range(3)]
+    for index, value in enumerate(latencies):
+        single.record(float(value))
+        parts[index % 3].record(float(value))
+
+    merged = LatencyHistogram.merged(LatencyHistogram.from_dict(part.to_dict()) for part in parts)
+
+    assert merged.counts == single.counts
+    assert merged.percentiles() == single.percentiles()
+    assert (merged.count, merged.min, merged.max) == (single.count, single.min, single.max)
+
+
+def test_values_above_the_trackable_range_are_clamped_but_max_is_exact():
+    histogram = LatencyHistogram(2, highest_trackable=1.0)
+    histogram.record(0.5)
+    histogram.record(30.0)
+
+    assert histogram.max == 30.0
+    assert histogram.value_at_percentile(50) == pytest.approx(0.5, rel=0.01)
+
+
+def test_merging_different_layouts_is_rejected():
+    with pytest.raises(ValueError):
+        LatencyHistogram(2).merge(LatencyHistogram(3))
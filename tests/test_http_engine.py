@@ -0,0 +1,155 @@
+import asyncio
+import socket
+
+import httpx
+import pytest
+
+from app.web_server.core.http_engine import RawEngine, create_engine
+from app.web_server.core.performance_tester import PerformanceTester
+from app.web_server.core.stress_tester import StressTester
+from app.web_server.models.config import TestConfig
+
+RESPONSES = {
+    b"/length": b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\nX-Test: yes\r\n\r\nhello",
+    b"/chunked": b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n5\r\nhello\r\n6;ext=1\r\n world\r\n0\r\n"
+                 b"X-Trailer: 1\r\n\r\n",
+    b"/continue": b"HTTP/1.1 100 Continue\r\n\r\nHTTP/1.1 201 Created\r\nContent-Length: 2\r\n\r\nok",
+    b"/empty": b"HTTP/1.1 204 No Content\r\n\r\n",
+    b"/unavailable": b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 4\r\n\r\nbusy",
+    b"/garbage": b"garbage\r\n\r\n",
+}
+
+
+class ScriptedServer:
+    """HTTP/1.1 server on 127.0.0.1 answering each request path with a canned response, in request order"""
+
+    def __init__(self):
+        self.connections = 0
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.url = f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}"
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.server.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                path = head.split(b" ", 2)[1]
+                if path == b"/close":
+                    writer.write(b"HTTP/1.1 200 OK\r\nConnection: close\r\n\r\nuntil close")
+                    break
+                if path == b"/drop":
+                    break
+                if path == b"/silent":
+                    await asyncio.sleep(10)
+                    break
+                response = RESPONSES[path]
+                if path == b"/chunked":
+                    for byte in range(len(response)):  # exercise incremental parsing
+                        writer.write(response[byte:byte + 1])
+                        await writer.drain()
+                else:
+                    writer.write(response)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def _run_raw(paths, max_connections=10, **config):
+    """Request each path at once through a fresh raw engine, returning the responses (or exceptions) and the server"""
+    async def main():
+        async with ScriptedServer() as server:
+            engine_config = TestConfig(target_url=server.url, engine="raw", read_timeout=0.5, **config)
+            async with RawEngine(engine_config, max_connections) as engine:
+                responses = await asyncio.gather(*(engine.request("GET", f"{server.url}{path}") for path in paths),
+                                                 return_exceptions=True)
+            return responses, server
+    return asyncio.run(main())
+
+
+def test_raw_engine_reads_every_body_framing():
+    responses, _ = _run_raw(["/length", "/chunked", "/continue", "/empty", "/close", "/unavailable"])
+    length, chunked, continued, empty, close, unavailable = responses
+
+    assert (length.status_code, length.content, length.headers["x-test"]) == (200, b"hello", "yes")
+    assert (chunked.status_code, chunked.content) == (200, b"hello world")
+    assert (continued.status_code, continued.content) == (201, b"ok")
+    assert (empty.status_code, empty.content) == (204, b"")
+    assert (close.status_code, close.content) == (200, b"until close")
+    assert (unavailable.status_code, unavailable.is_success) == (503, False)
+
+
+def test_raw_engine_raises_httpx_errors():
+    responses, _ = _run_raw(["/garbage", "/drop", "/silent"])
+    garbage, drop, silent = responses
+
+    assert isinstance(garbage, httpx.RemoteProtocolError)
+    assert isinstance(drop, httpx.RemoteProtocolError)
+    assert isinstance(silent, httpx.ReadTimeout)
+
+
+@pytest.mark.parametrize("pipelining", [1, 8])
+def test_raw_engine_never_opens_more_than_max_connections(pipelining):
+    responses, server = _run_raw(["/length"] * 40, max_connections=2, pipelining=pipelining)
+
+    assert all(response.content == b"hello" for response in responses)
+    assert server.connections == 2
+
+
+def test_raw_engine_reuses_keep_alive_connections():
+    async def main():
+        async with ScriptedServer() as server:
+            async with RawEngine(TestConfig(target_url=server.url, engine="raw"), 2) as engine:
+                for _ in range(20):
+                    assert (await engine.request("GET", f"{server.url}/length")).content == b"hello"
+            return server.connections
+    assert asyncio.run(main()) == 1
+
+
+def _metrics(result):
+    return (result.total_requests, result.successful_requests, result.failed_requests,
+            result.error_taxonomy["status_codes"], [(entry["name"], entry["count"])
+                                                     for entry in result.error_taxonomy["classes"]])
+
+
+@pytest.mark.parametrize("path", ["/length", "/chunked", "/unavailable"])
+def test_raw_and_httpx_engines_record_identical_metrics(path):
+    async def main(engine):
+        async with ScriptedServer() as server:
+            config = TestConfig(target_url=f"{server.url}{path}", requests=60, concurrency=4, engine=engine)
+            return _metrics(await StressTester(config).run())
+
+    assert asyncio.run(main("raw")) == asyncio.run(main("httpx"))
+
+
+def test_raw_and_httpx_engines_classify_connection_errors_alike():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        url = f"http://127.0.0.1:{probe.getsockname()[1]}/"  # nothing listens once the probe closes
+    metrics = [_metrics(asyncio.run(StressTester(TestConfig(target_url=url, requests=5, concurrency=1,
+                                                                engine=engine)).run()))
+               for engine in ("raw", "httpx")]
+
+    assert metrics[0] == metrics[1]
+    assert metrics[0][4] == [("connect_refused", 5)]
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError, match="Unknown HTTP engine"):
+        create_engine(TestConfig(target_url="http://127.0.0.1/", engine="curl"), 1)
+
+
+def test_raw_engine_open_loop_without_max_in_flight(target_url):
+    config = TestConfig(target_url=target_url, duration=1, target_rps=200, engine="raw")
+    result = asyncio.run(PerformanceTester(config).run())
+
+    assert result.total_requests >= 150
+    assert result.failed_requests == 0
+    assert result.successful_requests == result.total_requests
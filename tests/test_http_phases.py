@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from app.web_server.core.http_phases import PhaseTrace
+from app.web_server.core.stress_tester import StressTester
+from app.web_server.models.config import TestConfig
+from app.web_server.models.load_profile import LoadProfile
+from tests.conftest import SLOW_TARGET_LATENCY
+
+
+def test_phases_split_the_request_timeline():
+    trace = PhaseTrace()
+    trace.events = {"connect_tcp.started": 1.5, "connect_tcp.complete": 1.75, "send_request_headers.started": 2.0,
+                    "receive_response_headers.complete": 3.0, "receive_response_body.complete": 3.5}
+
+    assert trace.phases(1.0, 4.0) == {"pool_wait": 0.5, "connect": 0.25, "ttfb": 1.0, "download": 0.5}
+
+
+def test_phases_on_a_reused_connection_have_no_connect_time():
+    trace = PhaseTrace()
+    trace.events = {"send_request_headers.started": 1.25, "receive_response_headers.complete": 2.0}
+
+    assert trace.phases(1.0, 2.5) == {"pool_wait": 0.25, "connect": 0, "ttfb": 0.75, "download": 0.5}
+
+
+@pytest.mark.parametrize("engine", ["httpx", "raw"])
+def test_phase_timings_against_localhost(slow_target_url, engine):
+    config = TestConfig(target_url=slow_target_url, requests=40, concurrency=2, engine=engine)
+    result = asyncio.run(StressTester(config).run())
+    phases = result.phase_timings
+
+    assert set(phases) == {"pool_wait", "connect", "ttfb", "download"}
+    assert phases["ttfb"]["p50"] >= SLOW_TARGET_LATENCY
+    assert phases["connect"]["max"] > 0
+    assert phases["connect"]["p50"] == 0  # two connections opened, then kept alive
+
+
+@pytest.mark.parametrize("overrides, expected", [
+    ({}, 10),
+    ({"max_connections": 3}, 3),
+    ({"target_rps": 50, "max_in_flight": 7}, 7),
+    ({"target_rps": 50}, None),
+    ({"load_profile": LoadProfile(start_level=2, end_level=12.5, ramp_duration=5)}, 13),
+])
+def test_connection_pool_is_sized_from_the_config(overrides, expected):
+    config = TestConfig(target_url="http://127.0.0.1/", concurrency=10, **overrides)
+
+    assert StressTester(config)._connection_limit() == expected
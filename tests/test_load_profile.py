@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from app.web_server.core.capacity_tester import CapacityTester
+from app.web_server.core.load_profile import level_at, max_level
+from app.web_server.core.performance_tester import PerformanceTester
+from app.web_server.core.stress_tester import StressTester
+from app.web_server.models.config import TestConfig
+from app.web_server.models.load_profile import CapacitySearch, LoadProfile, LoadStep
+
+RAMP = LoadProfile(type="linear_ramp", start_level=2, end_level=10, ramp_duration=4)
+STEPS = LoadProfile(type="steps", steps=[LoadStep(duration=1, level=1), LoadStep(duration=2, level=4)])
+SPIKE = LoadProfile(type="spike", start_level=3, spike_level=20, spike_start=5, spike_duration=2)
+
+
+@pytest.mark.parametrize("profile, elapsed, level", [
+    (RAMP, 0, 2), (RAMP, 1, 4), (RAMP, 4, 10), (RAMP, 60, 10),
+    (STEPS, 0, 1), (STEPS, 0.99, 1), (STEPS, 1, 4), (STEPS, 60, 4),
+    (SPIKE, 4.9, 3), (SPIKE, 5, 20), (SPIKE, 6.9, 20), (SPIKE, 7, 3),
+])
+def test_level_at(profile, elapsed, level):
+    assert level_at(profile, elapsed) == pytest.approx(level)
+
+
+@pytest.mark.parametrize("profile, level", [(RAMP, 10), (STEPS, 4), (SPIKE, 20)])
+def test_max_level(profile, level):
+    assert max_level(profile) == level
+
+
+def test_closed_loop_profile_follows_the_user_count(slow_target_url):
+    config = TestConfig(target_url=slow_target_url, duration=3, load_profile=STEPS)
+    result = asyncio.run(PerformanceTester(config).run())
+
+    # One user for a second, then four for two seconds, each completing one request per response time
+    assert result.total_requests == pytest.approx((1 * 1 + 4 * 2) / result.average_response_time, rel=0.2)
+    assert result.generator_metrics["peak_in_flight"] == 4
+
+
+def test_open_loop_profile_follows_the_rate(target_url):
+    profile = LoadProfile(type="steps", steps=[LoadStep(duration=1, level=50), LoadStep(duration=2, level=150)])
+    config = TestConfig(target_url=target_url, duration=3, target_rps=1, load_profile=profile)
+    result = asyncio.run(PerformanceTester(config).run())
+
+    assert result.total_requests == pytest.approx(350, abs=2)
+    busiest = max(bucket["requests"] for bucket in result.timeline)
+    assert busiest == pytest.approx(150, rel=0.15)
+
+
+def test_stress_profile_only_runs_the_active_users(slow_target_url):
+    profile = LoadProfile(type="linear_ramp", start_level=2)
+    config = TestConfig(target_url=slow_target_url, requests=100, concurrency=50, load_profile=profile)
+    result = asyncio.run(StressTester(config).run())
+
+    assert result.total_requests == 100
+    assert result.generator_metrics["peak_in_flight"] == 2
+    assert result.effective_concurrency == pytest.approx(2, rel=0.15)
+
+
+def test_capacity_search_stops_at_the_first_saturated_step(slow_target_url):
+    # Eight requests in flight at the target's latency (plus overhead) sustain roughly 300 requests per second
+    search = CapacitySearch(mode="rps", start_level=50, step_size=150, max_level=1000, step_duration=1, max_p99=0.5,
+                            max_error_rate=0.05)
+    config = TestConfig(target_url=slow_target_url, max_in_flight=8, capacity_search=search)
+    result = asyncio.run(CapacityTester(config).run())
+
+    steps = result.capacity_steps
+    assert 2 <= len(steps) < 7
+    assert [step["level"] for step in steps] == [50 + 150 * index for index in range(len(steps))]
+    assert [step["within_slo"] for step in steps] == [True] * (len(steps) - 1) + [False]
+    assert steps[-1]["missed_sends"] > 0
+    knee = max(steps[:-1], key=lambda step: step["achieved_rps"])
+    assert result.capacity_knee["level"] == knee["level"]
+    assert result.capacity_knee["max_sustainable_rps"] == knee["achieved_rps"]
+    assert result.total_requests == sum(step["requests"] for step in steps)
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+
+from app.web_server.core.performance_tester import PerformanceTester
+from app.web_server.models.config import TestConfig
+from tests.conftest import SLOW_TARGET_LATENCY
+
+
+def test_open_loop_sends_on_the_arrival_timeline(target_url):
+    config = TestConfig(target_url=target_url, duration=2, target_rps=200)
+    result = asyncio.run(PerformanceTester(config).run())
+
+    assert result.total_requests == pytest.approx(400, abs=2)
+    assert result.failed_requests == 0
+    assert result.missed_sends == 0
+    assert result.late_sends < 40  # a send more than LATE_SEND_THRESHOLD behind schedule is late
+
+
+def test_open_loop_rate_does_not_drop_when_the_target_slows_down(slow_target_url):
+    config = TestConfig(target_url=slow_target_url, duration=2, target_rps=200)
+    result = asyncio.run(PerformanceTester(config).run())
+
+    # A closed loop of the same size would only complete concurrency / latency requests per second
+    assert result.total_requests == pytest.approx(400, abs=2)
+    assert result.percentile_50 >= SLOW_TARGET_LATENCY
+
+
+def test_sends_beyond_max_in_flight_are_counted_as_missed(slow_target_url):
+    config = TestConfig(target_url=slow_target_url, duration=2, target_rps=200, max_in_flight=1)
+    result = asyncio.run(PerformanceTester(config).run())
+
+    assert result.total_requests <= 2 / SLOW_TARGET_LATENCY + 1
+    assert result.missed_sends > 200
+    assert result.total_requests + result.missed_sends == pytest.approx(400, abs=2)
+    assert result.max_response_time < 2 * SLOW_TARGET_LATENCY + 0.05
+
+
+def test_latency_is_measured_from_the_intended_send_time(target_url):
+    tester = PerformanceTester(TestConfig(target_url=target_url, duration=2, target_rps=200))
+
+    async def run_with_stalled_loop():
+        run = asyncio.create_task(tester.run())
+        await asyncio.sleep(0.5)
+        time.sleep(0.3)  # the generator itself stalls; the target stays fast
+        return await run
+
+    result = asyncio.run(run_with_stalled_loop())
+
+    assert result.late_sends >= 50
+    assert result.max_response_time >= 0.3
+    assert result.min_response_time < 0.05
+    assert result.total_requests == pytest.approx(400, abs=2)
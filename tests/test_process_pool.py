@@ -0,0 +1,118 @@
+import asyncio
+import os
+import signal
+
+import numpy as np
+import pytest
+
+from app.web_server.core.load_profile import level_at
+from app.web_server.core.performance_tester import PerformanceTester
+from app.web_server.core.process_pool import (WORKER_CHECK_INTERVAL, MultiProcessTester, WorkerPool,
+                                               shutdown_worker_pool, split_config)
+from app.web_server.models.config import TestConfig
+from app.web_server.models.load_profile import LoadProfile
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool()
+    yield pool
+    pool.shutdown()
+
+
+def test_killed_worker_fails_its_shard_and_is_replaced(pool, target_url):
+    shard = TestConfig(target_url=target_url, duration=30, concurrency=1).model_dump()
+    pool.ensure_size(1)
+    killed = pool._workers[0][0]
+
+    async def run_and_kill():
+        run = asyncio.create_task(pool.run("PerformanceTester", [shard]))
+        await asyncio.sleep(2)
+        os.kill(killed.pid, signal.SIGKILL)
+        await asyncio.wait_for(run, 10)
+
+    with pytest.raises(RuntimeError, match="exited with code"):
+        asyncio.run(run_and_kill())
+    assert pool.size == 1
+    assert pool._workers[0][0] is not killed
+    assert pool._workers[0][0].is_alive()
+
+
+def test_killed_worker_is_detected_while_other_shards_report_progress(pool, target_url):
+    shard = TestConfig(target_url=target_url, duration=5, concurrency=1).model_dump()
+    pool.ensure_size(4)
+    killed = pool._workers[0][0]
+
+    replaced_while_running = []
+
+    async def run_and_kill():
+        run = asyncio.create_task(pool.run("PerformanceTester", [shard] * 4))
+        await asyncio.sleep(1.5)
+        os.kill(killed.pid, signal.SIGKILL)
+        await asyncio.sleep(2 * WORKER_CHECK_INTERVAL + 0.5)
+        replaced_while_running.append(pool._workers[0][0] is not killed and not run.done())
+        await asyncio.wait_for(run, 10)
+
+    with pytest.raises(RuntimeError, match="1 worker shard\\(s\\) failed: worker process exited with code"):
+        asyncio.run(run_and_kill())
+    assert replaced_while_running == [True]
+
+
+def test_first_run_does_not_count_worker_spawn_time(target_url):
+    config = TestConfig(target_url=target_url, duration=2, target_rps=100, workers=2)
+    try:
+        result = asyncio.run(MultiProcessTester(config, PerformanceTester).run())
+    finally:
+        shutdown_worker_pool()
+
+    assert result.failed_requests == 0
+    assert result.requests_per_second == pytest.approx(100, rel=0.1)
+
+
+def test_split_config_never_exceeds_requested_concurrency():
+    config = TestConfig(target_url="http://127.0.0.1/", requests=100, concurrency=3)
+    shards = split_config(config, 8)
+
+    assert len(shards) == 3
+    assert sum(shard["concurrency"] for shard in shards) == 3
+    assert sum(shard["requests"] for shard in shards) == 100
+
+
+def test_split_config_keeps_open_loop_workers():
+    config = TestConfig(target_url="http://127.0.0.1/", duration=1, concurrency=1, target_rps=80)
+    shards = split_config(config, 4)
+
+    assert len(shards) == 4
+    assert sum(shard["target_rps"] for shard in shards) == 80
+
+
+def test_split_config_spreads_caps_without_exceeding_them():
+    config = TestConfig(target_url="http://127.0.0.1/", duration=1, target_rps=80, max_in_flight=10, max_connections=7)
+    shards = split_config(config, 4)
+
+    assert [shard["max_in_flight"] for shard in shards] == [3, 3, 2, 2]
+    assert [shard["max_connections"] for shard in shards] == [2, 2, 2, 1]
+
+
+def test_more_workers_than_a_cap_are_rejected():
+    config = TestConfig(target_url="http://127.0.0.1/", duration=1, target_rps=80, max_in_flight=3, workers=4)
+
+    with pytest.raises(ValueError, match="max_in_flight is 3"):
+        split_config(config, 4)
+    with pytest.raises(ValueError, match="max_in_flight is 3"):
+        MultiProcessTester(config, PerformanceTester)
+
+
+@pytest.mark.parametrize("workers", [2, 3, 4])
+def test_split_closed_loop_profile_keeps_the_user_count(workers):
+    profile = LoadProfile(type="linear_ramp", start_level=0, end_level=10, ramp_duration=10)
+    config = TestConfig(target_url="http://127.0.0.1/", duration=10, load_profile=profile)
+    shard_profiles = [LoadProfile(**shard["load_profile"]) for shard in split_config(config, workers)]
+
+    assert len(shard_profiles) == workers
+    for elapsed in np.linspace(0, 10, 101):
+        if level_at(profile, elapsed) % 1 == 0.5:
+            continue  # a tie, which round() resolves to the even neighbour whether split or not
+        users = [round(level_at(shard_profile, elapsed)) for shard_profile in shard_profiles]
+        assert sum(max(count, 0) for count in users) == round(level_at(profile, elapsed))
+        assert max(users) - min(users) <= 1
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from app.web_server.core import scenario
+from app.web_server.core.scenario import DataFeed, ScenarioRunner, resolve_data_file
+from app.web_server.models.config import TestConfig
+from app.web_server.models.scenario import Scenario, ScenarioStep
+
+
+def test_data_file_is_read_from_the_data_directory(tmp_path):
+    (tmp_path / "users.csv").write_text("name\nalice\nbob\n")
+    feed = DataFeed(resolve_data_file("users.csv", str(tmp_path)))
+
+    assert [feed.next_row()["name"] for _ in range(3)] == ["alice", "bob", "alice"]
+
+
+@pytest.mark.parametrize("name", ["../secrets.csv", "/etc/passwd.csv", "nested/../../secrets.csv"])
+def test_data_file_outside_the_data_directory_is_rejected(tmp_path, name):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (tmp_path / "secrets.csv").write_text("key\nvalue\n")
+
+    with pytest.raises(ValueError, match="scenario data directory"):
+        resolve_data_file(name, str(data_dir))
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(scenario, "DATA_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _scenario(data_file: str) -> Scenario:
+    return Scenario(steps=[ScenarioStep(url="http://127.0.0.1/${name}")], data_file=data_file)
+
+
+@pytest.mark.parametrize("name, content, message", [
+    ("missing.csv", None, "Cannot read data file"),
+    ("empty.jsonl", "\n\n", "has no rows"),
+    ("broken.jsonl", '{"name": "alice"}\n\n{"name": \n', "Line 3 of data file .* is not valid JSON"),
+    ("list.jsonl", '{"name": "alice"}\n["bob"]\n', "Line 2 of data file .* is not a JSON object"),
+    ("binary.csv", b"name\n\xff\xfe\n", "not UTF-8"),
+])
+def test_bad_data_file_is_rejected_when_the_scenario_is_configured(data_dir, name, content, message):
+    if isinstance(content, bytes):
+        (data_dir / name).write_bytes(content)
+    elif content is not None:
+        (data_dir / name).write_text(content)
+
+    with pytest.raises(ValueError, match=message):
+        ScenarioRunner(_scenario(name))
+
+
+def test_bad_data_file_is_reported_by_the_api(server, data_dir):
+    (data_dir / "broken.jsonl").write_text("{not json}\n")
+    config = TestConfig(target_url="http://127.0.0.1/", scenario=_scenario("broken.jsonl"))
+
+    response = asyncio.run(server.run_stress_test(config))
+
+    assert "Line 1 of data file" in response["error"]
+
+
+def test_valid_jsonl_feed_is_accepted(data_dir):
+    (data_dir / "users.jsonl").write_text('{"name": "alice"}\n\n{"name": "bob"}\n')
+    runner = ScenarioRunner(_scenario("users.jsonl"))
+
+    assert [runner.feed.next_row()["name"] for _ in range(3)] == ["alice", "bob", "alice"]
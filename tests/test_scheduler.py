@@ -0,0 +1,103 @@
+import time
+
+import pytest
+
+from app.web_server.core.performance_tester import PerformanceTester
+from app.web_server.core.scheduler import TestScheduler
+from app.web_server.core.stress_tester import StressTester
+from app.web_server.models.config import TestConfig
+from app.web_server.storage.memory_storage import MemoryStorage
+
+
+def _stress_tester(url: str, requests: int = 5) -> StressTester:
+    return StressTester(TestConfig(target_url=url, requests=requests, concurrency=1))
+
+
+def _wait_for_all(scheduler: TestScheduler, timeout: float = 10):
+    deadline = time.monotonic() + timeout
+    while scheduler.active or scheduler.status()["queued"]:
+        assert time.monotonic() < deadline, "scheduled tests did not finish"
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = TestScheduler(MemoryStorage(), max_concurrent=1)
+    yield scheduler
+    scheduler.shutdown()
+
+
+def test_queued_tests_start_by_priority_then_submission_order(scheduler, slow_target_url):
+    blocker = _stress_tester(slow_target_url, requests=50)
+    scheduler.submit(blocker)
+    low, high, second_high = (_stress_tester(slow_target_url) for _ in range(3))
+    scheduler.submit(low, priority=0)
+    scheduler.submit(high, priority=5)
+    scheduler.submit(second_high, priority=5)
+
+    status = scheduler.status()
+    assert status["running"] == [blocker.test_id]
+    assert status["queued"] == [{"test_id": high.test_id, "priority": 5, "position": 0},
+                                {"test_id": second_high.test_id, "priority": 5, "position": 1},
+                                {"test_id": low.test_id, "priority": 0, "position": 2}]
+
+    _wait_for_all(scheduler)
+    starts = [tester.test_result.start_time for tester in (blocker, high, second_high, low)]
+    assert starts == sorted(starts)
+    assert all(tester.test_result.status == "completed" for tester in (blocker, high, second_high, low))
+
+
+def test_admission_is_limited_to_max_concurrent(slow_target_url):
+    scheduler = TestScheduler(MemoryStorage(), max_concurrent=2)
+    testers = [_stress_tester(slow_target_url, requests=25) for _ in range(3)]
+    try:
+        for tester in testers:
+            scheduler.submit(tester)
+        status = scheduler.status()
+        assert status["running"] == [testers[0].test_id, testers[1].test_id]
+        assert [entry["test_id"] for entry in status["queued"]] == [testers[2].test_id]
+        assert scheduler.storage.get(testers[2].test_id).status == "queued"
+        _wait_for_all(scheduler)
+    finally:
+        scheduler.shutdown()
+
+    assert [tester.test_result.status for tester in testers] == ["completed"] * 3
+
+
+def test_cancelling_a_queued_test_never_runs_it(scheduler, slow_target_url):
+    blocker, queued = _stress_tester(slow_target_url, requests=25), _stress_tester(slow_target_url)
+    scheduler.submit(blocker)
+    scheduler.submit(queued)
+
+    assert scheduler.cancel(queued.test_id)
+    assert scheduler.status()["queued"] == []
+    assert scheduler.storage.get(queued.test_id).status == "cancelled"
+    assert queued.request_count == 0
+    assert not scheduler.cancel(queued.test_id)
+
+
+def test_cancelled_running_test_keeps_partial_metrics(scheduler, slow_target_url):
+    tester = PerformanceTester(TestConfig(target_url=slow_target_url, duration=30, concurrency=2))
+    scheduler.submit(tester)
+    time.sleep(1)
+
+    assert scheduler.cancel(tester.test_id)
+    scheduler.join(tester.test_id, 5)
+    stored = scheduler.storage.get(tester.test_id)
+    assert stored.status == "cancelled"
+    assert stored.total_requests > 0
+    assert stored.successful_requests == stored.latency_histogram["count"]
+    assert stored.end_time is not None
+
+
+def test_orphaned_tests_are_marked_failed(scheduler):
+    running, queued, finished = (_stress_tester("http://127.0.0.1/") for _ in range(3))
+    for tester, status in ((running, "running"), (queued, "queued"), (finished, "completed")):
+        tester.test_result.status = status
+        scheduler.storage.save(tester.test_id, tester.test_result)
+
+    assert scheduler.fail_orphans() == 2
+    assert scheduler.storage.get(running.test_id).status == "failed"
+    assert scheduler.storage.get(queued.test_id).status == "failed"
+    assert scheduler.storage.get(finished.test_id).status == "completed"
+    assert scheduler.fail_orphans() == 0
@@ -0,0 +1,85 @@
+from datetime import datetime
+
+from app.web_server.models.results import TestResult
+from app.web_server.storage.memory_storage import MemoryStorage
+from app.web_server.storage.sqlite_storage import SQLiteStorage
+
+
+def _result(test_id: str) -> TestResult:
+    return TestResult(test_id=test_id, test_type="StressTester", start_time=datetime.now(), total_requests=1,
+                      successful_requests=1, failed_requests=0, average_response_time=0.01, min_response_time=0.01,
+                      max_response_time=0.01, requests_per_second=1, status="completed",
+                      resource_stats=[{"timestamp": "2026-01-01T00:00:00", "cpu_percent": 1.0}])
+
+
+def test_delete_removes_result_and_series_from_every_layer(tmp_path):
+    removed = []
+    storage = MemoryStorage(SQLiteStorage(str(tmp_path / "results.db")), on_remove=removed.append)
+    storage.save("a", _result("a"))
+
+    assert storage.delete("a")
+    assert storage.get("a") is None
+    assert storage.get_series("a", "resource_stats") is None
+    assert not storage.delete("a")
+    assert removed == ["a"]
+
+
+def test_eviction_without_backend_reports_the_removed_result():
+    removed = []
+    storage = MemoryStorage(max_entries=2, on_remove=removed.append)
+    for test_id in ("a", "b", "c"):
+        storage.save(test_id, _result(test_id))
+
+    assert removed == ["a"]
+
+
+def test_eviction_with_backend_keeps_the_result(tmp_path):
+    removed = []
+    storage = MemoryStorage(SQLiteStorage(str(tmp_path / "results.db")), max_entries=1, on_remove=removed.append)
+    storage.save("a", _result("a"))
+    storage.save("b", _result("b"))
+
+    assert removed == []
+    assert storage.get("a") is not None
+
+
+def test_saving_drops_series_that_became_empty(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "results.db"))
+    result = _result("a")
+    result.timeline = [{"timestamp": 1, "requests": 5}]
+    storage.save("a", result)
+
+    result.timeline = []
+    storage.save("a", result)
+
+    assert storage.get_series("a", "timeline") is None
+    assert storage.get("a").timeline is None
+    assert storage.get_series("a", "resource_stats") == result.resource_stats
+
+
+def test_running_results_are_never_evicted(tmp_path):
+    storage = MemoryStorage(SQLiteStorage(str(tmp_path / "results.db")), max_entries=2)
+    running = _result("running")
+    running.status = "running"
+    storage.save("running", running)
+    for test_id in ("b", "c", "d"):
+        storage.save(test_id, _result(test_id))
+
+    running.total_requests = 500
+    summaries, _ = storage.list_summaries()
+    assert list(storage._storage) == ["running", "d"]
+    assert {summary.test_id: summary.total_requests for summary in summaries}["running"] == 500
+
+
+def test_cache_grows_past_its_size_while_running_results_fill_it():
+    storage = MemoryStorage(max_entries=1)
+    for test_id in ("a", "b"):
+        result = _result(test_id)
+        result.status = "running"
+        storage.save(test_id, result)
+    storage.save("c", _result("c"))
+    assert list(storage._storage) == ["a", "b", "c"]
+
+    storage._storage["a"].status = "completed"
+    storage.save("d", _result("d"))
+    assert list(storage._storage) == ["b", "d"]
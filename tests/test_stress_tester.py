@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+import pytest
+
+from app.web_server.core.stress_tester import StressTester
+from app.web_server.models.config import TestConfig
+from benchmarks.target_server import RESPONSE
+
+SLOW_REQUEST_LATENCY = 0.1  # seconds
+
+
+def test_workers_keep_concurrency_requests_in_flight(slow_target_url):
+    result = asyncio.run(StressTester(TestConfig(target_url=slow_target_url, requests=300, concurrency=10)).run())
+
+    assert result.total_requests == 300
+    assert result.effective_concurrency == pytest.approx(10, rel=0.1)
+    assert result.generator_metrics["peak_in_flight"] == 10
+
+
+async def _every_tenth_slow(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, counter: list):
+    """Answer keep-alive requests at once, except every tenth one which takes `SLOW_REQUEST_LATENCY` seconds"""
+    try:
+        while await reader.readuntil(b"\r\n\r\n"):
+            counter.append(None)
+            if len(counter) % 10 == 0:
+                await asyncio.sleep(SLOW_REQUEST_LATENCY)
+            writer.write(RESPONSE)
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+def test_a_slow_request_only_holds_its_own_worker():
+    async def main():
+        counter = []
+        server = await asyncio.start_server(lambda r, w: _every_tenth_slow(r, w, counter), "127.0.0.1", 0)
+        async with server:
+            url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/"
+            tester = StressTester(TestConfig(target_url=url, requests=300, concurrency=10))
+            started = time.perf_counter()
+            await tester.run()
+            return tester, time.perf_counter() - started
+
+    tester, elapsed = asyncio.run(main())
+
+    # 30 slow requests spread over 10 workers; a barrier per batch of 10 would wait for one in every batch
+    assert tester.test_result.total_requests == 300
+    assert elapsed < 30 * SLOW_REQUEST_LATENCY / 2
+
+
+@pytest.mark.parametrize("requests, concurrency", [(101, 10), (3, 8)])
+def test_request_budget_is_spent_exactly(target_url, requests, concurrency):
+    result = asyncio.run(StressTester(TestConfig(target_url=target_url, requests=requests,
+                                                 concurrency=concurrency)).run())
+
+    assert result.total_requests == requests
+    assert result.successful_requests == requests
+
+
+def test_think_time_pauses_each_worker(target_url):
+    tester = StressTester(TestConfig(target_url=target_url, requests=20, concurrency=2, think_time=0.05))
+    result = asyncio.run(tester.run())
+
+    # Each worker sends 10 requests and pauses between consecutive ones
+    assert (tester.end_time - tester.start_time).total_seconds() >= 9 * 0.05
+    assert result.effective_concurrency < 1
+    assert result.total_requests == 20
+
+
+def test_cancelled_run_reports_effective_concurrency(slow_target_url):
+    tester = StressTester(TestConfig(target_url=slow_target_url, requests=10_000, concurrency=4))
+
+    async def run_and_cancel():
+        run = asyncio.create_task(tester.run())
+        await asyncio.sleep(1)
+        progress = tester.summary()["effective_concurrency"]
+        run.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await run
+        tester.finalize("cancelled")
+        return progress
+
+    progress = asyncio.run(run_and_cancel())
+
+    assert progress == pytest.approx(4, rel=0.1)
+    assert tester.test_result.status == "cancelled"
+    assert tester.test_result.effective_concurrency == pytest.approx(4, rel=0.1)
+    assert tester.summary()["effective_concurrency"] == tester.test_result.effective_concurrency
+
+
+def test_finalizing_a_test_that_never_ran_reports_no_concurrency():
+    tester = StressTester(TestConfig(target_url="http://127.0.0.1/", requests=10, concurrency=4))
+    tester.finalize("cancelled")
+
+    assert tester.test_result.effective_concurrency == 0
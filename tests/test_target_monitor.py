@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import httpx
+import numpy as np
+import pytest
+
+from app import target_agent_main
+from app.web_server.core.correlation import correlate, per_second
+from app.web_server.core.target_monitor import TARGET_FIELDS, TargetMonitor
+
+AGENT_SKEW = 100.0  # seconds the mocked agent clock runs ahead of the local one
+
+
+def _mock_agent(delays, samples=None):
+    """Transport answering like a target agent whose clock is `AGENT_SKEW` ahead, stamping its answer after waiting
+    the next of `delays` and before an equal wait on the way back"""
+    delays = iter(delays)
+    samples = samples or {field: [] for field in TARGET_FIELDS}
+
+    async def handle(request):
+        delay = next(delays)
+        await asyncio.sleep(delay)
+        body = {"agent_time": time.time() + AGENT_SKEW, "interval": 0.1, "seq": 0, "samples": samples,
+                "cursor": len(samples["timestamp"]), "dropped": 0, "more": False}
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json=body)
+    return httpx.MockTransport(handle)
+
+
+def _probe(monitor, transport, count):
+    async def main():
+        async with httpx.AsyncClient(transport=transport) as client:
+            for _ in range(count):
+                await monitor.pull(client)
+    asyncio.run(main())
+
+
+def test_clock_offset_comes_from_the_fastest_round_trip():
+    monitor = TargetMonitor("http://agent")
+    _probe(monitor, _mock_agent([0.1, 0.005, 0.05]), 3)
+
+    assert monitor.round_trip < 0.05
+    assert monitor.clock_offset == pytest.approx(AGENT_SKEW, abs=monitor.round_trip / 2)
+
+
+def test_samples_are_shifted_to_the_local_clock_and_wrap_the_buffer():
+    now = time.time()
+    samples = {field: [float(index) for index in range(8)] for field in TARGET_FIELDS}
+    samples["timestamp"] = [now + AGENT_SKEW + index for index in range(8)]
+    monitor = TargetMonitor("http://agent", buffer_size=5)
+    _probe(monitor, _mock_agent([0.001], samples), 1)
+
+    timestamps, values, seq = monitor.columns()
+
+    assert seq == 8
+    assert timestamps == pytest.approx([now + index for index in range(3, 8)], abs=monitor.round_trip)
+    assert values[:, 0].tolist() == [3.0, 4.0, 5.0, 6.0, 7.0]
+    assert monitor.metrics["max_cpu"] == 7.0
+    assert monitor.columns(6)[1][:, 0].tolist() == [6.0, 7.0]
+
+
+def test_monitor_pulls_from_a_localhost_agent():
+    sampler = target_agent_main.HostSampler(interval=0.05)
+    stop = threading.Event()
+    threading.Thread(target=sampler.run, args=(stop,), daemon=True).start()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), target_agent_main._handler(sampler))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monitor = TargetMonitor(f"http://127.0.0.1:{server.server_address[1]}")
+    deadline = time.monotonic() + 1.5
+    try:
+        asyncio.run(monitor.run(lambda: time.monotonic() < deadline))
+    finally:
+        server.shutdown()
+        stop.set()
+
+    assert monitor.last_error is None
+    assert monitor.seq >= 10
+    assert abs(monitor.clock_offset) <= monitor.round_trip / 2 + 0.001  # same clock on both sides
+    assert monitor.metrics["samples"] == monitor.seq
+
+
+def _bucket(second, mean, requests=10, errors=0, partial=False):
+    bucket = {"timestamp": second, "requests": requests, "errors": errors, "error_rate": errors / requests,
+              "mean": mean, "p50": mean, "p99": mean * 2}
+    if partial:
+        bucket["partial"] = True
+    return bucket
+
+
+def test_per_second_averages_samples_of_the_same_second():
+    timestamps = np.array([10.0, 10.5, 11.2])
+    values = np.array([[1.0, 4.0], [3.0, 6.0], [5.0, 8.0]])
+
+    assert per_second(timestamps, values) == {10: [2.0, 5.0], 11: [5.0, 8.0]}
+
+
+def test_correlate_joins_seconds_and_reports_pearson_coefficients():
+    cpu = [10.0, 30.0, 20.0, 50.0, 40.0]
+    timestamps = np.array([100.0 + second for second in range(5)] + [200.0])
+    values = np.array([[load, 50.0 - load, 1.0, 0.0, 0.0] for load in cpu] + [[0.0, 0.0, 0.0, 0.0, 0.0]])
+    buckets = [_bucket(100 + second, load / 1000) for second, load in enumerate(cpu)]
+    buckets.append(_bucket(105, 1.0, partial=True))
+
+    correlation = correlate(buckets, timestamps, values)
+
+    assert correlation["seconds"] == 5
+    assert [row["timestamp"] for row in correlation["rows"]] == [100, 101, 102, 103, 104]
+    assert correlation["coefficients"]["cpu_percent"]["mean"] == 1.0
+    assert correlation["coefficients"]["memory_percent"]["p99"] == -1.0
+    assert correlation["coefficients"]["network_sent"]["mean"] is None  # constant series
+    assert correlation["coefficients"]["cpu_percent"]["error_rate"] is None
+
+
+def test_correlate_needs_a_few_joined_seconds():
+    correlation = correlate([_bucket(100, 0.1), _bucket(101, 0.2)], np.array([100.0, 101.0]),
+                            np.array([[1.0, 1.0, 1.0, 1.0, 1.0], [2.0, 2.0, 2.0, 2.0, 2.0]]))
+
+    assert correlation["coefficients"]["cpu_percent"]["mean"] is None
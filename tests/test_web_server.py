@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+import httpx
+import pyarrow as pa
+import pytest
+
+from app.web_server.core.performance_tester import PerformanceTester
+from app.web_server.core.stress_tester import StressTester
+from app.web_server.models.config import TestConfig
+
+
+def test_resource_cursor_survives_test_completion_after_ring_buffer_wrap(server):
+    tester = StressTester(TestConfig(target_url="http://127.0.0.1/", resource_buffer_size=3))
+    server.active_testers[tester.test_id] = tester
+    try:
+        for _ in range(4):
+            tester._sample_resources()
+        cursor = server._resource_stats_since(tester.test_id, 0)["cursor"]
+        tester._sample_resources()
+    finally:
+        del server.active_testers[tester.test_id]
+
+    tester.monitoring = False
+    asyncio.run(tester.monitor_resources())
+    server.storage.save(tester.test_id, tester.test_result)
+    stats = server._resource_stats_since(tester.test_id, cursor)
+
+    assert cursor == 4
+    assert len(stats["resource_stats"]) == 1
+    assert stats["cursor"] == 5
+    assert not stats["running"]
+
+
+def test_deleting_a_test_removes_its_sample_files(server, tmp_path, monkeypatch):
+    monkeypatch.setenv("SAMPLES_DIR", str(tmp_path))
+    tester = StressTester(TestConfig(target_url="http://127.0.0.1/", record_samples=True))
+    tester.samples.record(1.0, 0.01, 200, True)
+    tester.finalize("completed")
+    server.storage.save(tester.test_id, tester.test_result)
+    assert server.sample_files(tester.test_id)
+
+    assert asyncio.run(server.delete_test_result(tester.test_id)) == {"deleted": True}
+    assert server.sample_files(tester.test_id) == []
+    assert server.storage.get(tester.test_id) is None
+
+
+def test_samples_export_as_an_arrow_stream(server, api_url, tmp_path, monkeypatch):
+    monkeypatch.setenv("SAMPLES_DIR", str(tmp_path))
+    tester = StressTester(TestConfig(target_url="http://127.0.0.1/", record_samples=True))
+    tester.samples.record(1.0, 0.01, 200, True)
+    tester.samples.record(2.0, 0.5, 503, False)
+    tester.finalize("completed")
+    server.storage.save(tester.test_id, tester.test_result)
+
+    response = httpx.get(f"{api_url}/test-results/{tester.test_id}/samples", params={"format": "arrow"})
+    table = pa.ipc.open_stream(response.content).read_all()
+
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    assert table.column("latency").to_pylist() == pytest.approx([0.01, 0.5])
+    assert table.column("status").to_pylist() == [200, 503]
+    assert table.column("success").to_pylist() == [True, False]
+
+
+def test_orphaned_test_can_be_deleted_after_a_restart(server):
+    tester = StressTester(TestConfig(target_url="http://127.0.0.1/"))
+    server.storage.save(tester.test_id, tester.test_result)
+    assert "cancel it first" in asyncio.run(server.delete_test_result(tester.test_id))["error"]
+
+    server._fail_orphaned_tests()
+
+    assert server.storage.get(tester.test_id).status == "failed"
+    assert asyncio.run(server.delete_test_result(tester.test_id)) == {"deleted": True}
+
+
+def test_cancel_endpoint_returns_once_partial_metrics_are_saved(server, slow_target_url):
+    tester = PerformanceTester(TestConfig(target_url=slow_target_url, duration=30, concurrency=2))
+    server.scheduler.submit(tester)
+    time.sleep(1)
+
+    assert asyncio.run(server.cancel_test(tester.test_id)) == {"test_id": tester.test_id, "status": "cancelled"}
+    stored = server.storage.get(tester.test_id)
+    assert stored.total_requests > 0
+    assert stored.latency_histogram["count"] == stored.successful_requests
+    assert asyncio.run(server.cancel_test(tester.test_id)) == {"error": "Test not found or already finished"}
+
+
+def test_distributed_tests_cannot_record_samples(server):
+    config = TestConfig(target_url="http://127.0.0.1/", distributed=True, record_samples=True)
+
+    assert "Raw samples cannot be recorded" in asyncio.run(server.run_stress_test(config))["error"]
+
+
+def _finished_stress_test(url: str) -> StressTester:
+    tester = StressTester(TestConfig(target_url=url, requests=50, concurrency=2))
+    asyncio.run(tester.run())
+    return tester
+
+
+def test_compare_loads_only_the_series_it_uses(server, target_url, monkeypatch):
+    reference, candidate = _finished_stress_test(target_url), _finished_stress_test(target_url)
+    for tester in (reference, candidate):
+        server.storage.save(tester.test_id, tester.test_result)
+    loaded = []
+    get, get_series = server.storage.get, server.storage.get_series
+    monkeypatch.setattr(server.storage, "get", lambda test_id, include_series=True: loaded.append(
+        ("get", include_series)) or get(test_id, include_series))
+    monkeypatch.setattr(server.storage, "get_series",
+                        lambda test_id, name: loaded.append(("series", name)) or get_series(test_id, name))
+
+    response = asyncio.run(server.compare_tests([reference.test_id, candidate.test_id]))
+
+    assert set(loaded) == {("get", False), ("series", "latency_histogram"), ("series", "timeline")}
+    comparison = response["comparisons"][0]
+    assert comparison["latency"]["probability_slower"] is not None
+    assert comparison["latency"]["percentiles"]["percentile_50"]["reference"] == reference.test_result.percentile_50